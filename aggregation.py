@@ -0,0 +1,337 @@
+# aggregation.py - 性能数据预聚合索引（供项目总结等报告查询）
+import math
+
+from numeric_cache import NumericCache
+
+# 未按场景拆分时使用的场景名
+ALL_SCENARIOS = "全部"
+
+# 倍数置信区间使用的正态分位数（95%）
+RATIO_CI_Z = 1.96
+
+
+def metric_value(row, key):
+    """取行中指标的数值：优先计算字段，其次输入字段；空值或无法解析时返回 None"""
+    if row.get("calc_values", {}).get(key):
+        return NumericCache.value(row, "calc_values", key)
+    if row.get("input_values", {}).get(key):
+        return NumericCache.value(row, "input_values", key)
+    return None
+
+
+class QuantileSketch:
+    """可合并的流式分位数草图
+
+    样本不超过 EXACT_LIMIT 个时保存原值，分位数精确（线性插值，与 numpy 默认一致）；
+    超过后转为对数分桶（DDSketch）：正/负值按 ceil(log_γ|x|) 分桶计数，零值单独计数，
+    分位数相对误差不超过 RELATIVE_ACCURACY。分桶只做计数累加，可按任意顺序合并。
+    非有限值（nan/inf）不计入。
+    """
+
+    __slots__ = ("count", "_values", "_positive", "_negative", "_zeros")
+
+    EXACT_LIMIT = 128
+    RELATIVE_ACCURACY = 0.01
+    _GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+    _LOG_GAMMA = math.log(_GAMMA)
+
+    def __init__(self):
+        self.count = 0
+        self._values = []  # 精确模式下的原值；转为分桶后为 None
+        self._positive = None  # 分桶下标 → 计数
+        self._negative = None
+        self._zeros = 0
+
+    def add(self, value):
+        if not math.isfinite(value):
+            return
+        self.count += 1
+        if self._values is not None:
+            self._values.append(value)
+            if len(self._values) > self.EXACT_LIMIT:
+                self._collapse()
+        else:
+            self._bin(value, 1)
+
+    def extend(self, values):
+        """批量加入样本（与逐个 add 结果相同）"""
+        if self._values is not None and len(self._values) + len(values) <= self.EXACT_LIMIT:
+            finite = [v for v in values if math.isfinite(v)]
+            self.count += len(finite)
+            self._values.extend(finite)
+            return
+        if self._values is not None:
+            self._collapse()
+        log_gamma = self._LOG_GAMMA
+        positive, negative = self._positive, self._negative
+        for value in values:
+            if value > 0 and value != math.inf:
+                key = math.ceil(math.log(value) / log_gamma)
+                positive[key] = positive.get(key, 0) + 1
+            elif not math.isfinite(value):
+                continue
+            elif value < 0:
+                key = math.ceil(math.log(-value) / log_gamma)
+                negative[key] = negative.get(key, 0) + 1
+            else:
+                self._zeros += 1
+            self.count += 1
+
+    def merge(self, other):
+        if not other.count:
+            return
+        self.count += other.count
+        if self._values is not None and other._values is not None and len(self._values) + len(other._values) <= self.EXACT_LIMIT:
+            self._values.extend(other._values)
+            return
+        if self._values is not None:
+            self._collapse()
+        if other._values is not None:
+            for value in other._values:
+                self._bin(value, 1)
+            return
+        for key, n in other._positive.items():
+            self._positive[key] = self._positive.get(key, 0) + n
+        for key, n in other._negative.items():
+            self._negative[key] = self._negative.get(key, 0) + n
+        self._zeros += other._zeros
+
+    def quantile(self, q):
+        """q 分位数（0 ≤ q ≤ 1）；无样本时为 None"""
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        if self._values is not None:
+            values = sorted(self._values)
+            lo = int(rank)
+            hi = min(lo + 1, len(values) - 1)
+            return values[lo] + (values[hi] - values[lo]) * (rank - lo)
+
+        # 分桶：从最小值（绝对值最大的负数）往上累计
+        seen = 0
+        for key in sorted(self._negative, reverse=True):
+            seen += self._negative[key]
+            if seen > rank:
+                return -self._bin_value(key)
+        seen += self._zeros
+        if seen > rank:
+            return 0.0
+        for key in sorted(self._positive):
+            seen += self._positive[key]
+            if seen > rank:
+                return self._bin_value(key)
+        return self._bin_value(max(self._positive))
+
+    def _collapse(self):
+        """精确模式 → 分桶模式"""
+        values, self._values = self._values, None
+        self._positive, self._negative = {}, {}
+        for value in values:
+            self._bin(value, 1)
+
+    def _bin(self, value, n):
+        if value > 0:
+            key = math.ceil(math.log(value) / self._LOG_GAMMA)
+            self._positive[key] = self._positive.get(key, 0) + n
+        elif value < 0:
+            key = math.ceil(math.log(-value) / self._LOG_GAMMA)
+            self._negative[key] = self._negative.get(key, 0) + n
+        else:
+            self._zeros += n
+
+    def _bin_value(self, key):
+        """分桶 (γ^(k-1), γ^k] 的代表值（相对误差最小的点）"""
+        return 2 * self._GAMMA ** key / (self._GAMMA + 1)
+
+
+class RunningStat:
+    """单个指标的流式统计量：样本数、总和/均值、方差、分位数
+
+    - 总和使用 Neumaier 补偿求和，合并顺序不同（逐行累加 / 按桶合并）时结果一致；
+    - 方差使用 Welford 递推，合并时按 Chan 并行公式组合；
+    - 分位数（中位数、P90 等）由 QuantileSketch 估计。
+    """
+
+    __slots__ = ("count", "total", "_comp", "_wmean", "_m2", "sketch")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self._comp = 0.0
+        self._wmean = 0.0
+        self._m2 = 0.0
+        self.sketch = QuantileSketch()
+
+    def add(self, value):
+        self.count += 1
+        self._add(value)
+        delta = value - self._wmean
+        self._wmean += delta / self.count
+        self._m2 += delta * (value - self._wmean)
+        self.sketch.add(value)
+
+    def extend(self, values):
+        """批量加入样本（与逐个 add 结果相同，循环内使用局部变量）"""
+        count, total, comp, wmean, m2 = self.count, self.total, self._comp, self._wmean, self._m2
+        for value in values:
+            count += 1
+            t = total + value
+            if abs(total) >= abs(value):
+                comp += (total - t) + value
+            else:
+                comp += (value - t) + total
+            total = t
+            delta = value - wmean
+            wmean += delta / count
+            m2 += delta * (value - wmean)
+        self.count, self.total, self._comp, self._wmean, self._m2 = count, total, comp, wmean, m2
+        self.sketch.extend(values)
+
+    def merge(self, other):
+        if not other.count:
+            return
+        n = self.count + other.count
+        delta = other._wmean - self._wmean
+        self._m2 += other._m2 + delta * delta * self.count * other.count / n
+        self._wmean += delta * other.count / n
+        self.count = n
+        self._add(other.total)
+        self._add(other._comp)
+        self.sketch.merge(other.sketch)
+
+    def _add(self, value):
+        t = self.total + value
+        if abs(self.total) >= abs(value):
+            self._comp += (self.total - t) + value
+        else:
+            self._comp += (value - t) + self.total
+        self.total = t
+
+    @property
+    def mean(self):
+        return (self.total + self._comp) / self.count if self.count else None
+
+    @property
+    def variance(self):
+        """样本方差（n-1）；样本数不足 2 时为 None"""
+        return self._m2 / (self.count - 1) if self.count > 1 else None
+
+    @property
+    def stddev(self):
+        variance = self.variance
+        return math.sqrt(max(variance, 0.0)) if variance is not None else None
+
+    @property
+    def median(self):
+        return self.sketch.quantile(0.5)
+
+    @property
+    def p90(self):
+        return self.sketch.quantile(0.9)
+
+
+def ratio_confidence_interval(numerator, denominator, z=RATIO_CI_Z):
+    """两组独立样本均值之比 mean(numerator) / mean(denominator) 的近似置信区间
+
+    在对数尺度上按 delta 方法：Var(ln R) ≈ s₁²/(n₁·m₁²) + s₂²/(n₂·m₂²)，区间为
+    exp(ln R ± z·√Var(ln R))。区间不对称且恒为正，不会出现负的倍数。
+    任一组样本数不足 2，或两组均值不同为正/同为负（倍数不为正）时返回 None。
+    """
+    m1, m2 = numerator.mean, denominator.mean
+    v1, v2 = numerator.variance, denominator.variance
+    if v1 is None or v2 is None or not m1 or not m2:
+        return None
+    ratio = m1 / m2
+    if ratio <= 0:
+        return None
+    half = z * math.sqrt(v1 / (numerator.count * m1 * m1) + v2 / (denominator.count * m2 * m2))
+    log_ratio = math.log(ratio)
+    return math.exp(log_ratio - half), math.exp(log_ratio + half)
+
+
+class PerfAggregationIndex:
+    """性能数据预聚合索引
+
+    一次遍历 perf_data，按 (模型, 测试类型, 厂家, GPU, 场景) 累计行数与各指标的
+    RunningStat（均值、方差、分位数）；报告只查询索引，不再反复扫描原始行。每行都计入 ALL_SCENARIOS，
+    另按 scenarios_for(row) 计入其所属的各场景。
+
+    遍历时每行只取值一次：先按行的“场景组合”（如 短输入长输出 + 总上下文短）收集各指标
+    数值，遍历结束后对每个组合批量统计，再合并到其包含的每个场景，场景组合的种类远少于行数。
+
+    - metric_keys：{(模型, 测试类型): 指标集合}，只累计这些指标
+    - scenarios_for：可选 scenarios_for(row) → 场景名列表
+    """
+
+    def __init__(self, perf_data, metric_keys, scenarios_for=None):
+        self._buckets = {}  # (模型, 测试类型, 厂家, GPU, 场景) → [行数, {指标: RunningStat}]
+        self._partitions = {}  # (模型, 测试类型, 场景) → {(厂家, GPU): None}，保持首次出现顺序
+        self._groups = {}  # (模型, 测试类型) → [指标列表]，保持首次出现顺序
+
+        combos = {}  # (模型, 测试类型, 厂家, GPU, 场景组合) → [行数, [数值列表，与指标列表对齐]]
+        for row in perf_data:
+            group = (row.get("model", ""), row.get("test_type", ""))
+            keys = self._groups.get(group)
+            if keys is None:
+                keys = self._groups[group] = sorted(metric_keys.get(group, ()))
+            scenarios = (ALL_SCENARIOS,) + tuple(scenarios_for(row)) if scenarios_for is not None else (ALL_SCENARIOS,)
+            combo_key = group + (row.get("vendor", ""), row.get("gpu", ""), scenarios)
+
+            combo = combos.get(combo_key)
+            if combo is None:
+                combo = combos[combo_key] = [0, [[] for _ in keys]]
+            combo[0] += 1
+            for values, key in zip(combo[1], keys):
+                value = metric_value(row, key)
+                if value is not None:
+                    values.append(value)
+
+        # 场景组合 → 各场景（保持首次出现顺序）
+        for (model, test_type, vendor, gpu, scenarios), (count, columns) in combos.items():
+            keys = self._groups[(model, test_type)]
+            stats = []
+            for values in columns:
+                stat = RunningStat()
+                stat.extend(values)
+                stats.append(stat)
+            for scenario in scenarios:
+                bucket_key = (model, test_type, vendor, gpu, scenario)
+                bucket = self._buckets.get(bucket_key)
+                if bucket is None:
+                    bucket = self._buckets[bucket_key] = [0, {key: RunningStat() for key in keys}]
+                    self._partitions.setdefault((model, test_type, scenario), {})[(vendor, gpu)] = None
+                bucket[0] += count
+                for key, stat in zip(keys, stats):
+                    bucket[1][key].merge(stat)
+
+    def groups(self):
+        """全部 (模型, 测试类型)，按首次出现顺序"""
+        return list(self._groups)
+
+    def partitions(self, model, test_type, scenario=ALL_SCENARIOS):
+        """该分组/场景下出现过的 (厂家, GPU)，按首次出现顺序"""
+        return list(self._partitions.get((model, test_type, scenario), ()))
+
+    def count(self, model, test_type, partitions=None, scenario=ALL_SCENARIOS):
+        """行数；partitions 为 (厂家, GPU) 列表，None 表示该分组/场景下全部"""
+        if partitions is None:
+            partitions = self.partitions(model, test_type, scenario)
+        total = 0
+        for vendor, gpu in partitions:
+            bucket = self._buckets.get((model, test_type, vendor, gpu, scenario))
+            if bucket is not None:
+                total += bucket[0]
+        return total
+
+    def stat(self, model, test_type, partitions, metric, scenario=ALL_SCENARIOS):
+        """合并若干 (厂家, GPU) 的指标累计量"""
+        merged = RunningStat()
+        for vendor, gpu in partitions:
+            bucket = self._buckets.get((model, test_type, vendor, gpu, scenario))
+            if bucket is not None and metric in bucket[1]:
+                merged.merge(bucket[1][metric])
+        return merged
+
+    def mean(self, model, test_type, partitions, metric, scenario=ALL_SCENARIOS):
+        """若干 (厂家, GPU) 的指标均值（无有效数据时为 None）"""
+        return self.stat(model, test_type, partitions, metric, scenario).mean
@@ -0,0 +1,113 @@
+# background_job.py - 后台任务执行（工作线程 + Tk主循环轮询）
+import queue
+import threading
+import time
+
+
+class JobCancelled(Exception):
+    """任务被用户取消（由进度回调在工作线程中抛出）"""
+
+
+class BackgroundJob:
+    """在工作线程中运行耗时任务，通过 root.after 轮询把进度和结果交回Tk线程
+
+    工作函数签名为 target(progress)，progress(done, total, message="") 用于汇报进度，
+    若任务已被取消，progress 会抛出 JobCancelled 以尽快结束工作线程。
+    所有回调（on_progress / on_done / on_error / on_cancel / on_output）都在Tk线程中执行。
+
+    提供 on_output 时为流式任务：target 返回可迭代对象，工作线程逐项取出交回Tk线程，
+    每次轮询把期间产出的各项按顺序合并为一个列表调用 on_output(items)（不会像进度
+    那样只保留最新一条），全部产出后以 on_done(None, elapsed) 结束。
+    """
+
+    def __init__(self, root, target, on_done, on_error=None, on_progress=None, on_cancel=None, poll_ms=100,
+                 on_output=None):
+        self.root = root
+        self.target = target
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_progress = on_progress
+        self.on_cancel = on_cancel
+        self.on_output = on_output
+        self.poll_ms = poll_ms
+
+        self._queue = queue.Queue()
+        self._cancel_event = threading.Event()
+        self._thread = None
+        self._started_at = None
+        self.elapsed = 0.0
+
+    # ========== Tk线程调用 ==========
+    def start(self):
+        """启动工作线程并开始轮询"""
+        self._started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        self.root.after(self.poll_ms, self._poll)
+        return self
+
+    def cancel(self):
+        """请求取消（工作线程在下一次汇报进度时结束）"""
+        self._cancel_event.set()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _poll(self):
+        """读取工作线程消息；进度只把最新一条交给界面（避免刷新过于频繁），流式输出按顺序全部交出"""
+        latest_progress = None
+        output = []
+        while True:
+            try:
+                kind, payload = self._queue.get_nowait()
+            except queue.Empty:
+                break
+
+            if kind == "progress":
+                latest_progress = payload
+                continue
+            if kind == "output":
+                output.append(payload)
+                continue
+
+            if output:
+                self.on_output(output)
+            self.elapsed = time.perf_counter() - self._started_at
+            if kind == "done":
+                self.on_done(payload, self.elapsed)
+            elif kind == "cancelled":
+                if self.on_cancel:
+                    self.on_cancel(self.elapsed)
+            elif kind == "error":
+                if self.on_error:
+                    self.on_error(payload, self.elapsed)
+            return
+
+        if output:
+            self.on_output(output)
+        if latest_progress is not None and self.on_progress:
+            self.on_progress(*latest_progress)
+        self.root.after(self.poll_ms, self._poll)
+
+    # ========== 工作线程 ==========
+    def _progress(self, done, total, message=""):
+        if self._cancel_event.is_set():
+            raise JobCancelled()
+        self._queue.put(("progress", (done, total, message)))
+
+    def _run(self):
+        try:
+            result = self.target(self._progress)
+            if self.on_output is not None:
+                for item in result:
+                    if self._cancel_event.is_set():
+                        raise JobCancelled()
+                    self._queue.put(("output", item))
+                result = None
+        except JobCancelled:
+            self._queue.put(("cancelled", None))
+        except Exception as e:
+            self._queue.put(("error", e))
+        else:
+            self._queue.put(("done", result))
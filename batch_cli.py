@@ -0,0 +1,296 @@
+# batch_cli.py - 无界面批处理入口（DataManager → SummaryGenerator → ExcelExporter）
+"""
+用法：
+    python batch_cli.py project1.yaml [project2.json ...] -o reports/ [--history [DB]] [--config model_config.yaml]
+
+与界面一致，先应用 model_config.yaml（--config，缺省为当前目录下的该文件）中的 perf_fields /
+derived_metrics / metric_meta / scenarios 声明，项目定义文件中的同名声明再覆盖其上。
+
+项目定义文件（YAML 或 JSON）格式：
+
+    project:
+      project_name: XX银行推理选型
+      test_cycle: 2026.01-2026.02
+      vendor_str: H3C（H20）、厂家B（A800）
+      customer_name: ...
+    models:                      # 模型 → 测试类型列表
+      DeepSeek-R1: [文本推理]
+    env:                         # 可选；缺省按 models × 厂家 自动生成
+      - {model: DeepSeek-R1, test_type: 文本推理, vendor: H3C, gpu: H20,
+         gpu_count: 8, dataset: sharegpt, tool: evalscope}
+    pk:                          # 可选
+      - {model: DeepSeek-R1, test_type: 文本推理, selected_pk: 总吞吐（tokens/s）}
+    perf:                        # 可选；按 (model, test_type, vendor, gpu) 匹配环境行（该组合在 env 中须唯一）
+      - model: DeepSeek-R1
+        test_type: 文本推理
+        vendor: H3C
+        gpu: H20
+        values: {客户端设置并发: 16, 输入长度（tokens）: 1024, ...}
+    perf_files:                  # 可选；压测工具结果文件（CSV/JSON/JSONL，相对定义文件所在目录），
+      - path: results/h3c.csv    # 行追加在 perf 之后；文件中没有的匹配列用这里的 model 等缺省值，
+        vendor: H3C              # columns 把字段/匹配键指定到文件中的列名（缺省按别名识别）
+        columns: {TTFT（ms）: first_token_latency}
+    problems:                    # 可选
+      - {category: 技术问题, description: ..., person: ..., solution: ...}
+    perf_fields:                 # 可选；新测试类型的字段（同 model_config.yaml，按测试类型覆盖）
+      视频生成: {input: [生成时长（s）, 帧数], category: 推理性能}
+    derived_metrics:             # 可选；计算字段公式（同 model_config.yaml，按测试类型/指标覆盖）
+      视频生成: {生成帧率（fps）: "{帧数} / {生成时长（s）}"}
+    metric_meta:                 # 可选；指标方向/单位（同 model_config.yaml，按指标覆盖）
+      生成帧率（fps）: {direction: higher, unit: fps}
+    scenarios:                   # 可选；文本类测试的场景划分（同 model_config.yaml，整体替换）
+      - {name: 长上下文高并发, total: [8192, null], concurrency: [32, null]}
+"""
+import argparse
+import json
+import os
+import sys
+import uuid
+
+import yaml
+
+from config import HISTORY_DB_PATH, PERF_FIELDS_MAP
+
+# 界面读取的模型配置文件（相对当前目录，与 gui 一致）
+MODEL_CONFIG_PATH = "model_config.yaml"
+from data_manager import DataManager
+from excel_export import ExcelExporter
+from history_store import HistoryStore
+from project_model import ProjectInfo, ProjectModel
+from summary_generator import SummaryGenerator
+from derived_metrics import DerivedMetricEngine
+from perf_import import IMPORT_KEYS, PerfImporter
+from ranking import MetricRanking
+from scenarios import ScenarioBucketer
+
+
+def _text(value):
+    """统一转为字符串（None → 空串），与界面录入的数据类型保持一致"""
+    return "" if value is None else str(value)
+
+
+def load_definition(path):
+    """读取项目定义文件（按扩展名选择 JSON / YAML）"""
+    with open(path, "r", encoding="utf-8") as f:
+        if path.lower().endswith(".json"):
+            return json.load(f) or {}
+        return yaml.safe_load(f) or {}
+
+
+def load_model_config(path=MODEL_CONFIG_PATH):
+    """读取 model_config.yaml；文件不存在时返回空字典（不像界面那样创建缺省文件）"""
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return yaml.safe_load(f) or {}
+
+
+def merge_declarations(model_config, definition):
+    """model_config.yaml 的声明与项目定义中的声明合并，后者优先
+
+    perf_fields 按测试类型覆盖，derived_metrics 按 (测试类型, 指标) 覆盖，metric_meta 按
+    指标合并各属性，scenarios 在定义中给出时整体替换。
+    """
+    merged = {}
+    perf_fields = {**(model_config.get("perf_fields") or {}), **(definition.get("perf_fields") or {})}
+    merged["perf_fields"] = perf_fields or None
+
+    derived = {tt: dict(metrics or {}) for tt, metrics in (model_config.get("derived_metrics") or {}).items()}
+    for tt, metrics in (definition.get("derived_metrics") or {}).items():
+        derived.setdefault(tt, {}).update(metrics or {})
+    merged["derived_metrics"] = derived or None
+
+    meta = {field: dict(value or {}) for field, value in (model_config.get("metric_meta") or {}).items()}
+    for field, value in (definition.get("metric_meta") or {}).items():
+        meta.setdefault(field, {}).update(value or {})
+    merged["metric_meta"] = meta or None
+
+    merged["scenarios"] = definition.get("scenarios") or model_config.get("scenarios")
+    return merged
+
+
+def _env_key(row):
+    return (row.get("model", ""), row.get("test_type", ""), row.get("vendor", ""), row.get("gpu", ""))
+
+
+def build_project(definition, model_config=None):
+    """根据项目定义构建与GUI一致的数据结构
+
+    model_config 为 load_model_config() 读取的 model_config.yaml 内容，其中的字段/公式/指标元数据/
+    场景声明先于定义文件中的同名声明生效（见 merge_declarations）。
+    """
+    declarations = merge_declarations(model_config or {}, definition)
+    DerivedMetricEngine.register(declarations["perf_fields"], declarations["derived_metrics"])
+    MetricRanking.register(declarations["metric_meta"])
+    ScenarioBucketer.register(declarations["scenarios"])
+    project = ProjectModel.empty()
+    project.info = ProjectInfo.from_dict(definition.get("project", {}) or {})
+
+    models = definition.get("models", {}) or {}
+    project.selected_models = list(models.keys())
+    project.model_test_type_map = {m: list(tts or []) for m, tts in models.items()}
+
+    # 测试环境
+    if definition.get("env"):
+        for env in definition["env"]:
+            project.env_data.append({
+                "model": env.get("model", ""),
+                "test_type": env.get("test_type", ""),
+                "vendor": env.get("vendor", ""),
+                "gpu": env.get("gpu", ""),
+                "gpu_count": _text(env.get("gpu_count")),
+                "dataset": _text(env.get("dataset")),
+                "tool": _text(env.get("tool")),
+                "is_dynamic": False,
+                "id": str(uuid.uuid4()),
+            })
+    else:
+        vendor_list = DataManager.parse_vendor_str(project.info.vendor_str)
+        project.env_data = DataManager.init_env_data(
+            project.selected_models, project.model_test_type_map, vendor_list
+        )
+
+    # PK指标与性能数据
+    default_perf, project.pk_data = DataManager.init_perf_data(
+        project.env_data, project.selected_models, project.model_test_type_map
+    )
+    pk_selected = {
+        (p.get("model", ""), p.get("test_type", "")): _text(p.get("selected_pk"))
+        for p in definition.get("pk", []) or []
+    }
+    for pk_row in project.pk_data:
+        pk_row["selected_pk"] = pk_selected.get((pk_row["model"], pk_row["test_type"]), "")
+
+    if definition.get("perf"):
+        env_map = {}
+        for env in project.env_data:
+            key = _env_key(env)
+            if key in env_map:
+                raise ValueError(f"env 中 (model, test_type, vendor, gpu) 重复，perf 行无法确定所属测试环境：{key}")
+            env_map[key] = env
+        for idx, perf in enumerate(definition["perf"]):
+            env = env_map.get(_env_key(perf))
+            if env is None:
+                raise ValueError(f"perf 第{idx + 1}行未找到匹配的测试环境：{_env_key(perf)}")
+            input_fields, calc_fields = PERF_FIELDS_MAP.get(env["test_type"], ([], []))
+            values = perf.get("values", {}) or {}
+            project.perf_data.append({
+                "id": str(uuid.uuid4()),
+                "model": env["model"],
+                "test_type": env["test_type"],
+                "vendor": env["vendor"],
+                "gpu": env.get("gpu", ""),
+                "dataset": env["dataset"],
+                "gpu_count": env["gpu_count"],
+                "input_fields": input_fields,
+                "calc_fields": calc_fields,
+                "input_values": {f: _text(values.get(f)) for f in input_fields},
+                "calc_values": {f: "" for f in calc_fields},
+            })
+    elif not definition.get("perf_files"):
+        project.perf_data = default_perf
+
+    # 项目问题
+    for problem in definition.get("problems", []) or []:
+        project.problem_data.append({
+            "id": str(uuid.uuid4()),
+            "category": problem.get("category", ""),
+            "description": problem.get("description", ""),
+            "person": problem.get("person", ""),
+            "solution": problem.get("solution", ""),
+        })
+
+    return project
+
+
+def import_perf_files(project, definition, base_dir="."):
+    """把定义中 perf_files 列出的结果文件导入 project.perf_data，返回各文件的 ImportResult"""
+    results = []
+    for idx, spec in enumerate(definition.get("perf_files", []) or []):
+        if isinstance(spec, str):
+            spec = {"path": spec}
+        if not spec.get("path"):
+            raise ValueError(f"perf_files 第{idx + 1}项缺少 path")
+        file_path = os.path.join(base_dir, spec["path"])
+        defaults = {key: spec[key] for key in IMPORT_KEYS if spec.get(key) is not None}
+        result = PerfImporter.import_file(file_path, project.env_data, defaults, spec.get("columns"))
+        project.perf_data.extend(result.rows)
+        results.append(result)
+    return results
+
+
+def run_one(path, out_dir, write_summary=True, write_only=None, history=None, model_config=None):
+    """处理单个项目定义文件，返回生成的Excel路径；history 为历史结果库路径时同时写入该库
+
+    model_config 为 model_config.yaml 的内容（见 build_project）。
+    """
+    definition = load_definition(path)
+    project = build_project(definition, model_config)
+    for result in import_perf_files(project, definition, os.path.dirname(os.path.abspath(path))):
+        for line in result.summary_lines():
+            print(f"[IMPORT] {result.path}: {line}")
+    for error in DataManager.calculate_throughput(project.perf_data):
+        print(f"[WARN] {path}: {DerivedMetricEngine.format_error(error)}", file=sys.stderr)
+    if history:
+        HistoryStore.record(project, path, history)
+
+    # 总结按行流式生成：边写 Markdown 文件边写入 Excel“项目总结”Sheet
+    base = os.path.splitext(os.path.basename(path))[0]
+    xlsx_path = os.path.join(out_dir, f"{base}.xlsx")
+    lines = SummaryGenerator.iter_lines(project)
+    if not write_summary:
+        return ExcelExporter.write_report(xlsx_path, project, write_only=write_only, summary_lines=lines)
+    with open(os.path.join(out_dir, f"{base}.md"), "w", encoding="utf-8") as f:
+        return ExcelExporter.write_report(
+            xlsx_path, project, write_only=write_only, summary_lines=SummaryGenerator.tee_to_file(lines, f)
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="GPU性能测试报告批量生成（无界面）")
+    parser.add_argument("definitions", nargs="+", help="项目定义文件（.yaml/.yml/.json）")
+    parser.add_argument("-o", "--out-dir", default=".", help="输出目录（默认当前目录）")
+    parser.add_argument("--no-summary", action="store_true", help="不单独输出 Markdown 总结文件")
+    parser.add_argument(
+        "--streaming",
+        action="store_true",
+        default=None,
+        help="强制使用流式（write_only）工作簿导出；缺省按性能数据行数自动选择",
+    )
+    parser.add_argument(
+        "--history",
+        nargs="?",
+        const=HISTORY_DB_PATH,
+        default=None,
+        metavar="DB",
+        help=f"同时把各项目写入历史结果库（缺省库文件：{HISTORY_DB_PATH}）",
+    )
+    parser.add_argument(
+        "--config",
+        default=MODEL_CONFIG_PATH,
+        help=f"模型配置文件，其中的字段/公式/指标元数据/场景声明先于定义文件生效（缺省：{MODEL_CONFIG_PATH}）",
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        model_config = load_model_config(args.config)
+    except Exception as e:
+        print(f"[FAIL] {args.config}: {e}", file=sys.stderr)
+        return 1
+    os.makedirs(args.out_dir, exist_ok=True)
+    failed = 0
+    for path in args.definitions:
+        try:
+            xlsx = run_one(
+                path, args.out_dir, write_summary=not args.no_summary, write_only=args.streaming,
+                history=args.history, model_config=model_config,
+            )
+            print(f"[OK] {path} -> {xlsx}")
+        except Exception as e:
+            failed += 1
+            print(f"[FAIL] {path}: {e}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,693 @@
+# benchmark.py - 性能基准测试（无界面，使用合成数据）
+"""
+用法：
+    python benchmark.py excel [--sizes 1000 10000 100000]
+    python benchmark.py calc [--sizes 100000]
+    python benchmark.py summary [--sizes 50000]
+    python benchmark.py journal [--sizes 100000] [--edits 2000]
+    python benchmark.py import [--sizes 100000 300000]
+    python benchmark.py reimport [--sizes 10000 100000]
+    python benchmark.py history [--sizes 50000] [--projects 20]
+    python benchmark.py startup [--repeat 5] [--record] [--baseline PATH] [--import-budget-ms 100] [--budget-ms 1000]
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import re
+import tempfile
+import time
+import tracemalloc
+import uuid
+
+from config import (
+    PERF_FIELDS_MAP,
+    STARTUP_BASELINE_PATH,
+    STARTUP_BUDGET_MS,
+    STARTUP_DEFERRED_MODULES,
+    STARTUP_IMPORT_BUDGET_MS,
+    STARTUP_REGRESSION_FACTOR,
+)
+from project_model import ProjectInfo, ProjectModel
+
+BENCH_VENDORS = [("H3C", "H20"), ("厂家B", "A800"), ("厂家C", "910B")]
+BENCH_MODELS = ["DeepSeek-R1", "qwen14B"]
+
+
+def make_synthetic_project(n_rows, test_type="文本推理", seed=0):
+    """构造包含 n_rows 行性能数据的合成项目（并发 × 输入/输出长度 × 厂家扫描）"""
+    rnd = random.Random(seed)
+    project = ProjectModel.empty()
+    project.info = ProjectInfo.from_dict({
+        "project_name": f"基准测试-{n_rows}",
+        "vendor_str": "、".join(f"{v}（{g}）" for v, g in BENCH_VENDORS),
+    })
+    project.selected_models = list(BENCH_MODELS)
+    project.model_test_type_map = {m: [test_type] for m in BENCH_MODELS}
+
+    input_fields, calc_fields = PERF_FIELDS_MAP[test_type]
+    for model in BENCH_MODELS:
+        for vendor, gpu in BENCH_VENDORS:
+            project.env_data.append({
+                "model": model, "test_type": test_type, "vendor": vendor, "gpu": gpu,
+                "gpu_count": "8", "dataset": "sharegpt", "tool": "evalscope",
+                "is_dynamic": False, "id": str(uuid.uuid4()),
+            })
+        project.pk_data.append({
+            "id": str(uuid.uuid4()), "model": model, "test_type": test_type,
+            "pk_options": input_fields + calc_fields,
+            "selected_pk": ",".join(input_fields[4:] + calc_fields),
+        })
+
+    for i in range(n_rows):
+        env = project.env_data[i % len(project.env_data)]
+        concurrency = 2 ** rnd.randint(0, 8)
+        inp = rnd.choice([128, 512, 1024, 2048, 4096, 8192])
+        out = rnd.choice([128, 512, 1024, 2048])
+        values = {
+            "客户端设置并发": str(concurrency),
+            "实际并发": str(max(1, concurrency - rnd.randint(0, concurrency // 4))),
+            "输入长度（tokens）": str(inp),
+            "输出长度（tokens）": str(out),
+            "TTFT（ms）": f"{rnd.uniform(100, 5000):.1f}",
+            "TPOT（ms）": f"{rnd.uniform(10, 120):.1f}",
+            "总吞吐（tokens/s）": f"{rnd.uniform(500, 20000):.1f}",
+        }
+        project.perf_data.append({
+            "id": str(uuid.uuid4()),
+            "model": env["model"],
+            "test_type": test_type,
+            "vendor": env["vendor"],
+            "gpu": env["gpu"],
+            "dataset": env["dataset"],
+            "gpu_count": env["gpu_count"],
+            "input_fields": input_fields,
+            "calc_fields": calc_fields,
+            "input_values": {f: values.get(f, "") for f in input_fields},
+            "calc_values": {f: "" for f in calc_fields},
+        })
+    return project
+
+
+def measure(func, *args, **kwargs):
+    """返回 (耗时秒, 峰值内存MB)：先计时运行一次，再在 tracemalloc 下运行一次取峰值"""
+    start = time.perf_counter()
+    func(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    try:
+        func(*args, **kwargs)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return elapsed, peak / (1024 * 1024)
+
+
+def bench_excel(sizes):
+    """内存工作簿 vs 流式只写工作簿"""
+    from excel_export import ExcelExporter
+
+    print(f"{'行数':>8} {'模式':<8} {'耗时(s)':>9} {'峰值内存(MB)':>13}")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.xlsx")
+        for n in sizes:
+            project = make_synthetic_project(n)
+            for label, write_only in (("内存", False), ("流式", True)):
+                elapsed, peak = measure(ExcelExporter.write_report, path, project, write_only=write_only)
+                print(f"{n:>8} {label:<8} {elapsed:>9.2f} {peak:>13.1f}")
+
+
+def legacy_calculate_throughput(perf_data):
+    """逐行计算吞吐的旧实现（仅作基准对照）"""
+    for perf_row in perf_data:
+        tt = perf_row["test_type"]
+        if tt not in ["文本推理", "图文推理"]:
+            continue
+
+        input_vals = perf_row["input_values"]
+        required_fields = ["输入长度（tokens）", "输出长度（tokens）", "总吞吐（tokens/s）"]
+        if not all(f in input_vals for f in required_fields):
+            continue
+
+        try:
+            input_len = float(input_vals["输入长度（tokens）"] or 0)
+            output_len = float(input_vals["输出长度（tokens）"] or 0)
+            total_throughput = float(input_vals["总吞吐（tokens/s）"] or 0)
+            gpu_count = float(perf_row["gpu_count"] or 1)
+        except ValueError:
+            continue
+
+        if input_len + output_len > 0:
+            total_output_throughput = total_throughput * (output_len / (input_len + output_len))
+        else:
+            total_output_throughput = 0
+        single_card_throughput = total_output_throughput / gpu_count if gpu_count > 0 else 0
+
+        perf_row["calc_values"]["总输出吞吐（tokens/s）"] = f"{total_output_throughput:.2f}"
+        perf_row["calc_values"]["单卡输出吞吐（tokens/s）"] = f"{single_card_throughput:.2f}"
+
+
+def bench_calc(sizes):
+    """吞吐计算：逐行循环 vs 派生指标引擎（numpy / array）"""
+    from derived_metrics import DerivedMetricEngine, load_numpy
+
+    variants = [("逐行循环", legacy_calculate_throughput)]
+    if load_numpy() is not None:
+        variants.append(("列式numpy", lambda rows: DerivedMetricEngine.calculate(rows, use_numpy=True)))
+    variants.append(("列式array", lambda rows: DerivedMetricEngine.calculate(rows, use_numpy=False)))
+
+    print(f"{'行数':>8} {'实现':<10} {'耗时(s)':>9} {'峰值内存(MB)':>13}")
+    for n in sizes:
+        project = make_synthetic_project(n)
+        for label, func in variants:
+            elapsed, peak = measure(func, project.perf_data)
+            print(f"{n:>8} {label:<10} {elapsed:>9.3f} {peak:>13.1f}")
+
+
+def legacy_performance_analysis_h3c(summary_parts, project, progress=None):
+    """逐 H3C 行/GPU/场景重复扫描的旧实现（仅作基准对照；要求每个分组都已选择 PK 指标）"""
+    from summary_generator import SummaryGenerator
+
+    perf_data = project.perf_data
+    pk_data = project.pk_data
+
+    if not perf_data:
+        summary_parts.append("- 暂无性能数据可用于对比分析。")
+        return
+
+    # 按 (model, test_type) 分组
+    groups = {}
+    for row in perf_data:
+        key = (row.get("model", ""), row.get("test_type", ""))
+        groups.setdefault(key, []).append(row)
+
+    for (model, test_type), rows in groups.items():
+        if progress:
+            progress(1, 4, f"性能数据对比：{model} / {test_type}")
+        summary_parts.append(f"### 模型：{model} / 测试类型：{test_type}")
+
+        # 找到 H3C 条目
+        h3c_rows = [r for r in rows if SummaryGenerator._is_h3c_vendor(r.get("vendor", ""))]
+        if not h3c_rows:
+            summary_parts.append("- 无 H3C 厂商 GPU 卡的数据；跳过本模型的 H3C 对比。")
+            summary_parts.append("")
+            continue
+
+        # 将其他厂商按 (vendor, gpu) 分组
+        others = [r for r in rows if not SummaryGenerator._is_h3c_vendor(r.get("vendor", ""))]
+        other_groups = {}
+        for r in others:
+            other_groups.setdefault((r.get("vendor", ""), r.get("gpu", "")), []).append(r)
+
+        # H3C 可能有多款 GPU，需要分别对每款 GPU 进行对比
+        h3c_gpu_types = {}
+        for r in h3c_rows:
+            h3c_gpu_types.setdefault(r.get("gpu", ""), []).append(r)
+
+            # 使用 PK 表中为该 (model, test_type) 选择的指标作为对比指标
+            # 如果未选择任何 PK 指标，则跳过本模型/测试类型的对比（按用户要求只体现 PK 指标）
+            pk_map = {(p.get("model"), p.get("test_type")): p.get("selected_pk") for p in pk_data}
+            selected_pk_raw = pk_map.get((model, test_type))
+            if not selected_pk_raw:
+                summary_parts.append("- 未在 PK 表中选择对比指标，跳过本模型/测试类型的 PK 对比。")
+                summary_parts.append("")
+                continue
+
+            # 允许用户在 PK 表中用逗号分隔选择多个指标
+            metric_keys = set([k.strip() for k in str(selected_pk_raw).split(",") if k.strip()])
+
+        def _mean_numeric(values):
+            nums = []
+            for v in values:
+                try:
+                    nums.append(float(v))
+                except Exception:
+                    continue
+            return sum(nums) / len(nums) if nums else None
+
+        # 文本类场景拆分需要额外处理
+        is_text = test_type in ("文本推理", "图文推理")
+
+        for h3c_gpu, h3c_list in h3c_gpu_types.items():
+            summary_parts.append(f"- 基准：H3C GPU 型号 {h3c_gpu}（样本数 {len(h3c_list)}）")
+
+            # 准备 H3C 指标均值（仅针对 PK 指标）
+            h3c_metrics = {}
+            for k in metric_keys:
+                vals = []
+                for r in h3c_list:
+                    v = r.get("calc_values", {}).get(k)
+                    if v is None:
+                        v = r.get("input_values", {}).get(k)
+                    if v is not None and str(v).strip() != "":
+                        vals.append(v)
+                h3c_metrics[k] = _mean_numeric(vals)
+
+            # 针对文本类模型按场景拆分
+            if is_text:
+                # 三个固定场景：短输入长输出、长输入短输出、总上下文长度分级
+                scenarios = {
+                    "短输入长输出": [],
+                    "长输入短输出": [],
+                    "总上下文短( <4096 )": [],
+                    "总上下文中(4096-8191)": [],
+                    "总上下文长( >=8192 )": [],
+                }
+                for r in rows:
+                    iv = r.get("input_values", {})
+                    try:
+                        inp = float(iv.get("输入长度（tokens）", 0) or 0)
+                        out = float(iv.get("输出长度（tokens）", 0) or 0)
+                    except Exception:
+                        inp = out = 0
+                    total = inp + out
+                    if inp < out:
+                        scenarios["短输入长输出"].append(r)
+                    elif inp > out:
+                        scenarios["长输入短输出"].append(r)
+
+                    if total < 4096:
+                        scenarios["总上下文短( <4096 )"].append(r)
+                    elif 4096 <= total <= 8191:
+                        scenarios["总上下文中(4096-8191)"].append(r)
+                    else:
+                        scenarios["总上下文长( >=8192 )"].append(r)
+
+                for scen_name, scen_rows in scenarios.items():
+                    if not scen_rows:
+                        continue
+                    summary_parts.append(f"  - 场景：{scen_name}（样本数 {len(scen_rows)}）")
+                    # 计算场景内 H3C 均值
+                    scen_h3c = [r for r in scen_rows if SummaryGenerator._is_h3c_vendor(r.get("vendor", "")) and r.get("gpu", "") == h3c_gpu]
+                    if not scen_h3c:
+                        summary_parts.append("    - 本场景下无 H3C 数据，跳过。")
+                        continue
+                    scen_h3c_metrics = {}
+                    for k in metric_keys:
+                        vals = []
+                        for r in scen_h3c:
+                            v = r.get("calc_values", {}).get(k) or r.get("input_values", {}).get(k)
+                            if v is not None and str(v).strip() != "":
+                                vals.append(v)
+                        scen_h3c_metrics[k] = _mean_numeric(vals)
+
+                    # 对比场景内其他厂商
+                    other_by_gpu = {}
+                    for r in scen_rows:
+                        if SummaryGenerator._is_h3c_vendor(r.get("vendor", "")):
+                            continue
+                        other_by_gpu.setdefault((r.get("vendor", ""), r.get("gpu", "")), []).append(r)
+
+                    for (ovendor, ogpu), orows in other_by_gpu.items():
+                        summary_parts.append(f"    - 对比对象：{ovendor} / GPU {ogpu}（样本数 {len(orows)}）")
+                        for k in sorted(metric_keys):
+                            hval = scen_h3c_metrics.get(k)
+                            ovals = [row.get("calc_values", {}).get(k) or row.get("input_values", {}).get(k) for row in orows]
+                            oval = _mean_numeric(ovals)
+                            if hval is None or oval is None:
+                                continue
+                            try:
+                                diff = hval - oval
+                                ratio = hval / oval if oval != 0 else float('inf')
+                            except Exception:
+                                continue
+                            summary_parts.append(f"      - 指标 {k}：H3C {hval:.2f} vs {ovendor} {oval:.2f}（差值 {diff:+.2f}，倍数 {ratio:.2f}x）")
+
+            # 非文本或总体对比
+            else:
+                # 对比所有其他厂商的每个 GPU
+                for (ovendor, ogpu), orows in other_groups.items():
+                    summary_parts.append(f"  - 对比对象：{ovendor} / GPU {ogpu}（样本数 {len(orows)}）")
+                    # 计算 other 的均值
+                    other_metrics = {}
+                    for k in metric_keys:
+                        vals = []
+                        for r in orows:
+                            v = r.get("calc_values", {}).get(k) or r.get("input_values", {}).get(k)
+                            if v is not None and str(v).strip() != "":
+                                vals.append(v)
+                        other_metrics[k] = _mean_numeric(vals)
+
+                    # 输出每个指标对比（以 H3C 均值为准）
+                    for k in sorted(metric_keys):
+                        hval = h3c_metrics.get(k)
+                        oval = other_metrics.get(k)
+                        if hval is None or oval is None:
+                            continue
+                        try:
+                            diff = hval - oval
+                            ratio = hval / oval if oval != 0 else float('inf')
+                        except Exception:
+                            continue
+                        summary_parts.append(f"    - 指标 {k}：H3C {hval:.2f} vs {ovendor} {oval:.2f}（差值 {diff:+.2f}，倍数 {ratio:.2f}x）")
+
+            summary_parts.append("")
+
+
+def _legacy_comparable(lines):
+    """旧实现只有均值对比：去掉新增的排名/曲线/对齐表/分布/计分行与胜负标注后再比较"""
+    extra = (
+        "- 厂商排名", "- 分布：", "- 计分：", "越高越好）：", "越低越好）：",
+        "- 延迟-吞吐曲线", "个测试点）：", " 前沿：", "- SLO 内最大吞吐排名",
+        "- 对齐并发对比", "测试点不足，只列出",
+    )
+    kept = []
+    for i, line in enumerate(lines):
+        if any(marker in line for marker in extra) or line.startswith("|"):
+            continue
+        # 对齐表前后的空行
+        if not line and any(0 <= j < len(lines) and lines[j].startswith("|") for j in (i - 1, i + 1)):
+            continue
+        kept.append(re.sub(r"，(H3C (领先|落后) [\d.]+%|持平)）$", "）", line))
+    return kept
+
+
+def bench_summary(sizes):
+    """H3C 对比总结：逐行重复扫描 vs 一次遍历的预聚合索引"""
+    from data_manager import DataManager
+    from numeric_cache import NumericCache
+    from summary_generator import SummaryGenerator
+
+    print(f"{'行数':>8} {'实现':<10} {'耗时(s)':>9} {'峰值内存(MB)':>13} {'输出一致':>8}")
+    for n in sizes:
+        project = make_synthetic_project(n)
+        DataManager.calculate_throughput(project.perf_data)
+        outputs = {}
+        for label, func in (
+            ("逐行扫描", legacy_performance_analysis_h3c),
+            ("预聚合索引", lambda parts, p: parts.extend(SummaryGenerator._iter_performance_analysis_h3c(p))),
+        ):
+            parts = []
+            elapsed, peak = measure(lambda: (parts.clear(), func(parts, project)))
+            outputs[label] = _legacy_comparable(parts)
+            same = "是" if len(outputs) == 1 or outputs[label] == outputs["逐行扫描"] else "否"
+            print(f"{n:>8} {label:<10} {elapsed:>9.3f} {peak:>13.1f} {same:>8}")
+
+        # 数值缓存：清空影子后首次生成应全部未命中，再次生成应全部命中
+        for row in project.perf_data:
+            NumericCache.invalidate(row)
+        runs = []
+        for _ in range(2):
+            NumericCache.reset_stats()
+            start = time.perf_counter()
+            list(SummaryGenerator._iter_performance_analysis_h3c(project))
+            runs.append((time.perf_counter() - start, NumericCache.stats()))
+        for label, (elapsed, stats) in zip(("首次生成", "再次生成"), runs):
+            print(
+                f"{'':>8} 数值缓存·{label}：命中 {stats['hits']}，未命中 {stats['misses']}，"
+                f"命中率 {stats['hit_rate']:.1%}，耗时 {elapsed:.3f}s"
+            )
+
+
+def bench_journal(sizes, edits):
+    """自动保存日志：Tk线程登记开销、落盘延迟、日志大小与压缩耗时"""
+    from autosave import AutosaveJournal
+    from project_store import ProjectStore
+
+    print(f"{'行数':>8} {'编辑数':>6} {'登记(ms/次)':>11} {'平均延迟(ms)':>12} {'最大延迟(ms)':>12} "
+          f"{'刷盘次数':>8} {'日志(KB)':>9} {'压缩(s)':>8}")
+    rnd = random.Random(0)
+    for n in sizes:
+        project = make_synthetic_project(n)
+        with tempfile.TemporaryDirectory() as tmp:
+            base = ProjectStore.save(os.path.join(tmp, "base.gpuproj"), project)
+            journal = AutosaveJournal(os.path.join(tmp, "autosave"), compact_entries=edits + 1,
+                                      compact_bytes=float("inf"), compact_seconds=float("inf")).start()
+            journal.rebase(base, base)
+
+            field = "TTFT（ms）"
+            start = time.perf_counter()
+            for i in range(edits):
+                position = rnd.randrange(n)
+                row = project.perf_data[position]
+                row["input_values"][field] = f"{rnd.uniform(100, 5000):.1f}"
+                journal.record_row("perf_data", "put", row, position)
+            record_ms = (time.perf_counter() - start) * 1000 / edits
+            while journal.stats()["written"] < edits:
+                time.sleep(0.01)
+            stats = journal.stats()
+
+            # 再登记一条使日志达到压缩阈值，等待写入线程完成压缩
+            journal.record_row("perf_data", "put", project.perf_data[0], 0)
+            while journal.stats()["compactions"] == 0 and journal.stats()["error"] is None:
+                time.sleep(0.01)
+            compaction = journal.stats()["last_compaction_s"]
+            journal.close(clean=True)
+            print(
+                f"{n:>8} {edits:>6} {record_ms:>11.3f} {stats['mean_latency_ms']:>12.2f} "
+                f"{stats['max_latency_ms']:>12.2f} {stats['flushes']:>8} {stats['journal_bytes'] / 1024:>9.1f} "
+                f"{compaction:>8.2f}"
+            )
+
+
+def bench_import(sizes):
+    """性能数据批量导入：CSV / JSONL 结果文件的解析吞吐与峰值内存"""
+    import csv
+    import json
+
+    from perf_import import PerfImporter
+
+    columns = ["model", "vendor", "gpu", "concurrency", "input_tokens", "output_tokens",
+               "ttft_ms", "tpot_ms", "total_throughput"]
+    fields = ["客户端设置并发", "输入长度（tokens）", "输出长度（tokens）", "TTFT（ms）", "TPOT（ms）", "总吞吐（tokens/s）"]
+    print(f"{'行数':>8} {'格式':>6} {'文件(MB)':>9} {'耗时(s)':>8} {'行/秒':>10} {'峰值内存(MB)':>12}")
+    for n in sizes:
+        project = make_synthetic_project(n)
+        records = (
+            [row["model"], row["vendor"], row["gpu"]] + [row["input_values"][f] for f in fields]
+            for row in project.perf_data
+        )
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = os.path.join(tmp, "results.csv")
+            jsonl_path = os.path.join(tmp, "results.jsonl")
+            with open(csv_path, "w", encoding="utf-8", newline="") as f_csv, \
+                    open(jsonl_path, "w", encoding="utf-8") as f_jsonl:
+                writer = csv.writer(f_csv)
+                writer.writerow(columns)
+                for record in records:
+                    writer.writerow(record)
+                    f_jsonl.write(json.dumps(dict(zip(columns, record)), ensure_ascii=False) + "\n")
+
+            for label, path in (("CSV", csv_path), ("JSONL", jsonl_path)):
+                result = PerfImporter.import_file(path, project.env_data)
+                assert len(result.rows) == n, result.summary_lines()
+                del result.rows[:]
+                # tracemalloc 本身会明显拖慢解析，峰值内存单独再导入一次测量
+                tracemalloc.start()
+                PerfImporter.import_file(path, project.env_data)
+                _current, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                print(
+                    f"{n:>8} {label:>6} {os.path.getsize(path) / 1e6:>9.1f} {result.elapsed:>8.2f} "
+                    f"{result.rows_per_second:>10,.0f} {peak / 1e6:>12.1f}"
+                )
+
+
+def bench_reimport(sizes):
+    """Excel报告往返：导出后用 ExcelImporter 读回（只读流式）的耗时"""
+    from excel_export import ExcelExporter
+    from excel_import import ExcelImporter
+
+    print(f"{'行数':>8} {'文件(MB)':>9} {'导出(s)':>8} {'读回(s)':>8} {'行/秒':>10}")
+    for n in sizes:
+        project = make_synthetic_project(n)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "report.xlsx")
+            start = time.perf_counter()
+            ExcelExporter.write_report(path, project)
+            export_s = time.perf_counter() - start
+
+            start = time.perf_counter()
+            loaded, _warnings = ExcelImporter.read_report(path)
+            read_s = time.perf_counter() - start
+            assert len(loaded.perf_data) == n
+            print(f"{n:>8} {os.path.getsize(path) / 1e6:>9.1f} {export_s:>8.2f} {read_s:>8.2f} {n / read_s:>10,.0f}")
+
+
+def bench_history(sizes, projects):
+    """历史结果库：逐项目单事务写入耗时与跨项目汇总 / 趋势查询耗时"""
+    from history_store import HistoryStore
+
+    test_type = "文本推理"
+    field = PERF_FIELDS_MAP[test_type][0][-1]
+    print(f"{'每项目行数':>10} {'项目数':>6} {'总行数':>10} {'写入(行/秒)':>12} {'库(MB)':>8} {'汇总(ms)':>9} {'趋势(ms)':>9} {'全部项目汇总(ms)':>16}")
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "history.sqlite")
+            record_s = 0.0
+            for i in range(projects):
+                project = make_synthetic_project(n, test_type, seed=i)
+                start = time.perf_counter()
+                HistoryStore.record(project, f"bench-{i}.gpuproj", path)
+                record_s += time.perf_counter() - start
+
+            def timed(func, *args, **kwargs):
+                start = time.perf_counter()
+                result = func(*args, **kwargs)
+                assert result
+                return (time.perf_counter() - start) * 1000
+
+            model = BENCH_MODELS[0]
+            summary_ms = timed(HistoryStore.summary, model, test_type, field, path=path)
+            trend_ms = timed(HistoryStore.trend, model, test_type, field, vendor=BENCH_VENDORS[0][0], path=path)
+            all_ms = timed(HistoryStore.summary, model, test_type, field, last=None, path=path)
+            total = n * projects
+            size_mb = sum(os.path.getsize(os.path.join(tmp, f)) for f in os.listdir(tmp)) / 1e6
+            print(f"{n:>10} {projects:>6} {total:>10} {total / record_s:>12,.0f} {size_mb:>8.1f} "
+                  f"{summary_ms:>9.1f} {trend_ms:>9.1f} {all_ms:>16.1f}")
+
+
+# 在全新解释器中执行：导入 gui → 创建主窗口 → 处理完首帧绘制，输出各阶段耗时（JSON）
+_STARTUP_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import tkinter as tk
+from gui import GPUFullInfoGUI
+result = {"import_ms": (time.perf_counter() - start) * 1000, "paint_ms": None}
+try:
+    root = tk.Tk()
+except tk.TclError:  # 无显示环境：只统计导入耗时
+    root = None
+if root is not None:
+    app = GPUFullInfoGUI(root)
+    loaded = [m for m in MODULES if m in sys.modules]
+    root.update()
+    result["paint_ms"] = (time.perf_counter() - start) * 1000
+    pending = [root]
+    while pending:
+        widget = pending.pop()
+        result["widgets"] = result.get("widgets", 0) + 1
+        pending.extend(widget.winfo_children())
+    app.on_close()
+else:
+    loaded = [m for m in MODULES if m in sys.modules]
+result["loaded"] = loaded
+print(json.dumps(result))
+"""
+
+
+def bench_startup(repeat, budget_ms, import_budget_ms, record=False, baseline_path=STARTUP_BASELINE_PATH):
+    """冷启动：导入耗时、首帧绘制耗时与控件数（需要显示环境），以及首帧前是否导入了应延迟的模块
+
+    每次在全新子进程中启动（自动保存目录指向临时目录，不会弹出恢复提示）。
+    record 为 True 时把本次导入/首帧耗时的中位数写入 baseline_path 作为基线。否则有基线时
+    以基线 × STARTUP_REGRESSION_FACTOR 为上限，没有基线时以 import_budget_ms / budget_ms 为上限
+    （无显示环境时只检查导入耗时）。超出上限或首帧前导入了 STARTUP_DEFERRED_MODULES 中的
+    模块时返回 1。
+    """
+    root_dir = os.path.dirname(os.path.abspath(__file__))
+    probe = f"MODULES = {STARTUP_DEFERRED_MODULES!r}\n" + _STARTUP_PROBE
+    results = []
+    with tempfile.TemporaryDirectory() as home:
+        env = dict(os.environ, HOME=home, USERPROFILE=home)
+        for _ in range(repeat):
+            out = subprocess.run(
+                [sys.executable, "-c", probe], cwd=root_dir, env=env,
+                capture_output=True, text=True, check=True,
+            ).stdout
+            results.append(json.loads(out.strip().splitlines()[-1]))
+
+    import_ms = statistics.median(r["import_ms"] for r in results)
+    paints = [r["paint_ms"] for r in results if r["paint_ms"] is not None]
+    paint_ms = statistics.median(paints) if paints else None
+    loaded = sorted({m for r in results for m in r["loaded"]})
+
+    baseline = None
+    if record:
+        os.makedirs(os.path.dirname(os.path.abspath(baseline_path)), exist_ok=True)
+        with open(baseline_path, "w", encoding="utf-8") as f:
+            json.dump({"import_ms": import_ms, "paint_ms": paint_ms, "recorded_at": time.time()}, f)
+    elif os.path.isfile(baseline_path):
+        with open(baseline_path, encoding="utf-8") as f:
+            baseline = json.load(f)
+    if baseline is not None:
+        limit_source = f"基线 ×{STARTUP_REGRESSION_FACTOR:g}"
+        import_limit = baseline["import_ms"] * STARTUP_REGRESSION_FACTOR
+        paint_limit = baseline["paint_ms"] * STARTUP_REGRESSION_FACTOR if baseline.get("paint_ms") else None
+    else:
+        limit_source = "已记录为基线" if record else "固定预算"
+        import_limit, paint_limit = import_budget_ms, budget_ms
+
+    print(f"{'次数':>4} {'导入(ms)':>9} {'首帧(ms)':>9} {'控件数':>7} {'导入上限':>9} {'首帧上限':>9}  首帧前已导入")
+    if paint_ms is not None:
+        paint_text = f"{paint_ms:>9.0f} {results[-1]['widgets']:>7}"
+    else:
+        paint_text = f"{'无显示':>9} {'-':>7}"
+    paint_limit_text = "-" if paint_limit is None else f"{paint_limit:.0f}"
+    print(f"{repeat:>4} {import_ms:>9.0f} {paint_text} {import_limit:>9.0f} {paint_limit_text:>9}  "
+          f"{'、'.join(loaded) or '无'}")
+    print(f"上限来源：{limit_source}（{baseline_path}）" if baseline is not None or record else f"上限来源：{limit_source}")
+
+    failures = []
+    if not record:
+        if import_ms > import_limit:
+            failures.append(f"导入耗时 {import_ms:.0f} ms 超出上限 {import_limit:.0f} ms（{limit_source}）")
+        if paint_ms is not None and paint_limit is not None and paint_ms > paint_limit:
+            failures.append(f"首帧耗时 {paint_ms:.0f} ms 超出上限 {paint_limit:.0f} ms（{limit_source}）")
+    if loaded:
+        failures.append(f"首帧前导入了应延迟的模块：{'、'.join(loaded)}")
+    for message in failures:
+        print(f"[FAIL] {message}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="GPU性能测试工具基准测试")
+    sub = parser.add_subparsers(dest="bench", required=True)
+
+    p_excel = sub.add_parser("excel", help="Excel导出：内存工作簿 vs 流式只写工作簿")
+    p_excel.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+
+    p_calc = sub.add_parser("calc", help="吞吐计算：逐行循环 vs 派生指标引擎（列式批量计算）")
+    p_calc.add_argument("--sizes", type=int, nargs="+", default=[100000])
+
+    p_summary = sub.add_parser("summary", help="H3C 对比总结：逐行重复扫描 vs 预聚合索引")
+    p_summary.add_argument("--sizes", type=int, nargs="+", default=[50000])
+
+    p_journal = sub.add_parser("journal", help="自动保存日志：登记开销、落盘延迟与压缩耗时")
+    p_journal.add_argument("--sizes", type=int, nargs="+", default=[100000])
+    p_journal.add_argument("--edits", type=int, default=2000)
+
+    p_import = sub.add_parser("import", help="性能数据批量导入：CSV / JSONL 解析吞吐与峰值内存")
+    p_import.add_argument("--sizes", type=int, nargs="+", default=[100000, 300000])
+
+    p_reimport = sub.add_parser("reimport", help="Excel报告往返：导出后读回为项目的耗时")
+    p_reimport.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+
+    p_history = sub.add_parser("history", help="历史结果库：多项目写入与跨项目汇总/趋势查询耗时")
+    p_history.add_argument("--sizes", type=int, nargs="+", default=[50000])
+    p_history.add_argument("--projects", type=int, default=20)
+
+    p_startup = sub.add_parser("startup", help="冷启动：导入与首帧绘制耗时（超出基线或预算时返回非零）")
+    p_startup.add_argument("--repeat", type=int, default=5)
+    p_startup.add_argument("--record", action="store_true", help="把本次结果记录为基线")
+    p_startup.add_argument("--baseline", default=STARTUP_BASELINE_PATH)
+    p_startup.add_argument("--import-budget-ms", type=int, default=STARTUP_IMPORT_BUDGET_MS)
+    p_startup.add_argument("--budget-ms", type=int, default=STARTUP_BUDGET_MS)
+
+    args = parser.parse_args(argv)
+    if args.bench == "excel":
+        bench_excel(args.sizes)
+    elif args.bench == "calc":
+        bench_calc(args.sizes)
+    elif args.bench == "summary":
+        bench_summary(args.sizes)
+    elif args.bench == "journal":
+        bench_journal(args.sizes, args.edits)
+    elif args.bench == "import":
+        bench_import(args.sizes)
+    elif args.bench == "reimport":
+        bench_reimport(args.sizes)
+    elif args.bench == "history":
+        bench_history(args.sizes, args.projects)
+    elif args.bench == "startup":
+        return bench_startup(args.repeat, args.budget_ms, args.import_budget_ms, args.record, args.baseline)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+# change_batcher.py - 表格编辑的合并写回（防抖）
+from config import CHANGE_DEBOUNCE_MS
+
+
+class ChangeBatcher:
+    """合并表格单元格的编辑，输入停顿后统一写回数据行
+
+    每次按键通过 submit 登记为 (行id, 字段) → 最新值，同一单元格在窗口内的
+    多次编辑只保留最后一次；输入停顿 delay_ms 后 flush 一次性写回，并向订阅者
+    发出一次“行已变更”事件 listener(row_ids)。依赖数据的操作（计算、生成总结、
+    导出、切换步骤）应先调用 flush，保证读取到的是最新数据。
+
+    scheduler 只需提供 after / after_cancel（Tk 根窗口或任意控件）。
+    计数器：received 为收到的编辑次数，flushed 为实际写回的单元格数，
+    events 为发出的“行已变更”事件数。
+    """
+
+    def __init__(self, scheduler, delay_ms=CHANGE_DEBOUNCE_MS):
+        self.scheduler = scheduler
+        self.delay_ms = delay_ms
+        self._pending = {}  # (行id, 字段) → (写回函数, 值)
+        self._listeners = []
+        self._after_id = None
+
+        self.received = 0
+        self.flushed = 0
+        self.events = 0
+
+    def submit(self, row_id, field, value, apply):
+        """登记一次编辑；apply(value) 负责把值写入数据行"""
+        self.received += 1
+        self._pending[(row_id, field)] = (apply, value)
+        if self._after_id is not None:
+            self.scheduler.after_cancel(self._after_id)
+        self._after_id = self.scheduler.after(self.delay_ms, self.flush)
+
+    def subscribe(self, listener):
+        """订阅“行已变更”事件：listener(row_ids)，row_ids 按首次编辑顺序去重"""
+        self._listeners.append(listener)
+
+    @property
+    def pending_count(self):
+        """尚未写回的单元格数"""
+        return len(self._pending)
+
+    def flush(self):
+        """立即写回全部待写编辑并发出事件，返回写回的单元格数"""
+        self._cancel_timer()
+        if not self._pending:
+            return 0
+
+        pending, self._pending = self._pending, {}
+        changed = {}
+        for (row_id, _field), (apply, value) in pending.items():
+            apply(value)
+            changed[row_id] = None
+
+        self.flushed += len(pending)
+        self.events += 1
+        row_ids = list(changed)
+        for listener in list(self._listeners):
+            listener(row_ids)
+        return len(pending)
+
+    def discard(self):
+        """丢弃全部待写编辑（如重置项目时）"""
+        self._cancel_timer()
+        self._pending.clear()
+
+    def stats(self):
+        """计数器快照"""
+        return {
+            "received": self.received,
+            "flushed": self.flushed,
+            "events": self.events,
+            "pending": len(self._pending),
+        }
+
+    def _cancel_timer(self):
+        if self._after_id is not None:
+            self.scheduler.after_cancel(self._after_id)
+            self._after_id = None
@@ -1,4 +1,5 @@
 # config.py - 全局配置文件
+import os
 
 # ========== GUI窗口配置 ==========
 WINDOW_TITLE = "GPU性能测试数据录入工具"
@@ -21,19 +22,19 @@ PERF_FIELDS_MAP = {
     ),
     # 训练类
     "预训练": (
-        ["batch_size", "训练轮数", "训练时间（min）"],
-        [],
+        ["batch_size", "训练轮数", "每轮步数", "训练时间（min）"],
+        ["平均每轮时间（min）", "训练吞吐（samples/s）"],
     ),
     "lora微调": (
-        ["batch_size", "训练轮数", "训练时间（min）"],
-        [],
+        ["batch_size", "训练轮数", "每轮步数", "训练时间（min）"],
+        ["平均每轮时间（min）", "训练吞吐（samples/s）"],
     ),
     "全参微调": (
-        ["batch_size", "训练轮数", "训练时间（min）"],
-        [],
+        ["batch_size", "训练轮数", "每轮步数", "训练时间（min）"],
+        ["平均每轮时间（min）", "训练吞吐（samples/s）"],
     ),
     # 其他类
-    "图像识别": (["FPS"], []),
+    "图像识别": (["FPS"], ["单卡FPS"]),
     "语音推理": (["推理时间（ms）"], []),
     "文档排序": (["推理时间（ms）"], []),
     "特征提取": (["推理时间（ms）"], []),
@@ -41,4 +42,168 @@ PERF_FIELDS_MAP = {
 }
 
 # 默认配置
-DEFAULT_PERF_FIELDS = (["未配置测试类型字段"], [])
\ No newline at end of file
+DEFAULT_PERF_FIELDS = (["未配置测试类型字段"], [])
+
+# 性能数据分类 → 测试类型（决定导出到哪个性能数据Sheet）
+PERF_CATEGORY_MAP = {
+    "推理性能": [
+        "文本推理",
+        "图文推理",
+        "图像识别",
+        "语音推理",
+        "文档排序",
+        "特征提取",
+    ],
+    "训练性能": ["预训练", "lora微调", "全参微调"],
+    "精度测试": ["精度测试"],
+}
+
+# ========== 派生指标（计算字段）公式 ==========
+# 测试类型→{计算字段: 表达式}；表达式用 {字段名} 引用输入字段、同一测试类型的其它
+# 计算字段或 {gpu_count}（GPU数量），支持 + - * / 、括号、数字及 min/max/abs，
+# 除数为 0 时结果为 0。model_config.yaml 中的 derived_metrics 会合并到这里。
+_TOKEN_THROUGHPUT_METRICS = {
+    "总输出吞吐（tokens/s）": "{总吞吐（tokens/s）} * ({输出长度（tokens）} / ({输入长度（tokens）} + {输出长度（tokens）}))",
+    "单卡输出吞吐（tokens/s）": "{总输出吞吐（tokens/s）} / {gpu_count}",
+}
+# 训练类：训练轮数为 epoch 数，每轮步数为每个 epoch 的迭代步数（每步处理 batch_size 个样本）
+_TRAINING_METRICS = {
+    "平均每轮时间（min）": "{训练时间（min）} / {训练轮数}",
+    "训练吞吐（samples/s）": "{batch_size} * {每轮步数} * {训练轮数} / ({训练时间（min）} * 60)",
+}
+DERIVED_METRICS = {
+    "文本推理": dict(_TOKEN_THROUGHPUT_METRICS),
+    "图文推理": dict(_TOKEN_THROUGHPUT_METRICS),
+    "预训练": dict(_TRAINING_METRICS),
+    "lora微调": dict(_TRAINING_METRICS),
+    "全参微调": dict(_TRAINING_METRICS),
+    "图像识别": {"单卡FPS": "{FPS} / {gpu_count}"},
+}
+
+# ========== 指标元数据 ==========
+# 字段名→{"direction": "higher"（越高越好）/ "lower"（越低越好）, "unit": 单位,
+#          "per_card": 按单卡归一后的对应字段（可选，跨厂家排名时优先使用）}
+# 未声明或未给出 direction 的字段只做数值对比，不判定胜负、不参与排名。
+# model_config.yaml 中的 metric_meta 会合并到这里。
+METRIC_META = {
+    "客户端设置并发": {"unit": ""},
+    "实际并发": {"unit": ""},
+    "输入长度（tokens）": {"unit": "tokens"},
+    "输出长度（tokens）": {"unit": "tokens"},
+    "TTFT（ms）": {"direction": "lower", "unit": "ms"},
+    "TPOT（ms）": {"direction": "lower", "unit": "ms"},
+    "总吞吐（tokens/s）": {"direction": "higher", "unit": "tokens/s"},
+    "总输出吞吐（tokens/s）": {"direction": "higher", "unit": "tokens/s", "per_card": "单卡输出吞吐（tokens/s）"},
+    "单卡输出吞吐（tokens/s）": {"direction": "higher", "unit": "tokens/s"},
+    "batch_size": {"unit": ""},
+    "训练轮数": {"unit": ""},
+    "每轮步数": {"unit": ""},
+    "训练时间（min）": {"direction": "lower", "unit": "min"},
+    "平均每轮时间（min）": {"direction": "lower", "unit": "min"},
+    "训练吞吐（samples/s）": {"direction": "higher", "unit": "samples/s"},
+    "FPS": {"direction": "higher", "unit": "fps", "per_card": "单卡FPS"},
+    "单卡FPS": {"direction": "higher", "unit": "fps"},
+    "推理时间（ms）": {"direction": "lower", "unit": "ms"},
+    "得分（%）": {"direction": "higher", "unit": "%"},
+}
+
+# 胜负判定：相对优势不超过该比例视为持平
+METRIC_TIE_TOLERANCE = 0.01
+
+# ========== 文本类测试场景划分 ==========
+# 每个场景的条件同时满足时行归入该场景（一行可属于多个场景），列表顺序即报告中的顺序：
+# - relation：输入/输出长度关系，"input < output" / "input > output" / "input = output"
+# - input / output / total / concurrency：[下限, 上限) 区间，null 表示不限；
+#   total 为输入+输出长度，concurrency 依次取 CURVE_CONCURRENCY_FIELDS 中第一个有效值
+# model_config.yaml 中的 scenarios 会整体替换这里的定义。
+SCENARIO_DEFINITIONS = [
+    {"name": "短输入长输出", "relation": "input < output"},
+    {"name": "长输入短输出", "relation": "input > output"},
+    {"name": "总上下文短( <4096 )", "total": [None, 4096]},
+    {"name": "总上下文中(4096-8191)", "total": [4096, 8192]},
+    {"name": "总上下文长( >=8192 )", "total": [8192, None]},
+]
+
+# ========== 并发扫描曲线分析 ==========
+# 文本类推理按 (模型, 测试类型, 扫描配置, 厂家, GPU) 汇总各并发点，分析延迟-吞吐 Pareto 前沿：
+# 吞吐字段、并发字段（依次取第一个有效值）、延迟字段，以及 SLO（各延迟上限，单位同字段）。
+# 扫描配置为 CURVE_CONFIG_FIELDS 的取值（输入/输出长度），不同配置的测试点分属不同曲线
+CURVE_CONFIG_FIELDS = ("输入长度（tokens）", "输出长度（tokens）")
+CURVE_THROUGHPUT_FIELD = "单卡输出吞吐（tokens/s）"
+CURVE_CONCURRENCY_FIELDS = ("实际并发", "客户端设置并发")
+CURVE_LATENCY_FIELDS = ("TPOT（ms）", "TTFT（ms）")
+CURVE_SLO = {"TTFT（ms）": 2000, "TPOT（ms）": 50}
+# 对齐并发对比：各曲线按并发（对数刻度）线性插值到共同并发点。至少需要 CURVE_MIN_POINTS
+# 个不同并发的曲线才插值；共同并发点超过 CURVE_GRID_MAX 个时改为区间内按对数等分取点
+CURVE_MIN_POINTS = 2
+CURVE_GRID_MAX = 8
+
+# ========== 性能数据批量导入 ==========
+# 压测工具结果文件（CSV/JSON/JSONL）的列名 → 性能字段。列名比较时忽略大小写、空白、下划线、
+# 连字符与括号；性能字段名本身总可以直接作为列名
+PERF_IMPORT_COLUMNS = {
+    "客户端设置并发": ["concurrency", "parallel", "client_concurrency", "max_concurrency"],
+    "实际并发": ["actual_concurrency", "real_concurrency"],
+    "输入长度（tokens）": ["input_tokens", "input_len", "input_length", "prompt_tokens", "avg_input_tokens"],
+    "输出长度（tokens）": ["output_tokens", "output_len", "output_length", "completion_tokens", "avg_output_tokens"],
+    "TTFT（ms）": ["ttft", "ttft_ms", "avg_ttft_ms", "mean_ttft_ms"],
+    "TPOT（ms）": ["tpot", "tpot_ms", "avg_tpot_ms", "mean_tpot_ms"],
+    "总吞吐（tokens/s）": ["total_throughput", "total_token_throughput", "throughput", "tokens_per_second"],
+}
+# 用于匹配测试环境行的列（缺少的列由调用方给出缺省值，或在环境行中唯一匹配）
+PERF_IMPORT_KEY_COLUMNS = {
+    "model": ["model", "model_name", "模型"],
+    "test_type": ["test_type", "测试类型"],
+    "vendor": ["vendor", "厂家"],
+    "gpu": ["gpu", "gpu_type", "gpu_model", "GPU型号"],
+}
+# JSON 顶层对象中存放记录列表的键（该对象的其余标量字段作为其中每条记录的缺省值）
+PERF_IMPORT_RECORD_KEYS = ("results", "data", "records")
+
+# ========== Excel导出配置 ==========
+# 性能数据行数达到该阈值时自动使用流式（write_only）工作簿导出
+EXCEL_WRITE_ONLY_THRESHOLD = 5000
+
+# ========== 性能数据表格配置 ==========
+# 步骤4每个测试类型表格同时显示（实际创建控件）的行数，其余行滚动查看
+PERF_VISIBLE_ROWS = 15
+
+# ========== 编辑写回配置 ==========
+# 表格输入停顿多少毫秒后把累积的编辑统一写回数据行
+CHANGE_DEBOUNCE_MS = 300
+
+# ========== 自动保存与崩溃恢复 ==========
+# 变更日志与快照所在目录：每个程序实例使用其中自己的会话子目录（运行期间加锁），正常退出时删除；
+# 启动时发现锁已释放而日志仍在的会话（实例未正常退出）即提示恢复
+AUTOSAVE_DIR = os.path.join(os.path.expanduser("~"), ".gpu_perf_tool", "autosave")
+# 日志超过条数或字节数阈值、或距上次压缩超过 AUTOSAVE_COMPACT_SECONDS 秒且有新变更时，
+# 压缩为快照（项目文件）并清空日志
+AUTOSAVE_COMPACT_ENTRIES = 5000
+AUTOSAVE_COMPACT_BYTES = 4 * 1024 * 1024
+AUTOSAVE_COMPACT_SECONDS = 300
+
+# ========== 历史结果库 ==========
+# 各项目保存时写入的测试环境与性能数据（SQLite），供跨项目查询历史表现
+HISTORY_DB_PATH = os.path.join(os.path.expanduser("~"), ".gpu_perf_tool", "history.sqlite")
+# 历史查询缺省统计最近多少个项目
+HISTORY_RECENT_PROJECTS = 20
+# 指标序列除 (模型, 测试类型, 厂家, GPU, GPU数量) 外还按测试配置区分：取各行输入/输出长度与并发
+# （依次取第一个有效的并发字段，设置值优先于实测值）；均为空的行（如训练类）配置为空
+HISTORY_CONFIG_FIELDS = ("输入长度（tokens）", "输出长度（tokens）")
+HISTORY_CONCURRENCY_FIELDS = ("客户端设置并发", "实际并发")
+
+# ========== 启动 ==========
+# 首帧绘制后延迟多少毫秒，在后台线程预先导入导出/读取配置用到的较重模块（首次点击时不再等待）；
+# STARTUP_PREWARM_MODULES 为空则不预热
+STARTUP_PREWARM_DELAY_MS = 300
+STARTUP_PREWARM_MODULES = ("yaml", "numpy", "excel_export", "excel_import")
+# 启动基准（benchmark.py startup）：
+# - 首帧前不应导入的模块（numpy 在第一次计算时、总结生成器在第一次生成总结时才导入）
+# - `startup --record` 把本机导入与首帧耗时的中位数记为基线，之后任一项超过基线 ×
+#   STARTUP_REGRESSION_FACTOR 即判为回退
+# - 尚未记录基线时按固定预算（毫秒）：导入耗时（无显示环境实测约 65 ms）与首帧耗时
+STARTUP_DEFERRED_MODULES = ("openpyxl", "yaml", "numpy", "summary_generator")
+STARTUP_BASELINE_PATH = os.path.join(os.path.expanduser("~"), ".gpu_perf_tool", "startup_baseline.json")
+STARTUP_REGRESSION_FACTOR = 1.3
+STARTUP_IMPORT_BUDGET_MS = 100
+STARTUP_BUDGET_MS = 1000
@@ -0,0 +1,207 @@
+# curve_analysis.py - 并发扫描曲线分析（延迟-吞吐 Pareto 前沿、SLO 内最大吞吐、对齐并发对比）
+import math
+from bisect import bisect_left
+
+from aggregation import metric_value
+from config import (
+    CURVE_CONCURRENCY_FIELDS,
+    CURVE_CONFIG_FIELDS,
+    CURVE_GRID_MAX,
+    CURVE_LATENCY_FIELDS,
+    CURVE_MIN_POINTS,
+    CURVE_SLO,
+    CURVE_THROUGHPUT_FIELD,
+)
+
+
+class CurvePoint:
+    """曲线上的一个测试点：并发、吞吐及各延迟字段的值（无效的延迟字段不出现在 latency 中）"""
+
+    __slots__ = ("concurrency", "throughput", "latency")
+
+    def __init__(self, concurrency, throughput, latency):
+        self.concurrency = concurrency
+        self.throughput = throughput
+        self.latency = latency
+
+
+def pareto_frontier(points, latency_field):
+    """延迟越低、吞吐越高越好的 Pareto 前沿，按延迟升序返回
+
+    按 (延迟升序, 吞吐降序) 排序后一次遍历：吞吐严格高于此前所有点的点不被任何点支配。
+    缺少该延迟字段的点不参与。
+    """
+    candidates = [p for p in points if latency_field in p.latency]
+    candidates.sort(key=lambda p: (p.latency[latency_field], -p.throughput))
+    frontier = []
+    best = None
+    for point in candidates:
+        if best is None or point.throughput > best:
+            frontier.append(point)
+            best = point.throughput
+    return frontier
+
+
+def best_under_slo(points, slo):
+    """满足全部 SLO（各延迟 ≤ 上限）的点中吞吐最高者；缺少 SLO 延迟字段的点视为不满足"""
+    best = None
+    for point in points:
+        if all(field in point.latency and point.latency[field] <= limit for field, limit in slo.items()):
+            if best is None or point.throughput > best.throughput:
+                best = point
+    return best
+
+
+def concurrency_curve(points, value_of):
+    """按并发聚合为曲线 (并发列表, 均值列表)，并发升序；同一并发取均值
+
+    value_of(point) 返回该点的取值，为 None 或缺少并发的点跳过。
+    """
+    sums = {}
+    for point in points:
+        value = value_of(point)
+        if value is None or point.concurrency is None or point.concurrency <= 0:
+            continue
+        entry = sums.get(point.concurrency)
+        if entry is None:
+            sums[point.concurrency] = [value, 1]
+        else:
+            entry[0] += value
+            entry[1] += 1
+    xs = sorted(sums)
+    return xs, [sums[x][0] / sums[x][1] for x in xs]
+
+
+def interpolate(xs, ys, x):
+    """在曲线 (xs, ys) 上按并发的对数刻度线性插值；x 超出测试区间时返回 None（不外推）"""
+    i = bisect_left(xs, x)
+    if i < len(xs) and xs[i] == x:
+        return ys[i]
+    if i == 0 or i == len(xs):
+        return None
+    x0, x1 = math.log(xs[i - 1]), math.log(xs[i])
+    t = (math.log(x) - x0) / (x1 - x0)
+    return ys[i - 1] + (ys[i] - ys[i - 1]) * t
+
+
+def common_grid(curves, max_points=CURVE_GRID_MAX):
+    """各曲线共同覆盖的并发区间内的对齐点
+
+    取各曲线测试过的并发并集中落在 [最大的起点, 最小的终点] 内的值；超过 max_points 个时
+    改为区间内按对数等分取 max_points 个点。区间不重叠时返回空列表。
+    """
+    lo = max(xs[0] for xs, _ys in curves)
+    hi = min(xs[-1] for xs, _ys in curves)
+    if lo > hi:
+        return []
+    grid = sorted({x for xs, _ys in curves for x in xs if lo <= x <= hi})
+    if len(grid) > max_points:
+        step = (math.log(hi) - math.log(lo)) / (max_points - 1)
+        grid = [round(math.exp(math.log(lo) + step * i), 2) for i in range(max_points)]
+        grid[0], grid[-1] = lo, hi
+    return grid
+
+
+def format_config(config, fields=CURVE_CONFIG_FIELDS):
+    """扫描配置的显示文本，如 "输入长度（tokens） 1024 / 输出长度（tokens） 2048"；缺失的取值显示为 —"""
+    return " / ".join(f"{field} {'—' if value is None else f'{value:g}'}" for field, value in zip(fields, config))
+
+
+class CurveAnalysis:
+    """按 (模型, 测试类型, 扫描配置, 厂家, GPU) 汇总并发扫描曲线
+
+    扫描配置为各行 config_fields（输入/输出长度）的取值：同一并发下不同输入/输出长度的
+    测试点属于不同的扫描，分开成曲线，避免在同一并发上取均值时混在一起。
+    一次遍历 perf_data 收集各组的测试点（吞吐无效的行跳过），之后每组按延迟排序一次
+    计算 Pareto 前沿，并找出 SLO 内的最大吞吐。
+
+    - test_types：参与分析的测试类型（文本推理 / 图文推理）
+    - 吞吐、并发、延迟、扫描配置字段与 SLO 缺省取 config 中的 CURVE_* 配置
+    """
+
+    def __init__(self, perf_data, test_types, throughput_field=CURVE_THROUGHPUT_FIELD,
+                 latency_fields=CURVE_LATENCY_FIELDS, slo=None, concurrency_fields=CURVE_CONCURRENCY_FIELDS,
+                 config_fields=CURVE_CONFIG_FIELDS):
+        self.throughput_field = throughput_field
+        self.latency_fields = tuple(latency_fields)
+        self.config_fields = tuple(config_fields)
+        self.slo = dict(CURVE_SLO if slo is None else slo)
+        self._curves = {}  # (模型, 测试类型, 扫描配置, 厂家, GPU) → [CurvePoint]，保持首次出现顺序
+
+        for row in perf_data:
+            if row.get("test_type") not in test_types:
+                continue
+            throughput = metric_value(row, throughput_field)
+            if throughput is None:
+                continue
+            concurrency = None
+            for field in concurrency_fields:
+                concurrency = metric_value(row, field)
+                if concurrency is not None:
+                    break
+            latency = {}
+            for field in self.latency_fields:
+                value = metric_value(row, field)
+                if value is not None:
+                    latency[field] = value
+            config = tuple(metric_value(row, field) for field in self.config_fields)
+            key = (row.get("model", ""), row.get("test_type", ""), config, row.get("vendor", ""), row.get("gpu", ""))
+            self._curves.setdefault(key, []).append(CurvePoint(concurrency, throughput, latency))
+
+    def configs(self, model, test_type):
+        """该 (模型, 测试类型) 下有曲线数据的扫描配置，按输入/输出长度升序（缺失的取值排在最后）"""
+        configs = {config for (m, tt, config, _vendor, _gpu) in self._curves if (m, tt) == (model, test_type)}
+        return sorted(configs, key=lambda config: [(value is None, value or 0) for value in config])
+
+    def format_config(self, config):
+        return format_config(config, self.config_fields)
+
+    def partitions(self, model, test_type, config):
+        """该 (模型, 测试类型, 扫描配置) 下有曲线数据的 (厂家, GPU)，按首次出现顺序"""
+        return [
+            (vendor, gpu)
+            for (m, tt, c, vendor, gpu) in self._curves
+            if (m, tt, c) == (model, test_type, config)
+        ]
+
+    def points(self, model, test_type, config, vendor, gpu):
+        return self._curves.get((model, test_type, config, vendor, gpu), [])
+
+    def frontier(self, model, test_type, config, vendor, gpu, latency_field):
+        return pareto_frontier(self.points(model, test_type, config, vendor, gpu), latency_field)
+
+    def best_under_slo(self, model, test_type, config, vendor, gpu):
+        return best_under_slo(self.points(model, test_type, config, vendor, gpu), self.slo)
+
+    def aligned(self, model, test_type, config, field):
+        """同一扫描配置下各 (厂家, GPU) 的 field 曲线插值到共同并发点后的对比表
+
+        返回 {"grid": [并发], "columns": {(厂家, GPU): [(值, 是否实测)]}, "sparse": [(厂家, GPU)]}：
+        测试点（不同并发）少于 CURVE_MIN_POINTS 的曲线无法插值，列入 sparse，只在与对齐点
+        并发相同时给出实测值；可插值的曲线不足 2 条或并发区间不重叠时返回 None，
+        由调用方退回全部测试点的均值对比。
+        """
+        value_of = (
+            (lambda p: p.throughput) if field == self.throughput_field else (lambda p: p.latency.get(field))
+        )
+        curves = {
+            part: concurrency_curve(self.points(model, test_type, config, *part), value_of)
+            for part in self.partitions(model, test_type, config)
+        }
+        usable = {part: curve for part, curve in curves.items() if len(curve[0]) >= CURVE_MIN_POINTS}
+        if len(usable) < 2:
+            return None
+        grid = common_grid(list(usable.values()))
+        if not grid:
+            return None
+
+        columns = {}
+        sparse = []
+        for part, (xs, ys) in curves.items():
+            if part in usable:
+                columns[part] = [(interpolate(xs, ys, x), x in xs) for x in grid]
+            elif xs:
+                measured = dict(zip(xs, ys))
+                columns[part] = [(measured.get(x), x in measured) for x in grid]
+                sparse.append(part)
+        return {"grid": grid, "columns": columns, "sparse": sparse}
@@ -1,17 +1,24 @@
 # data_manager.py - 数据管理模块
 import uuid
-import yaml
 import os
-from tkinter import messagebox
 from config import PERF_FIELDS_MAP
+from project_model import RowStore
+from derived_metrics import DerivedMetricEngine
+from ranking import MetricRanking
+from scenarios import ScenarioBucketer
 
 
 class DataManager:
-    """管理所有数据的初始化、验证和更新"""
+    """管理所有数据的初始化、验证和更新
+
+    本模块不在导入时依赖tkinter与yaml，仅在需要弹窗提示/读写配置时按需导入。
+    """
 
     @staticmethod
     def load_models(yaml_path, app_ref):
         """加载模型配置"""
+        import yaml
+
         if not os.path.exists(yaml_path):
             DataManager.create_default_yaml(yaml_path)
 
@@ -21,17 +28,40 @@ class DataManager:
 
             model_names = config.get("model_names", [])
             test_types = config.get("test_types", [])
-            return model_names, test_types
         except yaml.YAMLError as e:
+            from tkinter import messagebox
             messagebox.showerror("YAML格式错误", f"语法错误：{str(e)}\n请用2个空格缩进")
             return [], []
         except Exception as e:
+            from tkinter import messagebox
             messagebox.showerror("读取失败", f"配置文件错误：{str(e)}")
             return [], []
 
+        # 可选：新测试类型的字段与派生指标公式
+        try:
+            DerivedMetricEngine.register(config.get("perf_fields"), config.get("derived_metrics"))
+        except ValueError as e:
+            from tkinter import messagebox
+            messagebox.showerror("派生指标配置错误", str(e))
+        # 可选：指标方向/单位等元数据
+        try:
+            MetricRanking.register(config.get("metric_meta"))
+        except ValueError as e:
+            from tkinter import messagebox
+            messagebox.showerror("指标元数据配置错误", str(e))
+        # 可选：文本类测试的场景划分
+        try:
+            ScenarioBucketer.register(config.get("scenarios"))
+        except ValueError as e:
+            from tkinter import messagebox
+            messagebox.showerror("场景配置错误", str(e))
+        return model_names, test_types
+
     @staticmethod
     def create_default_yaml(path):
         """创建默认YAML配置"""
+        import yaml
+
         config = {
             "model_names": ["DeepSeek-R1", "yolov11", "qwen14B"],
             "test_types": [
@@ -51,6 +81,7 @@ class DataManager:
             with open(path, "w", encoding="utf-8") as f:
                 yaml.dump(config, f, allow_unicode=True, default_flow_style=False)
         except Exception as e:
+            from tkinter import messagebox
             messagebox.showerror("创建失败", f"无法创建配置文件：{str(e)}")
 
     @staticmethod
@@ -71,7 +102,7 @@ class DataManager:
     @staticmethod
     def init_env_data(selected_models, model_test_type_map, vendor_list):
         """初始化环境数据"""
-        env_data = []
+        env_data = RowStore()
         for model in selected_models:
             for tt in model_test_type_map[model]:
                 for vendor, gpu in vendor_list:
@@ -91,7 +122,7 @@ class DataManager:
     @staticmethod
     def init_perf_data(env_data, selected_models, model_test_type_map):
         """初始化性能和PK数据"""
-        perf_data = []
+        perf_data = RowStore()
         for env in env_data:
             input_fields, calc_fields = PERF_FIELDS_MAP.get(env["test_type"], ([], []))
             perf_data.append({
@@ -109,7 +140,7 @@ class DataManager:
             })
 
         # 初始化PK数据
-        pk_data = []
+        pk_data = RowStore()
         pk_unique = set()
         for model in selected_models:
             for tt in model_test_type_map[model]:
@@ -131,45 +162,13 @@ class DataManager:
 
     @staticmethod
     def calculate_throughput(perf_data):
-        """计算推理吞吐数据"""
-        for perf_row in perf_data:
-            tt = perf_row["test_type"]
-            if tt not in ["文本推理", "图文推理"]:
-                continue
-
-            input_vals = perf_row["input_values"]
-            required_fields = ["输入长度（tokens）", "输出长度（tokens）", "总吞吐（tokens/s）"]
-            if not all(f in input_vals for f in required_fields):
-                continue
-
-            try:
-                input_len = float(input_vals["输入长度（tokens）"] or 0)
-                output_len = float(input_vals["输出长度（tokens）"] or 0)
-                total_throughput = float(input_vals["总吞吐（tokens/s）"] or 0)
-                gpu_count = float(perf_row["gpu_count"] or 1)
-            except ValueError:
-                continue
-
-            # 计算
-            if input_len + output_len > 0:
-                total_output_throughput = total_throughput * (
-                    output_len / (input_len + output_len)
-                )
-            else:
-                total_output_throughput = 0
-
-            single_card_throughput = (
-                total_output_throughput / gpu_count if gpu_count > 0 else 0
-            )
-
-            # 更新计算值
-            perf_row["calc_values"]["总输出吞吐（tokens/s）"] = f"{total_output_throughput:.2f}"
-            perf_row["calc_values"]["单卡输出吞吐（tokens/s）"] = f"{single_card_throughput:.2f}"
+        """按 config.DERIVED_METRICS 的公式计算全部计算字段（吞吐等），返回无法解析的行的错误列表"""
+        return DerivedMetricEngine.calculate(perf_data)
 
     @staticmethod
     def init_problem_data():
         """初始化项目问题数据"""
-        return [
+        return RowStore([
             {
                 "id": str(uuid.uuid4()),
                 "category": "",
@@ -177,4 +176,4 @@ class DataManager:
                 "person": "",
                 "solution": "",
             }
-        ]
+        ])
@@ -0,0 +1,382 @@
+# derived_metrics.py - 派生指标（计算字段）引擎：表达式编译 + 列式批量计算
+import ast
+import copy
+import importlib.util
+import re
+from array import array
+
+# numpy 在第一次列式计算时才导入（导入约占启动耗时的一半，不拖慢首帧）；
+# 未安装 numpy 时使用标准库 array 逐行计算
+np = None
+_HAS_NUMPY = importlib.util.find_spec("numpy") is not None
+
+from config import DERIVED_METRICS, PERF_CATEGORY_MAP, PERF_FIELDS_MAP
+
+# 表达式中可引用的行属性：名称 → (显示名, 空值默认值)
+ROW_ATTRIBUTES = {"gpu_count": ("GPU数量", 1.0)}
+
+# 允许的函数及参数个数
+EXPRESSION_FUNCTIONS = {"min": 2, "max": 2, "abs": 1}
+
+_REF_PATTERN = re.compile(r"\{([^{}]+)\}")
+_ALLOWED_BINOPS = (ast.Add, ast.Sub, ast.Mult, ast.Div)
+_ALLOWED_UNARYOPS = (ast.UAdd, ast.USub)
+
+# test_type → (公式声明, 编译后的计划)
+_PLAN_CACHE = {}
+
+# config 中的缺省字段与公式（每次 register 在此基础上合并 yaml 中的声明）
+_DEFAULTS = copy.deepcopy((DERIVED_METRICS, PERF_FIELDS_MAP, PERF_CATEGORY_MAP))
+
+
+def _restore(state):
+    """把 DERIVED_METRICS / PERF_FIELDS_MAP / PERF_CATEGORY_MAP 原地恢复为 state 中的内容"""
+    for current, saved in zip((DERIVED_METRICS, PERF_FIELDS_MAP, PERF_CATEGORY_MAP), copy.deepcopy(state)):
+        current.clear()
+        current.update(saved)
+
+
+def _scalar_div(a, b):
+    return a / b if b else 0.0
+
+
+def _numpy_div(a, b):
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+    out = np.zeros(np.broadcast_shapes(a.shape, b.shape))
+    return np.divide(a, b, out=out, where=b != 0)
+
+
+_SCALAR_ENV = {"__builtins__": {}, "_div": _scalar_div, "min": min, "max": max, "abs": abs}
+# 各 numpy 函数共用的全局命名空间：编译时只需表达式，min/max/abs 等在 load_numpy 时填入
+_NUMPY_ENV = {"__builtins__": {}}
+
+
+def load_numpy():
+    """导入 numpy（只导入一次）并返回该模块；未安装时返回 None"""
+    global np
+    if np is None and _HAS_NUMPY:
+        import numpy
+
+        _NUMPY_ENV.update({"_div": _numpy_div, "min": numpy.minimum, "max": numpy.maximum, "abs": numpy.abs})
+        np = numpy
+    return np
+
+
+class _DivToCall(ast.NodeTransformer):
+    """把 a / b 改写为 _div(a, b)，除数为 0 时结果为 0"""
+
+    def visit_BinOp(self, node):
+        self.generic_visit(node)
+        if isinstance(node.op, ast.Div):
+            return ast.copy_location(
+                ast.Call(func=ast.Name(id="_div", ctx=ast.Load()), args=[node.left, node.right], keywords=[]),
+                node,
+            )
+        return node
+
+
+class DerivedMetricEngine:
+    """派生指标引擎
+
+    公式声明在 config.DERIVED_METRICS（可由 model_config.yaml 的 derived_metrics 扩展），
+    每个测试类型的公式编译一次为按依赖排序的计算计划并缓存；计算时按测试类型分组，
+    把引用到的输入列一次性转为数值数组（有 numpy 用 numpy，否则用 array），
+    按计划整列求值后格式化回填到各行的 calc_values。
+
+    空值按 0 处理（GPU数量空值按 1）；无法解析为数字的行不写入计算值，以错误列表返回：
+    [{"index", "id", "model", "vendor", "field", "value"}, ...]。
+    """
+
+    # ========== 配置 ==========
+    @staticmethod
+    def register(perf_fields=None, derived_metrics=None):
+        """在 config 缺省配置的基础上合并 yaml 中声明的测试类型字段与派生指标，并立即编译以尽早发现公式错误
+
+        perf_fields:     {测试类型: {"input": [...], "calc": [...], "category": 分类}}，
+                         calc 缺省为该类型全部派生指标，category 缺省为“推理性能”
+        derived_metrics: {测试类型: {计算字段: 表达式}}，与缺省公式合并（同名覆盖）
+
+        每次注册都从缺省配置开始，上一个配置（如批处理中的上一个定义文件）声明的字段与公式不会沿用。
+        """
+        perf_fields = perf_fields or {}
+        derived_metrics = derived_metrics or {}
+        touched = set(map(str, derived_metrics)) | set(map(str, perf_fields))
+        saved = copy.deepcopy((DERIVED_METRICS, PERF_FIELDS_MAP, PERF_CATEGORY_MAP))
+        try:
+            _restore(_DEFAULTS)
+            DerivedMetricEngine._apply_declarations(perf_fields, derived_metrics)
+            for test_type in touched:
+                DerivedMetricEngine.plan(test_type)
+        except ValueError:
+            # 声明有误：恢复原有配置，保持已生效的配置可用
+            _restore(saved)
+            raise
+
+    @staticmethod
+    def _apply_declarations(perf_fields, derived_metrics):
+        """把声明写入 config 中的 DERIVED_METRICS / PERF_FIELDS_MAP / PERF_CATEGORY_MAP"""
+        for test_type, metrics in derived_metrics.items():
+            DERIVED_METRICS.setdefault(str(test_type), {}).update(
+                {str(name): str(expr) for name, expr in (metrics or {}).items()}
+            )
+        for test_type, spec in perf_fields.items():
+            test_type = str(test_type)
+            spec = spec or {}
+            input_fields = [str(f) for f in spec.get("input", []) or []]
+            calc_fields = spec.get("calc")
+            if calc_fields is None:
+                calc_fields = list(DERIVED_METRICS.get(test_type, {}))
+            PERF_FIELDS_MAP[test_type] = (input_fields, [str(f) for f in calc_fields])
+            if not any(test_type in types for types in PERF_CATEGORY_MAP.values()):
+                category = str(spec.get("category") or "推理性能")
+                if category not in PERF_CATEGORY_MAP:
+                    raise ValueError(f"{test_type} 的分类必须是 {'/'.join(PERF_CATEGORY_MAP)} 之一：{category}")
+                PERF_CATEGORY_MAP[category].append(test_type)
+        # 只补充公式、未重新声明字段的测试类型：新指标追加到计算字段末尾
+        for test_type in derived_metrics:
+            test_type = str(test_type)
+            if test_type in PERF_FIELDS_MAP and test_type not in perf_fields:
+                input_fields, calc_fields = PERF_FIELDS_MAP[test_type]
+                extra = [m for m in DERIVED_METRICS[test_type] if m not in calc_fields]
+                PERF_FIELDS_MAP[test_type] = (input_fields, calc_fields + extra)
+
+    # ========== 编译 ==========
+    @staticmethod
+    def plan(test_type):
+        """返回测试类型的计算计划（公式未变化时复用缓存）
+
+        计划为 {"inputs": [输入字段], "attrs": [行属性], "steps": [(指标, 引用列表, 标量函数, numpy函数)]}，
+        steps 已按依赖排序。
+        """
+        metrics = DERIVED_METRICS.get(test_type) or {}
+        key = tuple(metrics.items())
+        cached = _PLAN_CACHE.get(test_type)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        plan = DerivedMetricEngine._compile_plan(test_type, metrics)
+        _PLAN_CACHE[test_type] = (key, plan)
+        return plan
+
+    @staticmethod
+    def compile_expression(expr):
+        """编译单个表达式，返回 (引用列表, 标量函数, numpy函数或None)
+
+        引用 {名称} 依次替换为参数 _v0、_v1…；只允许数字、四则运算、括号与 min/max/abs。
+        """
+        refs = []
+
+        def _to_arg(match):
+            name = match.group(1).strip()
+            if name not in refs:
+                refs.append(name)
+            return f"_v{refs.index(name)}"
+
+        source = _REF_PATTERN.sub(_to_arg, expr)
+        try:
+            tree = ast.parse(source, mode="eval")
+        except SyntaxError as e:
+            raise ValueError(f"表达式语法错误：{expr}") from e
+        DerivedMetricEngine._check_node(tree.body, expr, len(refs))
+
+        args = ", ".join(f"_v{i}" for i in range(len(refs)))
+        lambda_tree = ast.parse(f"lambda {args}: 0", mode="eval")
+        lambda_tree.body.body = _DivToCall().visit(tree.body)
+        code = compile(ast.fix_missing_locations(lambda_tree), "<derived metric>", "eval")
+
+        scalar_func = eval(code, dict(_SCALAR_ENV))
+        numpy_func = eval(code, _NUMPY_ENV) if _HAS_NUMPY else None
+        return refs, scalar_func, numpy_func
+
+    @staticmethod
+    def _check_node(node, expr, n_refs):
+        """白名单校验表达式语法树"""
+        if isinstance(node, ast.BinOp) and isinstance(node.op, _ALLOWED_BINOPS):
+            DerivedMetricEngine._check_node(node.left, expr, n_refs)
+            DerivedMetricEngine._check_node(node.right, expr, n_refs)
+        elif isinstance(node, ast.UnaryOp) and isinstance(node.op, _ALLOWED_UNARYOPS):
+            DerivedMetricEngine._check_node(node.operand, expr, n_refs)
+        elif isinstance(node, ast.Constant) and type(node.value) in (int, float):
+            pass
+        elif isinstance(node, ast.Name) and node.id in {f"_v{i}" for i in range(n_refs)}:
+            pass
+        elif (
+            isinstance(node, ast.Call)
+            and isinstance(node.func, ast.Name)
+            and EXPRESSION_FUNCTIONS.get(node.func.id) == len(node.args)
+            and not node.keywords
+        ):
+            for arg in node.args:
+                DerivedMetricEngine._check_node(arg, expr, n_refs)
+        else:
+            raise ValueError(f"表达式包含不支持的内容（仅支持数字、+ - * /、括号、{{字段}} 与 min/max/abs）：{expr}")
+
+    @staticmethod
+    def _compile_plan(test_type, metrics):
+        compiled = {}
+        for name, expr in metrics.items():
+            try:
+                compiled[name] = DerivedMetricEngine.compile_expression(expr)
+            except ValueError as e:
+                raise ValueError(f"{test_type}「{name}」{e}") from e
+
+        known_inputs = PERF_FIELDS_MAP.get(test_type, ([], []))[0]
+        inputs, attrs, steps = [], [], []
+        state = {}  # 指标 → "visiting" / "done"
+
+        def _visit(name, path):
+            if state.get(name) == "done":
+                return
+            if state.get(name) == "visiting":
+                cycle = path[path.index(name):] + [name]
+                raise ValueError(f"{test_type} 派生指标存在循环依赖：{' → '.join(cycle)}")
+            state[name] = "visiting"
+            refs, scalar_func, numpy_func = compiled[name]
+            for ref in refs:
+                if ref in compiled:
+                    _visit(ref, path + [name])
+                elif ref in ROW_ATTRIBUTES:
+                    if ref not in attrs:
+                        attrs.append(ref)
+                elif ref in known_inputs:
+                    if ref not in inputs:
+                        inputs.append(ref)
+                else:
+                    raise ValueError(f"{test_type}「{name}」引用了未知字段：{ref}")
+            state[name] = "done"
+            steps.append((name, refs, scalar_func, numpy_func))
+
+        for name in compiled:
+            _visit(name, [])
+        return {"inputs": inputs, "attrs": attrs, "steps": steps}
+
+    # ========== 计算 ==========
+    @staticmethod
+    def calculate(perf_data, use_numpy=None):
+        """按公式计算全部性能数据行并回填 calc_values，返回解析错误列表
+
+        Args:
+            use_numpy: None 时有 numpy 则使用 numpy；False 强制使用 array 实现。
+        """
+        if use_numpy is None:
+            use_numpy = load_numpy() is not None
+        elif use_numpy and load_numpy() is None:
+            raise RuntimeError("未安装 numpy")
+
+        groups = {}  # test_type → [行]
+        for perf_row in perf_data:
+            group = groups.get(perf_row["test_type"])
+            if group is None:
+                group = groups[perf_row["test_type"]] = []
+            group.append(perf_row)
+
+        bad_rows = []  # [(行, 字段显示名, 原始值)]
+        for test_type, rows in groups.items():
+            if test_type not in DERIVED_METRICS:
+                continue
+            plan = DerivedMetricEngine.plan(test_type)
+            if plan["steps"]:
+                bad_rows.extend(DerivedMetricEngine._calculate_group(test_type, plan, rows, use_numpy))
+        if not bad_rows:
+            return []
+
+        position = {id(row): idx for idx, row in enumerate(perf_data)}
+        errors = [
+            {
+                "index": position[id(row)],
+                "id": row["id"],
+                "model": row["model"],
+                "vendor": row["vendor"],
+                "field": field,
+                "value": value,
+            }
+            for row, field, value in bad_rows
+        ]
+        errors.sort(key=lambda e: e["index"])
+        return errors
+
+    @staticmethod
+    def _calculate_group(test_type, plan, rows, use_numpy):
+        """对同一测试类型的行整列求值，返回解析失败的 [(行, 字段显示名, 原始值)]
+
+        缺少引用字段的行不参与计算。
+        """
+        inputs = plan["inputs"]
+        input_values = [row["input_values"] for row in rows]
+        try:
+            raw = {field: [values[field] for values in input_values] for field in inputs}
+        except KeyError:
+            rows = [row for row in rows if all(f in row["input_values"] for f in inputs)]
+            input_values = [row["input_values"] for row in rows]
+            raw = {field: [values[field] for values in input_values] for field in inputs}
+        if not rows:
+            return []
+        n = len(rows)
+
+        to_numeric = DerivedMetricEngine._to_numpy if use_numpy else DerivedMetricEngine._to_array
+        bad = {}  # 行下标 → (字段显示名, 原始值)
+        columns = {}
+        for field in inputs:
+            columns[field] = to_numeric(raw[field], 0.0, field, bad)
+        for attr in plan["attrs"]:
+            label, default = ROW_ATTRIBUTES[attr]
+            columns[attr] = to_numeric([row[attr] for row in rows], default, label, bad)
+
+        for name, refs, scalar_func, numpy_func in plan["steps"]:
+            args = [columns[ref] for ref in refs]
+            if use_numpy:
+                columns[name] = np.broadcast_to(np.asarray(numpy_func(*args), dtype=np.float64), (n,))
+            elif args:
+                columns[name] = array("d", map(scalar_func, *args))
+            else:
+                columns[name] = array("d", [scalar_func()]) * n
+
+        # 只回填该测试类型声明的计算字段（中间指标不写入）
+        calc_fields = PERF_FIELDS_MAP.get(test_type, ([], []))[1]
+        names = [name for name, _refs, _scalar, _numpy in plan["steps"] if name in calc_fields]
+        text_columns = [
+            map("{:.2f}".format, columns[name].tolist() if use_numpy else columns[name])
+            for name in names
+        ]
+        for i, (row, texts) in enumerate(zip(rows, zip(*text_columns))):
+            if bad and i in bad:
+                continue
+            row["calc_values"].update(zip(names, texts))
+
+        return [(rows[i], field, value) for i, (field, value) in bad.items()]
+
+    @staticmethod
+    def format_error(error):
+        """把一条解析错误格式化为提示文字（行号从 1 开始）"""
+        return (
+            f"第{error['index'] + 1}行（{error['model']} / {error['vendor']}）"
+            f"{error['field']}「{error['value']}」不是有效数字"
+        )
+
+    # ========== 数值转换 ==========
+    @staticmethod
+    def _parse_each(values, default, field, errors, out):
+        """逐个解析（array 实现，或 numpy 整列转换失败时定位错误行）"""
+        for i, value in enumerate(values):
+            try:
+                out[i] = float(value or default)
+            except (TypeError, ValueError):
+                out[i] = default
+                errors.setdefault(i, (field, value))
+        return out
+
+    @staticmethod
+    def _to_array(values, default, field, errors):
+        return DerivedMetricEngine._parse_each(values, default, field, errors, array("d", bytes(8 * len(values))))
+
+    @staticmethod
+    def _to_numpy(values, default, field, errors):
+        # 先整列转换（全部为有效数字时最快），失败再把空值换成默认值重试，最后逐个定位错误
+        try:
+            return np.array(values, dtype=np.float64)
+        except (TypeError, ValueError):
+            pass
+        try:
+            return np.array([value or default for value in values], dtype=np.float64)
+        except (TypeError, ValueError):
+            return DerivedMetricEngine._parse_each(values, default, field, errors, np.empty(len(values)))
@@ -1,204 +1,240 @@
 # excel_export.py - Excel报告生成模块
 import openpyxl
 from datetime import datetime
-from tkinter import filedialog, messagebox
+from config import EXCEL_WRITE_ONLY_THRESHOLD, PERF_CATEGORY_MAP
+
+# 性能数据写入时每隔多少行汇报一次进度
+PROGRESS_EVERY = 1000
+
+# 各 Sheet 名称（ExcelImporter 按同样的名称读回）
+INFO_SHEET = "1. 项目信息"
+ENV_SHEET = "2. 测试环境"
+PK_SHEET = "3. PK指标"
+PROBLEM_SHEET = "7. 项目中遇到的问题"
+SUMMARY_SHEET = "8. 项目总结"
+
+# 项目信息 Sheet：字段 → 第一列标签（"测试模型"行另外写入已选模型）
+PROJECT_INFO_LABELS = {
+    "project_name": "项目名称",
+    "test_cycle": "测试周期",
+    "vendor_str": "参与厂家",
+    "customer_name": "客户名称",
+    "customer_industry": "客户行业",
+    "bid_status": "中标情况",
+    "bid_share": "中标份额",
+    "bid_fail_reason": "未中标原因",
+    "test_owner": "测试负责人",
+}
+MODELS_LABEL = "测试模型"
+# 尚未生成总结时"项目总结"Sheet 中的提示
+SUMMARY_PLACEHOLDER = "未生成项目总结，请先点击「生成项目总结」按钮生成"
+
+# 性能数据分类 → Sheet名称
+PERF_SHEET_NAMES = {
+    "推理性能": "4. 推理性能数据",
+    "训练性能": "5. 训练性能数据",
+    "精度测试": "6. 精度测试数据",
+}
+# 性能数据 Sheet 的固定列（其后依次为该测试类型的输入字段、计算字段）
+PERF_BASE_HEADERS = ["序号", "模型", "厂家", "GPU配置", "GPU数量", "数据集", "测试类型"]
+
+
+def _no_progress(done, total, message=""):
+    """默认进度回调：不做任何事"""
 
 
 class ExcelExporter:
-    """负责生成Excel报告"""
+    """负责生成Excel报告
+
+    每个Sheet由一个行生成器（_xxx_rows）产出整行数据，写入时逐行 append：
+    - 普通模式：内存中的 openpyxl.Workbook，生成后仍可编辑；
+    - 流式模式（write_only）：openpyxl 只写工作簿，行写出后即落盘，
+      内存占用与行数无关，适合上万行的性能数据。
+    """
 
     @staticmethod
-    def generate_report(app_ref):
-        """生成完整的Excel报告"""
-        save_path = filedialog.asksaveasfilename(
+    def ask_save_path():
+        """弹出保存对话框，返回用户选择的路径（取消时返回空串）"""
+        from tkinter import filedialog
+
+        return filedialog.asksaveasfilename(
             defaultextension=".xlsx",
             filetypes=[("Excel文件", "*.xlsx")],
             initialfile=f"GPU性能测试-{datetime.now().strftime('%Y%m%d')}.xlsx",
         )
-        if not save_path:
-            return
 
-        try:
-            wb = openpyxl.Workbook()
+    @staticmethod
+    def write_report(save_path, project, write_only=None, progress=None, summary_lines=None):
+        """将完整报告写入 save_path（不依赖GUI，可供批处理/后台任务调用）
+
+        Args:
+            write_only: True 使用流式只写工作簿；False 使用内存工作簿；
+                None 时按性能数据行数自动选择（>= EXCEL_WRITE_ONLY_THRESHOLD 走流式）。
+            progress: 可选进度回调 progress(done, total, message)；
+                性能数据每 PROGRESS_EVERY 行汇报一次，其余Sheet各计 1 步。
+            summary_lines: 可选的总结行迭代器（如 SummaryGenerator.iter_lines），
+                提供时“项目总结”Sheet 边生成边写入，不使用 project.project_summary。
+        """
+        if write_only is None:
+            write_only = len(project.perf_data) >= EXCEL_WRITE_ONLY_THRESHOLD
+        if progress is None:
+            progress = _no_progress
+
+        wb = openpyxl.Workbook(write_only=write_only)
+        if not write_only:
             wb.remove(wb.active)
-
-            # 1. 项目信息
-            ExcelExporter._write_project_info(wb, app_ref)
-            # 2. 测试环境
-            ExcelExporter._write_env_data(wb, app_ref)
-            # 3. PK指标
-            ExcelExporter._write_pk_data(wb, app_ref)
-            # 4-6. 性能数据
-            ExcelExporter._write_perf_data(wb, app_ref)
-            # 7. 项目问题
-            ExcelExporter._write_problem_data(wb, app_ref)
-            # 8. 项目总结
-            ExcelExporter._write_summary(wb, app_ref)
-
+        try:
+            ExcelExporter._write_sheets(wb, project, progress, summary_lines)
             wb.save(save_path)
-            messagebox.showinfo("成功", f"Excel已生成：\n{save_path}")
+        except BaseException:
+            # 中途失败/取消时结束各只写Sheet的写入器，避免残留未关闭的临时文件
+            if write_only:
+                for ws in wb.worksheets:
+                    if not ws.closed:
+                        ws.close()
+            raise
+        progress(1, 1, "完成")
+        return save_path
+
+    @staticmethod
+    def _write_sheets(wb, project, progress, summary_lines=None):
+        """按顺序写入8个Sheet"""
+        total = len(project.perf_data) + 6
+        done = 0
+        progress(done, total, "写入项目信息")
+
+        # 1. 项目信息
+        ExcelExporter._append_rows(wb.create_sheet(INFO_SHEET), ExcelExporter._project_info_rows(project))
+        # 2. 测试环境
+        ExcelExporter._append_rows(wb.create_sheet(ENV_SHEET), ExcelExporter._env_rows(project))
+        # 3. PK指标
+        ExcelExporter._append_rows(wb.create_sheet(PK_SHEET), ExcelExporter._pk_rows(project))
+        done += 3
+        progress(done, total, "写入性能数据")
+
+        # 4-6. 性能数据
+        perf_sheets = {
+            category: wb.create_sheet(sheet_name)
+            for category, sheet_name in PERF_SHEET_NAMES.items()
+        }
+        for idx, (category, row) in enumerate(ExcelExporter._perf_rows(project), 1):
+            perf_sheets[category].append(row)
+            if idx % PROGRESS_EVERY == 0:
+                progress(done + idx, total, "写入性能数据")
+        done += len(project.perf_data)
+        progress(done, total, "写入项目问题与总结")
+
+        # 7. 项目问题
+        ExcelExporter._append_rows(wb.create_sheet(PROBLEM_SHEET), ExcelExporter._problem_rows(project))
+        # 8. 项目总结
+        ExcelExporter._append_rows(wb.create_sheet(SUMMARY_SHEET), ExcelExporter._summary_rows(project, summary_lines))
+        done += 2
+        progress(done, total, "保存文件")
 
-        except Exception as e:
-            messagebox.showerror("错误", f"生成失败：{str(e)}")
+    @staticmethod
+    def _append_rows(ws, rows):
+        """逐行写入"""
+        for row in rows:
+            ws.append(row)
 
     @staticmethod
-    def _write_project_info(wb, app_ref):
-        """写入项目信息"""
-        ws = wb.create_sheet("1. 项目信息", 0)
-        ws["A1"] = "项目名称"
-        ws["B1"] = app_ref.project_name.get()
-        ws["A2"] = "测试周期"
-        ws["B2"] = app_ref.test_cycle.get()
-        ws["A3"] = "参与厂家"
-        ws["B3"] = app_ref.vendor_str.get()
-        ws["A4"] = "测试模型"
-        ws["B4"] = "、".join(app_ref.selected_models)
+    def _project_info_rows(project):
+        """项目信息"""
+        info = project.info
+        labels = PROJECT_INFO_LABELS
+        yield [labels["project_name"], info.project_name]
+        yield [labels["test_cycle"], info.test_cycle]
+        yield [labels["vendor_str"], info.vendor_str]
+        yield [MODELS_LABEL, "、".join(project.selected_models)]
+        yield []
         # 新增 Step1 中的项目字段
-        ws["A6"] = "客户名称"
-        ws["B6"] = app_ref.customer_name.get()
-        ws["A7"] = "客户行业"
-        ws["B7"] = app_ref.customer_industry.get()
-        ws["A8"] = "中标情况"
-        ws["B8"] = app_ref.bid_status.get()
-        ws["A9"] = "中标份额"
-        ws["B9"] = app_ref.bid_share.get()
-        ws["A10"] = "未中标原因"
-        ws["B10"] = app_ref.bid_fail_reason.get()
-        ws["A11"] = "测试负责人"
-        ws["B11"] = app_ref.test_owner.get()
+        yield [labels["customer_name"], info.customer_name]
+        yield [labels["customer_industry"], info.customer_industry]
+        yield [labels["bid_status"], info.bid_status]
+        yield [labels["bid_share"], info.bid_share]
+        yield [labels["bid_fail_reason"], info.bid_fail_reason]
+        yield [labels["test_owner"], info.test_owner]
 
     @staticmethod
-    def _write_env_data(wb, app_ref):
-        """写入测试环境数据"""
-        ws = wb.create_sheet("2. 测试环境", 1)
-        headers = ["序号", "模型", "测试类型", "厂家", "GPU配置", "GPU数量", "数据集", "测试工具"]
-        for col, h in enumerate(headers, 1):
-            ws.cell(1, col, h)
-
-        row = 2
-        for idx, data in enumerate(app_ref.env_data):
-            ws.cell(row, 1, idx)
-            ws.cell(row, 2, data["model"])
-            ws.cell(row, 3, data["test_type"])
-            ws.cell(row, 4, data["vendor"])
-            ws.cell(row, 5, data["gpu"])
-            ws.cell(row, 6, data["gpu_count"])
-            ws.cell(row, 7, data["dataset"])
-            ws.cell(row, 8, data["tool"])
-            row += 1
+    def _env_rows(project):
+        """测试环境数据"""
+        yield ["序号", "模型", "测试类型", "厂家", "GPU配置", "GPU数量", "数据集", "测试工具"]
+        for idx, data in enumerate(project.env_data):
+            yield [
+                idx,
+                data["model"],
+                data["test_type"],
+                data["vendor"],
+                data["gpu"],
+                data["gpu_count"],
+                data["dataset"],
+                data["tool"],
+            ]
 
     @staticmethod
-    def _write_pk_data(wb, app_ref):
-        """写入PK指标数据"""
-        ws = wb.create_sheet("3. PK指标", 2)
-        headers = ["序号", "模型", "测试类型", "PK指标"]
-        for col, h in enumerate(headers, 1):
-            ws.cell(1, col, h)
-
-        row = 2
-        for idx, pk_row in enumerate(app_ref.pk_data):
-            ws.cell(row, 1, idx)
-            ws.cell(row, 2, pk_row["model"])
-            ws.cell(row, 3, pk_row["test_type"])
-            ws.cell(row, 4, pk_row["selected_pk"])
-            row += 1
+    def _pk_rows(project):
+        """PK指标数据"""
+        yield ["序号", "模型", "测试类型", "PK指标"]
+        for idx, pk_row in enumerate(project.pk_data):
+            yield [idx, pk_row["model"], pk_row["test_type"], pk_row["selected_pk"]]
 
     @staticmethod
-    def _write_perf_data(wb, app_ref):
-        """写入性能数据（推理、训练、精度）"""
-        category_map = {
-            "推理性能": [
-                "文本推理",
-                "图文推理",
-                "图像识别",
-                "语音推理",
-                "文档排序",
-                "特征提取",
-            ],
-            "训练性能": ["预训练", "lora微调", "全参微调"],
-            "精度测试": ["精度测试"],
-        }
-
-        sheet_data = {
-            "推理性能": {"sheet": wb.create_sheet("4. 推理性能数据", 3), "row": 1},
-            "训练性能": {"sheet": wb.create_sheet("5. 训练性能数据", 4), "row": 1},
-            "精度测试": {"sheet": wb.create_sheet("6. 精度测试数据", 5), "row": 1},
+    def _perf_rows(project):
+        """性能数据（推理、训练、精度），产出 (分类, 行)；每个分类首行为表头"""
+        category_of = {
+            tt: category for category, types in PERF_CATEGORY_MAP.items() for tt in types
         }
+        header_written = set()
 
         entry_idx = 0
-        for perf_row in app_ref.perf_data:
+        for perf_row in project.perf_data:
             tt = perf_row["test_type"]
-            category = None
-
-            for cat, types in category_map.items():
-                if tt in types:
-                    category = cat
-                    break
-
+            category = category_of.get(tt)
             if not category:
                 continue
 
-            info = sheet_data[category]
-            ws = info["sheet"]
-            row = info["row"]
-
             # 写表头（首次）
-            if row == 1:
-                base_headers = ["序号", "模型", "厂家", "数据集", "测试类型"]
-                headers = base_headers + perf_row["input_fields"] + perf_row["calc_fields"]
-                for col, h in enumerate(headers, 1):
-                    ws.cell(row, col, h)
-                info["row"] += 1
-                row += 1
-
-            # 写数据行
-            col = 1
-            ws.cell(row, col, entry_idx)
-            col += 1
-            ws.cell(row, col, perf_row["model"])
-            col += 1
-            ws.cell(row, col, perf_row["vendor"])
-            col += 1
-            ws.cell(row, col, perf_row["dataset"])
-            col += 1
-            ws.cell(row, col, tt)
-            col += 1
-
-            for field in perf_row["input_fields"]:
-                ws.cell(row, col, perf_row["input_values"][field])
-                col += 1
-
-            for field in perf_row["calc_fields"]:
-                ws.cell(row, col, perf_row["calc_values"][field])
-                col += 1
-
-            info["row"] += 1
+            if category not in header_written:
+                header_written.add(category)
+                yield category, PERF_BASE_HEADERS + perf_row["input_fields"] + perf_row["calc_fields"]
+
+            input_values = perf_row["input_values"]
+            calc_values = perf_row["calc_values"]
+            row = [
+                entry_idx,
+                perf_row["model"],
+                perf_row["vendor"],
+                perf_row.get("gpu", ""),
+                perf_row.get("gpu_count", ""),
+                perf_row["dataset"],
+                tt,
+            ]
+            row.extend(input_values[field] for field in perf_row["input_fields"])
+            row.extend(calc_values[field] for field in perf_row["calc_fields"])
+            yield category, row
             entry_idx += 1
 
     @staticmethod
-    def _write_problem_data(wb, app_ref):
-        """写入项目问题数据"""
-        ws = wb.create_sheet("7. 项目中遇到的问题", 6)
-        problem_headers = ["序号", "问题分类", "问题描述", "责任人", "解决方案"]
-        for col, h in enumerate(problem_headers, 1):
-            ws.cell(1, col, h)
-
-        row = 2
-        for idx, problem_row in enumerate(app_ref.problem_data):
-            ws.cell(row, 1, idx)
-            ws.cell(row, 2, problem_row["category"])
-            ws.cell(row, 3, problem_row["description"])
-            ws.cell(row, 4, problem_row["person"])
-            ws.cell(row, 5, problem_row["solution"])
-            row += 1
+    def _problem_rows(project):
+        """项目问题数据"""
+        yield ["序号", "问题分类", "问题描述", "责任人", "解决方案"]
+        for idx, problem_row in enumerate(project.problem_data):
+            yield [
+                idx,
+                problem_row["category"],
+                problem_row["description"],
+                problem_row["person"],
+                problem_row["solution"],
+            ]
 
     @staticmethod
-    def _write_summary(wb, app_ref):
-        """写入项目总结"""
-        ws = wb.create_sheet("8. 项目总结", 7)
-        if app_ref.project_summary:
-            summary_lines = app_ref.project_summary.split("\n")
-            for row_idx, line in enumerate(summary_lines, 1):
-                ws.cell(row_idx, 1, line)
+    def _summary_rows(project, summary_lines=None):
+        """项目总结"""
+        if summary_lines is not None:
+            for line in summary_lines:
+                yield [line]
+        elif project.project_summary:
+            for line in project.project_summary.split("\n"):
+                yield [line]
         else:
-            ws.cell(1, 1, "未生成项目总结，请先点击「生成项目总结」按钮生成")
+            yield [SUMMARY_PLACEHOLDER]
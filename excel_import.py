@@ -0,0 +1,275 @@
+# excel_import.py - 读回 ExcelExporter 导出的报告，重建项目数据（往返导入）
+import uuid
+from collections import Counter
+
+import openpyxl
+
+from config import PERF_FIELDS_MAP
+from data_manager import DataManager
+from excel_export import (
+    ENV_SHEET,
+    INFO_SHEET,
+    MODELS_LABEL,
+    PERF_BASE_HEADERS,
+    PERF_SHEET_NAMES,
+    PK_SHEET,
+    PROBLEM_SHEET,
+    PROJECT_INFO_LABELS,
+    SUMMARY_PLACEHOLDER,
+    SUMMARY_SHEET,
+)
+from project_model import ProjectInfo, ProjectModel, RowStore
+
+# 性能数据读取时每隔多少行汇报一次进度
+PROGRESS_EVERY = 5000
+
+# 旧版报告的性能数据 Sheet 没有 GPU配置 / GPU数量 列：序号, 模型, 厂家, 数据集, 测试类型
+LEGACY_PERF_BASE_HEADERS = ["序号", "模型", "厂家", "数据集", "测试类型"]
+
+
+def _no_progress(done, total, message=""):
+    """默认进度回调：不做任何事"""
+
+
+def _cell(value):
+    """单元格值转为界面使用的字符串（空单元格 → 空串；在 Excel 中改成数字的整数值不带 .0）"""
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _values(ws):
+    """跳过表头逐行产出单元格值（全空行跳过）"""
+    for row in ws.iter_rows(min_row=2, values_only=True):
+        if any(value is not None and value != "" for value in row):
+            yield row
+
+
+def _pad(row, width):
+    """行的前 width 个单元格（不足的补 None）"""
+    row = tuple(row[:width])
+    return row + (None,) * (width - len(row))
+
+
+class ExcelImporter:
+    """把 ExcelExporter 导出的报告读回为 ProjectModel
+
+    以只读流式模式（read_only + iter_rows(values_only=True)）逐行读取各 Sheet，内存只随
+    重建的行数增长。报告中没有的信息按以下规则补全：
+    - 测试环境的 is_dynamic：按参与厂家与模型选择能生成的行为固定行，其余为动态行；
+    - 旧版报告的性能数据没有 GPU 配置 / GPU 数量列：按 (模型, 测试类型, 厂家, 数据集) 匹配测试环境行，
+      匹配到多种 GPU 配置时无法确定归属，跳过该行并给出警告；
+    - 性能数据的字段：按行的测试类型在当前 PERF_FIELDS_MAP 中的输入/计算字段依次对应。
+    性能数据按分类分 Sheet 导出，读回后各分类内顺序不变，分类之间按 Sheet 顺序排列。
+    """
+
+    @staticmethod
+    def read_report(path, progress=None):
+        """读取报告，返回 (ProjectModel, 警告列表)
+
+        不是本工具导出的报告（缺少项目信息/测试环境/PK指标 Sheet）时抛出 ValueError。
+        progress(done, total, message) 按 Sheet 汇报，性能数据每 PROGRESS_EVERY 行另外汇报一次。
+        """
+        if progress is None:
+            progress = _no_progress
+        wb = openpyxl.load_workbook(path, read_only=True, data_only=True, keep_links=False)
+        try:
+            missing = [name for name in (INFO_SHEET, ENV_SHEET, PK_SHEET) if name not in wb.sheetnames]
+            if missing:
+                raise ValueError(f"不是本工具导出的报告（缺少 Sheet：{'、'.join(missing)}）")
+            project = ProjectModel.empty()
+            warnings = []
+
+            progress(0, 1, "读取项目信息")
+            ExcelImporter._read_info(wb[INFO_SHEET], project)
+            ExcelImporter._read_env(wb[ENV_SHEET], project)
+            ExcelImporter._read_pk(wb[PK_SHEET], project)
+
+            # 流式导出的 Sheet 没有尺寸信息，取行数需要先扫描整个 Sheet，因此进度按 Sheet 汇报
+            perf_sheets = [wb[name] for name in PERF_SHEET_NAMES.values() if name in wb.sheetnames]
+            total = len(perf_sheets) + 1
+            skipped = Counter()  # 未注册的测试类型 → 行数
+            ambiguous = Counter()  # 旧版报告中无法确定 GPU 的 (模型, 测试类型, 厂家) → 行数
+            for done, ws in enumerate(perf_sheets):
+                ExcelImporter._read_perf(
+                    ws, project, skipped, ambiguous, lambda message: progress(done, total, message)
+                )
+            for test_type, count in skipped.items():
+                warnings.append(f"测试类型 {test_type} 未注册性能字段，跳过 {count} 行性能数据")
+            for (model, test_type, vendor), count in ambiguous.items():
+                warnings.append(
+                    f"{model} / {test_type} / {vendor} 在测试环境中有多种 GPU 配置，旧版报告的性能数据"
+                    f"没有 GPU 列，无法确定归属，跳过 {count} 行性能数据"
+                )
+
+            progress(total - 1, total, "读取项目问题与总结")
+            if PROBLEM_SHEET in wb.sheetnames:
+                ExcelImporter._read_problems(wb[PROBLEM_SHEET], project)
+            if SUMMARY_SHEET in wb.sheetnames:
+                ExcelImporter._read_summary(wb[SUMMARY_SHEET], project)
+        finally:
+            wb.close()
+        progress(1, 1, "完成")
+        return project, warnings
+
+    # ========== 各 Sheet ==========
+    @staticmethod
+    def _read_info(ws, project):
+        fields = {label: name for name, label in PROJECT_INFO_LABELS.items()}
+        info = {}
+        for row in ws.iter_rows(values_only=True):
+            label, value = _pad(row, 2)
+            if label == MODELS_LABEL:
+                project.selected_models = [m for m in _cell(value).split("、") if m]
+            elif label in fields:
+                info[fields[label]] = _cell(value)
+        project.info = ProjectInfo.from_dict(info)
+
+    @staticmethod
+    def _read_env(ws, project):
+        """测试环境：序号, 模型, 测试类型, 厂家, GPU配置, GPU数量, 数据集, 测试工具"""
+        rows = []
+        for row in _values(ws):
+            _idx, model, test_type, vendor, gpu, gpu_count, dataset, tool = map(_cell, _pad(row, 8))
+            rows.append({
+                "model": model,
+                "test_type": test_type,
+                "vendor": vendor,
+                "gpu": gpu,
+                "gpu_count": gpu_count,
+                "dataset": dataset,
+                "tool": tool,
+                "is_dynamic": True,
+                "id": str(uuid.uuid4()),
+            })
+            ExcelImporter._add_test_type(project, model, test_type)
+
+        # 与 DataManager.init_env_data 能生成的行一一对应的为固定行，其余为用户新增的动态行
+        vendor_list = DataManager.parse_vendor_str(project.info.vendor_str)
+        generated = {
+            (model, tt, vendor, gpu)
+            for model in project.selected_models
+            for tt in project.model_test_type_map.get(model, ())
+            for vendor, gpu in vendor_list
+        }
+        for row in rows:
+            key = (row["model"], row["test_type"], row["vendor"], row["gpu"])
+            if key in generated:
+                generated.discard(key)
+                row["is_dynamic"] = False
+        project.env_data = RowStore(rows)
+
+    @staticmethod
+    def _read_pk(ws, project):
+        """PK指标：序号, 模型, 测试类型, PK指标"""
+        rows = []
+        for row in _values(ws):
+            _idx, model, test_type, selected_pk = map(_cell, _pad(row, 4))
+            input_fields, calc_fields = PERF_FIELDS_MAP.get(test_type, ([], []))
+            rows.append({
+                "id": str(uuid.uuid4()),
+                "model": model,
+                "test_type": test_type,
+                "pk_options": input_fields + calc_fields,
+                "selected_pk": selected_pk,
+            })
+            ExcelImporter._add_test_type(project, model, test_type)
+        project.pk_data = RowStore(rows)
+
+    @staticmethod
+    def _read_perf(ws, project, skipped, ambiguous, report):
+        """性能数据：序号, 模型, 厂家, GPU配置, GPU数量, 数据集, 测试类型, 输入字段..., 计算字段...
+
+        旧版报告（表头为 LEGACY_PERF_BASE_HEADERS）的 GPU 配置 / GPU 数量按测试环境匹配。
+        """
+        rows_iter = ws.iter_rows(values_only=True)
+        header = [_cell(v) for v in next(rows_iter, ())]
+        legacy = header[:len(LEGACY_PERF_BASE_HEADERS)] == LEGACY_PERF_BASE_HEADERS
+        base_columns = len(LEGACY_PERF_BASE_HEADERS) if legacy else len(PERF_BASE_HEADERS)
+        envs = ExcelImporter._env_candidates(project) if legacy else None
+
+        perf_data = project.perf_data
+        rows = []
+        count = len(perf_data)
+        for row in rows_iter:
+            if not any(value is not None and value != "" for value in row):
+                continue
+            count += 1
+            if count % PROGRESS_EVERY == 0:
+                report(f"读取{ws.title}（已读取 {count} 行）")
+            if legacy:
+                model, vendor, dataset, test_type = map(_cell, _pad(row, base_columns)[1:])
+            else:
+                model, vendor, gpu, gpu_count, dataset, test_type = map(_cell, _pad(row, base_columns)[1:])
+            fields = PERF_FIELDS_MAP.get(test_type)
+            if fields is None:
+                skipped[test_type] += 1
+                continue
+            if legacy:
+                configs = envs.get((model, test_type, vendor, dataset)) or envs.get((model, test_type, vendor), ())
+                if len(configs) > 1:
+                    ambiguous[(model, test_type, vendor)] += 1
+                    continue
+                gpu, gpu_count = next(iter(configs), ("", ""))
+            input_fields, calc_fields = fields
+            values = [_cell(v) for v in _pad(row, base_columns + len(input_fields) + len(calc_fields))]
+            calc_start = base_columns + len(input_fields)
+            rows.append({
+                "id": str(uuid.uuid4()),
+                "model": model,
+                "test_type": test_type,
+                "vendor": vendor,
+                "gpu": gpu,
+                "dataset": dataset,
+                "gpu_count": gpu_count,
+                "input_fields": input_fields,
+                "calc_fields": calc_fields,
+                "input_values": dict(zip(input_fields, values[base_columns:calc_start])),
+                "calc_values": dict(zip(calc_fields, values[calc_start:])),
+            })
+        perf_data.extend(rows)
+
+    @staticmethod
+    def _env_candidates(project):
+        """旧版报告用：(模型, 测试类型, 厂家[, 数据集]) → 测试环境中出现的 {(GPU配置, GPU数量)}"""
+        envs = {}
+        for env in project.env_data:
+            config = (env["gpu"], env["gpu_count"])
+            envs.setdefault((env["model"], env["test_type"], env["vendor"], env["dataset"]), set()).add(config)
+            envs.setdefault((env["model"], env["test_type"], env["vendor"]), set()).add(config)
+        return envs
+
+    @staticmethod
+    def _read_problems(ws, project):
+        """项目问题：序号, 问题分类, 问题描述, 责任人, 解决方案"""
+        rows = []
+        for row in _values(ws):
+            _idx, category, description, person, solution = map(_cell, _pad(row, 5))
+            rows.append({
+                "id": str(uuid.uuid4()),
+                "category": category,
+                "description": description,
+                "person": person,
+                "solution": solution,
+            })
+        project.problem_data = RowStore(rows)
+
+    @staticmethod
+    def _read_summary(ws, project):
+        lines = [_cell(row[0]) if row else "" for row in ws.iter_rows(values_only=True)]
+        if lines == [SUMMARY_PLACEHOLDER]:
+            lines = []
+        project.project_summary = "\n".join(lines)
+
+    @staticmethod
+    def _add_test_type(project, model, test_type):
+        """把 (模型, 测试类型) 补入模型选择（保持出现顺序）"""
+        if not model:
+            return
+        if model not in project.selected_models:
+            project.selected_models.append(model)
+        test_types = project.model_test_type_map.setdefault(model, [])
+        if test_type and test_type not in test_types:
+            test_types.append(test_type)
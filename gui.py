@@ -1,18 +1,47 @@
 # gui.py - 核心GUI控制器（重构版）
+import importlib
+import threading
 import tkinter as tk
 from tkinter import messagebox
 import uuid
 from config import WINDOW_TITLE, WINDOW_WIDTH, WINDOW_HEIGHT, WINDOW_MIN_WIDTH, WINDOW_MIN_HEIGHT, PERF_FIELDS_MAP
-from utils import ScrollableFrame, UIRenderer
+from config import HISTORY_RECENT_PROJECTS, STARTUP_PREWARM_DELAY_MS, STARTUP_PREWARM_MODULES
+from utils import ScrollableFrame, UIRenderer, ProgressDialog, ChoiceDialog, HistoryDialog
 from steps_ui import StepsUIRenderer
 from data_manager import DataManager
-from excel_export import ExcelExporter
-from summary_generator import SummaryGenerator
+from project_model import PROJECT_INFO_FIELDS, ProjectModel
+from project_store import PROJECT_TABLES, STEP_TABLES, ProjectFile, ProjectStore, table_selection
+from background_job import BackgroundJob, JobCancelled
+from change_batcher import ChangeBatcher
+from derived_metrics import DerivedMetricEngine
+from autosave import AutosaveJournal
+from history_store import HistoryStore
+from perf_import import IMPORT_KEYS, PerfImporter
+
+# 计算吞吐时最多在提示框中列出的错误行数
+CALC_ERRORS_SHOWN = 10
+
+
+def _project_attr(name):
+    """把控制器上的数据属性代理到 ProjectModel 对应字段"""
+    return property(
+        lambda self: getattr(self.project, name),
+        lambda self, value: setattr(self.project, name, value),
+    )
 
 
 class GPUFullInfoGUI:
     """GPU性能测试工具的主GUI控制器"""
 
+    # ========== 数据属性（实际存储在 self.project 中） ==========
+    selected_models = _project_attr("selected_models")
+    model_test_type_map = _project_attr("model_test_type_map")
+    env_data = _project_attr("env_data")
+    pk_data = _project_attr("pk_data")
+    perf_data = _project_attr("perf_data")
+    problem_data = _project_attr("problem_data")
+    project_summary = _project_attr("project_summary")
+
     def __init__(self, root):
         self.root = root
         self.root.title(WINDOW_TITLE)
@@ -22,31 +51,30 @@ class GPUFullInfoGUI:
         # ========== 步骤管理 ==========
         self.current_step = 1
 
-        # ========== 全局数据变量 ==========
-        self.project_name = tk.StringVar()
-        self.test_cycle = tk.StringVar()
-        self.vendor_str = tk.StringVar()
+        # ========== 项目数据模型 ==========
+        self.project = ProjectModel.empty()
+        self.journal = AutosaveJournal()  # 自动保存的变更日志（崩溃恢复）
+        self.project_file = None  # 当前打开/保存的项目文件（ProjectFile）
+        self._table_selection = None  # 测试环境表生成时的选择，见 project_store.table_selection
+        self._stale_steps = set()  # 打开项目后尚未按新数据渲染的步骤
+
+        # ========== 全局数据变量（绑定到 self.project.info） ==========
+        self.project_name = self._bind_info_var("project_name")
+        self.test_cycle = self._bind_info_var("test_cycle")
+        self.vendor_str = self._bind_info_var("vendor_str")
         
         # Step 1 新增字段
-        self.customer_name = tk.StringVar()
-        self.customer_industry = tk.StringVar()
-        self.bid_status = tk.StringVar()
-        self.bid_share = tk.StringVar()
-        self.bid_fail_reason = tk.StringVar()
-        self.test_owner = tk.StringVar()
+        self.customer_name = self._bind_info_var("customer_name")
+        self.customer_industry = self._bind_info_var("customer_industry")
+        self.bid_status = self._bind_info_var("bid_status")
+        self.bid_share = self._bind_info_var("bid_share")
+        self.bid_fail_reason = self._bind_info_var("bid_fail_reason")
+        self.test_owner = self._bind_info_var("test_owner")
 
-        self.selected_models = []
-        self.model_test_type_map = {}
         self.model_vars = {}
         self.model_typet_vars = {}
         self.model_input_data = []  # 新增：存储用户输入的模型数据
 
-        self.env_data = []
-        self.pk_data = []
-        self.perf_data = []
-        self.problem_data = []
-        self.project_summary = ""
-
         # ========== UI框架引用 ==========
         self.main_scroll = ScrollableFrame(root)
         self.main_scroll.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
@@ -67,67 +95,127 @@ class GPUFullInfoGUI:
         self.perf_frame = None
         self.problem_frame = None
         self.summary_text = None
+        self._summary_lines = []  # 流式生成总结时已产出的行
 
         # ========== 按钮引用 ==========
         self.prev_btn = None
         self.next_btn = None
         self.gen_btn = None
         self.reset_btn = None
+        self.open_btn = None
+        self.save_btn = None
+
+        # ========== 表格编辑合并写回 ==========
+        self.change_batcher = ChangeBatcher(root)
+
+        # ========== 后台任务 ==========
+        self._active_job = None
+        self._progress_dialog = None
 
         # ========== 初始化UI ==========
         self.ui_renderer = StepsUIRenderer(self.main_frame, self)
         self.ui_renderer.create_all_steps()
 
+        # ========== 自动保存 ==========
+        self.journal.start(resume=self._offer_recovery())
+        self._watch_tables(PROJECT_TABLES)
+        self.change_batcher.subscribe(self._on_rows_changed)
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
+        # ========== 预热较重的模块（首帧绘制之后） ==========
+        if STARTUP_PREWARM_MODULES:
+            self.root.after(STARTUP_PREWARM_DELAY_MS, self._prewarm_modules)
+
+    @staticmethod
+    def _prewarm_modules():
+        """后台线程预先导入 openpyxl / yaml 等模块；导入失败留到真正使用时再报错"""
+        def _import_all():
+            for name in STARTUP_PREWARM_MODULES:
+                try:
+                    importlib.import_module(name)
+                except Exception:
+                    pass
+
+        threading.Thread(target=_import_all, name="prewarm-imports", daemon=True).start()
+
+    def _bind_info_var(self, name):
+        """创建 StringVar 并把写入同步到 self.project.info.<name>"""
+        var = tk.StringVar(value=getattr(self.project.info, name))
+
+        def _on_write(*args):
+            setattr(self.project.info, name, var.get())
+            self.journal.record_info(name, var.get())
+
+        var.trace_add("write", _on_write)
+        return var
+
     def prev_step(self):
         """上一步"""
+        self.change_batcher.flush()
         if self.current_step > 1:
             self.current_step -= 1
+            if self.current_step in self._stale_steps:
+                self._render_step(self.current_step)
             self._refresh_step_display()
 
     def next_step(self):
         """下一步"""
+        self.change_batcher.flush()
         if self.current_step == 1:
             if not self._validate_step1():
                 return
             self.current_step = 2
             self._load_models()
-            UIRenderer.render_models_and_test_types(
-                self.model_type_frame, self
-            )
+            self._render_step(2)
 
         elif self.current_step == 2:
             if not self._validate_step2():
                 return
             self.current_step = 3
             self._init_env_data()
-            UIRenderer.render_env_frame(
-                self.step3_frame,
-                self.env_data,
-                self.selected_models,
-                self.model_test_type_map,
-                self.vendor_str.get(),
-                self.main_scroll,
-            )
+            self._render_step(3)
 
         elif self.current_step == 3:
             if not self._validate_step3():
                 return
             self.current_step = 4
             self._init_perf_data()
-            UIRenderer.render_pk_frame(self.pk_frame, self.pk_data, self)
-            UIRenderer.render_perf_frame(self.perf_frame, self.perf_data, self)
+            self._render_step(4)
 
         elif self.current_step == 4:
             self.current_step = 5
-            UIRenderer.render_problem_frame(
-                self.problem_frame, self.problem_data, self
-            )
+            self._render_step(5)
 
         self._refresh_step_display()
 
+    def _render_step(self, step):
+        """渲染步骤界面（打开的项目文件中该步骤用到的表格此时才读入）"""
+        self.ui_renderer.ensure_step(step)
+        self._ensure_tables(STEP_TABLES.get(step, ()))
+        self._stale_steps.discard(step)
+        if step == 2:
+            UIRenderer.render_models_and_test_types(self.model_type_frame, self)
+        elif step == 3:
+            UIRenderer.render_env_frame(
+                self.step3_frame,
+                self.env_data,
+                self.selected_models,
+                self.model_test_type_map,
+                self.vendor_str.get(),
+                self.main_scroll,
+            )
+        elif step == 4:
+            UIRenderer.render_pk_frame(self.pk_frame, self.pk_data, self)
+            UIRenderer.render_perf_frame(self.perf_frame, self.perf_data, self)
+        elif step == 5:
+            UIRenderer.render_problem_frame(self.problem_frame, self.problem_data, self)
+
     def _refresh_step_display(self):
         """刷新步骤显示"""
         self.ui_renderer.refresh_step_display(self.current_step)
+        self.journal.record_nav(
+            self.current_step, self.selected_models, self.model_test_type_map, self._table_selection
+        )
 
     # ============ 验证逻辑 ============
     def _validate_step1(self):
@@ -206,50 +294,461 @@ class GPUFullInfoGUI:
             self.model_input_data = []
 
     def _init_env_data(self):
-        """初始化环境数据"""
+        """初始化环境数据（打开的项目文件中选择未变且尚未读入的环境表直接沿用）"""
+        selection = table_selection(self.project)
+        if self._pending_tables("env_data") and selection == self._table_selection:
+            return
+        # 环境表重新生成后，文件中由旧环境表派生的 PK/性能/问题表不再沿用
+        self._discard_pending_tables(PROJECT_TABLES)
+        self._table_selection = selection
         vendor_list = DataManager.parse_vendor_str(self.vendor_str.get())
         self.env_data = DataManager.init_env_data(
             self.selected_models, self.model_test_type_map, vendor_list
         )
+        self._watch_tables(("env_data",), record=True)
 
     def _init_perf_data(self):
-        """初始化性能和PK数据"""
+        """初始化性能和PK数据（打开的项目文件中尚未读入的表直接沿用）"""
+        if self._pending_tables("pk_data", "perf_data", "problem_data"):
+            return
+        self._discard_pending_tables(PROJECT_TABLES)
         self.perf_data, self.pk_data = DataManager.init_perf_data(
             self.env_data, self.selected_models, self.model_test_type_map
         )
         self.problem_data = DataManager.init_problem_data()
+        self._watch_tables(("pk_data", "perf_data", "problem_data"), record=True)
+
+    # ============ 项目文件 ============
+    def _pending_tables(self, *names):
+        """names 是否都还在打开的项目文件中尚未读入"""
+        return self.project_file is not None and all(name in self.project_file.pending for name in names)
+
+    def _discard_pending_tables(self, names):
+        """不再从项目文件读取 names（内存中的表将重新生成）"""
+        if self.project_file is not None:
+            self.project_file.pending.difference_update(names)
+
+    def _ensure_tables(self, names):
+        """把打开的项目文件中尚未读入的 names 表格读入内存"""
+        if self.project_file is not None:
+            self._watch_tables(self.project_file.load(self.project, names))
+
+    def _show_project(self, project, project_file, step, selection):
+        """界面切换到 project（打开项目或崩溃恢复后），只渲染 step 步骤"""
+        self.change_batcher.discard()
+        self.project = project
+        self.project_file = project_file
+        self._table_selection = selection
+        for name in PROJECT_INFO_FIELDS:
+            getattr(self, name).set(getattr(project.info, name))
+        self._load_models()
+        self._restore_model_input_data()
+        self._set_summary_text(self.project_summary)
+        self._watch_tables(PROJECT_TABLES)
+
+        # 只渲染当前步骤，其余步骤在切换到时再渲染
+        self.current_step = step
+        self._stale_steps = set(range(2, 6))
+        if self.current_step in self._stale_steps:
+            self._render_step(self.current_step)
+        self._refresh_step_display()
+
+    def open_project(self):
+        """打开项目文件：只读取基础信息，表格在进入对应步骤时才读入（也可打开导出的Excel报告）"""
+        if self._active_job is not None:
+            messagebox.showwarning("提示", "已有任务正在执行，请稍候")
+            return
+        path = ProjectStore.ask_open_path()
+        if not path:
+            return
+        if path.lower().endswith(".xlsx"):
+            self._open_excel_report(path)
+            return
+        try:
+            project, project_file = ProjectStore.open(path)
+        except Exception as e:
+            messagebox.showerror("错误", f"打开项目失败：{str(e)}")
+            return
+
+        self._show_project(project, project_file, project_file.current_step, project_file.table_selection)
+        # 打开的文件即为自动保存的新基准，此前的变更不再需要
+        self.journal.rebase(path, path)
+
+    def _open_excel_report(self, path):
+        """从导出的Excel报告重建项目（后台线程读取）；重建后为未保存的新项目"""
+
+        def _opened(result, elapsed):
+            project, warnings = result
+            # 报告不是项目文件：以空项目为基准，把重建的全部数据记入自动保存日志
+            self.journal.rebase(None)
+            self._show_project(project, None, 4, table_selection(project))
+            self._watch_tables(PROJECT_TABLES, record=True)
+            self.journal.record_summary(project.project_summary)
+            lines = [f"已从Excel报告重建项目（性能数据 {len(project.perf_data)} 行），耗时：{elapsed:.2f} 秒"]
+            lines.extend(warnings)
+            if warnings:
+                messagebox.showwarning("打开Excel报告", "\n".join(lines))
+            else:
+                messagebox.showinfo("打开Excel报告", "\n".join(lines))
+
+        from excel_import import ExcelImporter
+
+        self._run_background_job(
+            "打开Excel报告",
+            lambda progress: ExcelImporter.read_report(path, progress),
+            _opened,
+            "打开Excel报告失败",
+        )
+
+    def _restore_model_input_data(self):
+        """按打开项目的模型选择重建步骤2的输入控件数据"""
+        self.model_input_data = []
+        for model in self.selected_models:
+            selected = self.model_test_type_map.get(model, [])
+            test_types = list(self.test_types) + [tt for tt in selected if tt not in self.test_types]
+            self.model_input_data.append({
+                "model_name": tk.StringVar(value=model),
+                "test_types": {tt: tk.IntVar(value=int(tt in selected)) for tt in test_types},
+                "id": str(uuid.uuid4()),
+            })
+
+    def save_project(self):
+        """保存项目（后台线程写入）；已打开的项目文件中未读入的表格原样保留"""
+        if self._active_job is not None:
+            messagebox.showwarning("提示", "已有任务正在执行，请稍候")
+            return
+        if self.project_file is not None:
+            path = self.project_file.path
+            keep = frozenset(self.project_file.pending)
+        else:
+            path = ProjectStore.ask_save_path(self.project_name.get().strip())
+            keep = frozenset()
+        if not path:
+            return
+
+        self.change_batcher.flush()
+        snapshot = self.project.snapshot()
+        step, selection = self.current_step, self._table_selection
+        saved_seq = self.journal.seq
+
+        def _save(progress):
+            ProjectStore.save(path, snapshot, step, selection, keep, progress)
+            # 同时写入历史结果库；尚未读入的表格从刚保存的文件中读取
+            for name in ("env_data", "perf_data"):
+                if name in keep:
+                    setattr(snapshot, name, ProjectStore.load_table(path, name))
+            try:
+                HistoryStore.record(snapshot, path, progress=progress)
+            except JobCancelled:
+                raise
+            except Exception as e:
+                return path, str(e) or type(e).__name__
+            return path, None
+
+        def _saved(result, elapsed):
+            saved_path, history_error = result
+            self.project_file = ProjectFile(saved_path, keep, step, selection)
+            # 已写入文件的变更不再需要保留在日志中
+            self.journal.rebase(saved_path, saved_path, after_seq=saved_seq)
+            message = f"项目已保存：\n{saved_path}\n耗时：{elapsed:.2f} 秒"
+            if history_error:
+                messagebox.showwarning("警告", f"{message}\n\n写入历史结果库失败：{history_error}")
+            else:
+                messagebox.showinfo("成功", message)
+
+        self._run_background_job("保存项目", _save, _saved, "保存项目失败")
+
+    def show_history(self):
+        """打开历史数据面板（查询历史结果库中各项目的表现）"""
+        try:
+            options = HistoryStore.options()
+        except Exception as e:
+            messagebox.showerror("错误", f"读取历史结果库失败：{str(e)}")
+            return
+
+        def _query(model, test_type, field, vendor, gpu_count, config, last):
+            filters = {"vendor": vendor, "gpu_count": gpu_count, "config": config, "last": last}
+            return (
+                HistoryStore.summary(model, test_type, field, **filters),
+                HistoryStore.trend(model, test_type, field, **filters),
+            )
+
+        HistoryDialog(self.root, options, _query, HISTORY_RECENT_PROJECTS)
+
+    # ============ 自动保存 ============
+    def _watch_tables(self, names, record=False):
+        """把 names 表格的行变化登记到自动保存日志；record 为 True 时先登记整表（表格重新生成时）"""
+        for name in names:
+            store = getattr(self.project, name)
+            store.watch(lambda event, row, position, name=name: self._on_table_event(name, event, row, position))
+            if record:
+                self.journal.record_table(name, store)
+
+    def _on_table_event(self, name, event, row, position):
+        if event == "reset":
+            self.journal.record_table(name, getattr(self.project, name))
+        elif event == "extend":
+            self.journal.record_extend(name, row)
+        else:
+            self.journal.record_row(name, event, row, position)
+
+    def _on_rows_changed(self, row_ids):
+        """表格编辑写回后登记被编辑的行"""
+        for row_id in row_ids:
+            for name in PROJECT_TABLES:
+                store = getattr(self.project, name)
+                if store.get(row_id) is not None:
+                    store.touch(row_id)
+                    break
+
+    def _offer_recovery(self):
+        """有未正常退出的实例留下的自动保存会话时，从最近的一个起依次询问是否恢复
+
+        恢复后返回 True（本实例接管该会话，接着原日志继续写）；拒绝恢复的会话删除。
+        其他正在运行的实例的会话不在此列。
+        """
+        for directory in AutosaveJournal.orphans():
+            if not messagebox.askyesno("恢复数据", "检测到上次未正常退出，是否恢复自动保存的数据？"):
+                AutosaveJournal.remove_session(directory)
+                continue
+            if not self.journal.adopt(directory):
+                continue  # 同时启动的其他实例已接管
+            try:
+                self._load_models()  # 回放“重新计算”需要先注册 yaml 中的派生指标
+                state = AutosaveJournal.recover(directory)
+            except Exception as e:
+                AutosaveJournal.discard(directory, backup=True)
+                messagebox.showerror("错误", f"恢复失败（日志已备份为 .bak）：{str(e)}")
+                return False
+            break
+        else:
+            return False
+
+        project_file = None
+        if state.project_path:
+            project_file = ProjectFile(state.project_path, (), state.step, state.selection)
+        self._show_project(state.project, project_file, state.step, state.selection)
+        return True
+
+    def on_close(self):
+        """关闭窗口（正常退出）：结束自动保存并删除日志"""
+        self.journal.close(clean=True)
+        self.root.destroy()
 
     # ============ 计算和导出逻辑 ============
     def _calculate_throughput(self):
-        """计算推理吞吐"""
+        """计算性能数据的计算字段（吞吐等派生指标）"""
+        self.change_batcher.flush()
         try:
-            DataManager.calculate_throughput(self.perf_data)
+            errors = DataManager.calculate_throughput(self.perf_data)
+            self.journal.record_calculate()
             UIRenderer.render_perf_frame(self.perf_frame, self.perf_data, self)
-            messagebox.showinfo("成功", "吞吐数据计算完成！")
+            if errors:
+                lines = [DerivedMetricEngine.format_error(e) for e in errors[:CALC_ERRORS_SHOWN]]
+                if len(errors) > CALC_ERRORS_SHOWN:
+                    lines.append(f"……共 {len(errors)} 行")
+                messagebox.showwarning(
+                    "部分数据未计算", "以下行的数据无法解析，已跳过：\n" + "\n".join(lines)
+                )
+            else:
+                messagebox.showinfo("成功", "吞吐数据计算完成！")
         except Exception as e:
             messagebox.showerror("错误", f"计算失败：{str(e)}")
 
-    def _generate_project_summary(self):
-        """生成项目总结"""
+    def import_perf_data(self):
+        """从压测工具结果文件批量导入性能数据（后台线程解析，完成后一次追加到性能数据）"""
+        if self._active_job is not None:
+            messagebox.showwarning("提示", "已有任务正在执行，请稍候")
+            return
+        if not self.env_data:
+            messagebox.showwarning("提示", "没有测试环境，无法匹配导入的数据")
+            return
+        path = PerfImporter.ask_path()
+        if not path:
+            return
         try:
-            self.project_summary = SummaryGenerator.generate(self)
+            targets = set(PerfImporter.peek_columns(path).values())
+        except (OSError, ValueError) as e:
+            messagebox.showerror("错误", f"读取文件失败：{str(e)}")
+            return
+
+        # 文件中没有模型/厂家等列时，由用户指定全部记录所属的测试环境
+        defaults = {}
+        if len(self.env_data) > 1 and not {"model", "vendor"} <= targets:
+            labels = [
+                f"{env['model']} / {env['test_type']} / {env['vendor']} / {env.get('gpu', '')}"
+                f" / {env['gpu_count']}卡 / {env['dataset']}"
+                for env in self.env_data
+            ]
+            choice = ChoiceDialog.ask(
+                self.root, "选择测试环境", "文件中缺少模型/厂家列，请选择这些数据所属的测试环境：", labels
+            )
+            if choice is None:
+                return
+            env = self.env_data[choice]
+            defaults = {key: env.get(key, "") for key in IMPORT_KEYS}
+
+        self.change_batcher.flush()
+        env_rows = [dict(env) for env in self.env_data]
+
+        def _imported(result, elapsed):
+            if result.rows:
+                self._replace_placeholder_perf_rows(result.rows)
+                self.perf_data.extend(result.rows)
+                UIRenderer.render_perf_frame(self.perf_frame, self.perf_data, self)
+            show = messagebox.showinfo if result.rows else messagebox.showwarning
+            show("导入完成", "\n".join(result.summary_lines()))
+
+        self._run_background_job(
+            "导入性能数据",
+            lambda progress: PerfImporter.import_file(path, env_rows, defaults, progress=progress),
+            _imported,
+            "导入性能数据失败",
+        )
 
-            self.summary_text.config(state=tk.NORMAL)
-            self.summary_text.delete(1.0, tk.END)
-            self.summary_text.insert(tk.END, self.project_summary)
-            self.summary_text.config(state=tk.DISABLED)
+    def _replace_placeholder_perf_rows(self, rows):
+        """删除导入行所属环境中还没有填写任何数据的占位行（init_perf_data 为每个环境生成的空行）"""
+        envs = {(row["model"], row["test_type"], row["vendor"], row["gpu"]) for row in rows}
+        empty = [
+            row["id"]
+            for row in self.perf_data
+            if (row["model"], row["test_type"], row["vendor"], row.get("gpu", "")) in envs
+            and not any(row["input_values"].values())
+        ]
+        for row_id in empty:
+            self.perf_data.delete(row_id)
 
-            messagebox.showinfo("成功", "项目总结已自动生成，包含性能对比与结论！")
-        except Exception as e:
-            messagebox.showerror("错误", f"生成项目总结失败：{str(e)}")
+    def _generate_project_summary(self):
+        """生成项目总结（后台线程执行，界面保持响应）
+
+        总结按行流式产出，每次轮询把新产出的行追加到文本框，完成后再整体保存。
+        """
+        if self._active_job is not None:
+            messagebox.showwarning("提示", "已有任务正在执行，请稍候")
+            return
+        from summary_generator import SummaryGenerator
+
+        self.change_batcher.flush()
+        self._ensure_tables(PROJECT_TABLES)
+        snapshot = self.project.snapshot()
+        self._summary_lines = []
+        self._set_summary_text("")
+        self._run_background_job(
+            "生成项目总结",
+            lambda progress: SummaryGenerator.iter_lines(snapshot, progress=progress),
+            self._on_summary_done,
+            "生成项目总结失败",
+            on_output=self._append_summary_lines,
+            on_abort=lambda: self._set_summary_text(self.project_summary),
+        )
+
+    def _append_summary_lines(self, lines):
+        """把新产出的总结行追加到文本框末尾"""
+        text = "\n".join(lines)
+        if self._summary_lines:
+            text = "\n" + text
+        self._summary_lines.extend(lines)
+
+        self.summary_text.config(state=tk.NORMAL)
+        self.summary_text.insert(tk.END, text)
+        self.summary_text.config(state=tk.DISABLED)
+
+    def _set_summary_text(self, text):
+        """替换文本框中的总结内容（步骤5尚未创建时不做任何事，创建时按 project_summary 填充）"""
+        if self.summary_text is None:
+            return
+        self.summary_text.config(state=tk.NORMAL)
+        self.summary_text.delete(1.0, tk.END)
+        self.summary_text.insert(tk.END, text)
+        self.summary_text.config(state=tk.DISABLED)
+
+    def _on_summary_done(self, _result, elapsed):
+        """总结生成完成：保存完整总结（文本框已逐步填充）"""
+        self.project_summary = "\n".join(self._summary_lines)
+        self._summary_lines = []
+        self.journal.record_summary(self.project_summary)
+
+        messagebox.showinfo(
+            "成功", f"项目总结已自动生成，包含性能对比与结论！\n耗时：{elapsed:.2f} 秒"
+        )
 
     def generate_excel(self):
-        """生成Excel报告"""
-        ExcelExporter.generate_report(self)
+        """生成Excel报告（后台线程执行，界面保持响应）"""
+        if self._active_job is not None:
+            messagebox.showwarning("提示", "已有任务正在执行，请稍候")
+            return
+        from excel_export import ExcelExporter
+
+        save_path = ExcelExporter.ask_save_path()
+        if not save_path:
+            return
+
+        self.change_batcher.flush()
+        self._ensure_tables(PROJECT_TABLES)
+        snapshot = self.project.snapshot()
+        self._run_background_job(
+            "生成Excel报告",
+            lambda progress: ExcelExporter.write_report(save_path, snapshot, progress=progress),
+            lambda path, elapsed: messagebox.showinfo(
+                "成功", f"Excel已生成：\n{path}\n耗时：{elapsed:.2f} 秒"
+            ),
+            "生成失败",
+        )
+
+    # ============ 后台任务管理 ============
+    def _run_background_job(self, title, target, on_done, error_title, on_output=None, on_abort=None):
+        """在工作线程中执行 target(progress)，期间显示进度对话框
+
+        on_output 不为空时为流式任务（见 BackgroundJob）；on_abort 在任务失败或取消时调用。
+        """
+        if self._active_job is not None:
+            messagebox.showwarning("提示", "已有任务正在执行，请稍候")
+            return
+
+        def _finish():
+            self._active_job = None
+            if self._progress_dialog is not None:
+                self._progress_dialog.destroy()
+                self._progress_dialog = None
+
+        def _done(result, elapsed):
+            _finish()
+            on_done(result, elapsed)
+
+        def _error(exc, elapsed):
+            _finish()
+            if on_abort:
+                on_abort()
+            messagebox.showerror("错误", f"{error_title}：{str(exc)}")
+
+        def _cancelled(elapsed):
+            _finish()
+            if on_abort:
+                on_abort()
+            messagebox.showinfo("已取消", f"{title}已取消（耗时 {elapsed:.2f} 秒）")
+
+        self._active_job = BackgroundJob(
+            self.root,
+            target,
+            on_done=_done,
+            on_error=_error,
+            on_progress=lambda done, total, message: self._progress_dialog.update_progress(done, total, message),
+            on_cancel=_cancelled,
+            on_output=on_output,
+        )
+        self._progress_dialog = ProgressDialog(self.root, title, self._cancel_background_job)
+        self._active_job.start()
+
+    def _cancel_background_job(self):
+        """取消当前后台任务"""
+        if self._active_job is not None:
+            self._active_job.cancel()
+            self._progress_dialog.set_cancelling()
 
     def reset_all(self):
         """重置所有数据"""
         if messagebox.askyesno("确认", "确定要重置所有数据吗？"):
+            self.change_batcher.discard()
             self.current_step = 1
             self.project_name.set("")
             self.test_cycle.set("")
@@ -267,10 +766,11 @@ class GPUFullInfoGUI:
             self.pk_data.clear()
             self.problem_data.clear()
             self.project_summary = ""
-
-            self.summary_text.config(state=tk.NORMAL)
-            self.summary_text.delete(1.0, tk.END)
-            self.summary_text.config(state=tk.DISABLED)
+            self._set_summary_text("")
+            self.project_file = None
+            self._table_selection = None
+            self._stale_steps = set()
+            self.journal.rebase(None)
 
             self._refresh_step_display()
 
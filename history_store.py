@@ -0,0 +1,321 @@
+# history_store.py - 历史结果库：跨项目保存测试环境与性能数据，按模型/测试类型/指标查询历史表现
+import json
+import os
+import sqlite3
+import time
+from contextlib import closing
+
+from aggregation import metric_value
+from config import HISTORY_CONCURRENCY_FIELDS, HISTORY_CONFIG_FIELDS, HISTORY_DB_PATH, HISTORY_RECENT_PROJECTS
+from curve_analysis import format_config
+from numeric_cache import NumericCache
+from ranking import LOWER, MetricRanking
+
+# 每批写入的性能数据行数（每批汇报一次进度）
+HISTORY_BATCH_ROWS = 5000
+
+# 性能数据行中参与统计的区（输入字段与计算字段）
+_SECTIONS = ("input_values", "calc_values")
+
+# 库结构版本（PRAGMA user_version）：2 起序列按 GPU数量与测试配置区分，旧库打开时由性能数据重建序列
+HISTORY_SCHEMA_VERSION = 2
+
+# 测试配置显示文本中各取值的名称（长度字段沿用字段名，并发统一显示为"并发"）
+_CONFIG_LABELS = HISTORY_CONFIG_FIELDS + ("并发",)
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS projects ("
+    " id INTEGER PRIMARY KEY, source TEXT NOT NULL UNIQUE, name TEXT NOT NULL, test_cycle TEXT NOT NULL,"
+    " customer TEXT NOT NULL, vendor_str TEXT NOT NULL, recorded_at REAL NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS projects_recent ON projects (recorded_at)",
+    "CREATE TABLE IF NOT EXISTS env ("
+    " project_id INTEGER NOT NULL, pos INTEGER NOT NULL, model TEXT NOT NULL, test_type TEXT NOT NULL,"
+    " vendor TEXT NOT NULL, gpu TEXT NOT NULL, gpu_count TEXT NOT NULL, dataset TEXT NOT NULL,"
+    " tool TEXT NOT NULL, PRIMARY KEY (project_id, pos)) WITHOUT ROWID",
+    "CREATE INDEX IF NOT EXISTS env_key ON env (model, test_type, vendor, gpu)",
+    # 性能数据原样保存（各区为 JSON 文本），按 (模型, 测试类型, 厂家, GPU) 建索引
+    "CREATE TABLE IF NOT EXISTS perf ("
+    " project_id INTEGER NOT NULL, pos INTEGER NOT NULL, model TEXT NOT NULL, test_type TEXT NOT NULL,"
+    " vendor TEXT NOT NULL, gpu TEXT NOT NULL, gpu_count TEXT NOT NULL, dataset TEXT NOT NULL,"
+    " input_values TEXT NOT NULL, calc_values TEXT NOT NULL, PRIMARY KEY (project_id, pos)) WITHOUT ROWID",
+    "CREATE INDEX IF NOT EXISTS perf_key ON perf (model, test_type, vendor, gpu)",
+    # 指标序列：(模型, 测试类型, 指标字段, 厂家, GPU, GPU数量, 测试配置) 唯一，查询按前三者定位
+    "CREATE TABLE IF NOT EXISTS series ("
+    " id INTEGER PRIMARY KEY, model TEXT NOT NULL, test_type TEXT NOT NULL, field TEXT NOT NULL,"
+    " vendor TEXT NOT NULL, gpu TEXT NOT NULL, gpu_count TEXT NOT NULL, config TEXT NOT NULL,"
+    " UNIQUE (model, test_type, field, vendor, gpu, gpu_count, config))",
+    # 每个项目在每个序列上的预聚合值：查询只读这里，耗时与性能数据总行数无关
+    "CREATE TABLE IF NOT EXISTS series_stats ("
+    " series_id INTEGER NOT NULL, project_id INTEGER NOT NULL, n INTEGER NOT NULL, total REAL NOT NULL,"
+    " min_value REAL NOT NULL, max_value REAL NOT NULL, PRIMARY KEY (series_id, project_id)) WITHOUT ROWID",
+    "CREATE INDEX IF NOT EXISTS series_stats_project ON series_stats (project_id)",
+)
+
+
+def _no_progress(done, total, message=""):
+    pass
+
+
+def _encode(value):
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+class HistoryStore:
+    """历史结果库（单个 SQLite 文件，缺省为 config.HISTORY_DB_PATH）
+
+    record 把一个项目的测试环境与性能数据在一个事务中整体写入（同一来源再次写入时替换
+    旧数据），同时按 (模型, 测试类型, 指标, 厂家, GPU, GPU数量, 测试配置) 序列预聚合每个项目的
+    样本数、合计、最小与最大值。测试配置为推理类各行的输入/输出长度与并发（见
+    config.HISTORY_CONFIG_FIELDS），不同卡数、不同并发点的数据分属不同序列，不会被平均到一起。
+    summary / trend 只读取预聚合表，百万级性能数据行下仍为毫秒级查询。
+    """
+
+    @staticmethod
+    def record(project, source, path=HISTORY_DB_PATH, progress=None):
+        """写入（或替换）来源为 source 的项目，返回写入的性能数据行数
+
+        source 标识同一个项目（GUI 为项目文件路径，批处理为定义文件路径）。
+        progress(done, total, message) 每写入一批性能数据行调用一次。
+        """
+        if progress is None:
+            progress = _no_progress
+        source = os.path.abspath(source)
+        info = project.info
+        total = len(project.perf_data) or 1
+        stats = {}  # (模型, 测试类型, 指标, 厂家, GPU, GPU数量, 测试配置) → [样本数, 合计, 最小, 最大]
+
+        with closing(HistoryStore._connect(path)) as conn, conn:
+            HistoryStore._delete(conn, source)
+            project_id = conn.execute(
+                "INSERT INTO projects (source, name, test_cycle, customer, vendor_str, recorded_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (source, info.project_name, info.test_cycle, info.customer_name, info.vendor_str, time.time()),
+            ).lastrowid
+
+            conn.executemany(
+                "INSERT INTO env VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (project_id, pos, env["model"], env["test_type"], env["vendor"], env.get("gpu", ""),
+                     env.get("gpu_count", ""), env.get("dataset", ""), env.get("tool", ""))
+                    for pos, env in enumerate(project.env_data)
+                ],
+            )
+
+            rows = project.perf_data
+            for start in range(0, len(rows), HISTORY_BATCH_ROWS):
+                batch = []
+                for pos, row in enumerate(rows[start:start + HISTORY_BATCH_ROWS], start):
+                    HistoryStore._accumulate(stats, row)
+                    batch.append((
+                        project_id, pos, row["model"], row["test_type"], row["vendor"], row.get("gpu", ""),
+                        row.get("gpu_count", ""), row.get("dataset", ""),
+                        _encode(row["input_values"]), _encode(row["calc_values"]),
+                    ))
+                conn.executemany("INSERT INTO perf VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", batch)
+                progress(start + len(batch), total, "写入历史结果库")
+
+            HistoryStore._insert_stats(conn, project_id, stats)
+        return len(rows)
+
+    @staticmethod
+    def options(path=HISTORY_DB_PATH):
+        """库中已有的查询条件
+
+        返回 {模型: {测试类型: {"fields": [指标...], "vendors": [厂家...], "gpu_counts": [GPU数量...],
+        "configs": [测试配置...]}}}；没有测试配置的测试类型 configs 为 [""]。
+        """
+        if not os.path.isfile(path):
+            return {}
+        options = {}
+        with closing(HistoryStore._connect(path)) as conn:
+            for model, test_type, *values in conn.execute(
+                "SELECT DISTINCT model, test_type, field, vendor, gpu_count, config FROM series"
+                " ORDER BY model, test_type, id"
+            ):
+                entry = options.setdefault(model, {}).setdefault(
+                    test_type, {"fields": [], "vendors": [], "gpu_counts": [], "configs": []}
+                )
+                for name, value in zip(("fields", "vendors", "gpu_counts", "configs"), values):
+                    if value not in entry[name]:
+                        entry[name].append(value)
+        return options
+
+    @staticmethod
+    def summary(model, test_type, field, vendor=None, gpu=None, gpu_count=None, config=None,
+                last=HISTORY_RECENT_PROJECTS, path=HISTORY_DB_PATH):
+        """最近 last 个含该 (模型, 测试类型, 指标) 数据的项目中，按 (厂家, GPU, GPU数量, 测试配置) 汇总的历史表现
+
+        vendor / gpu / gpu_count / config 非空时只统计匹配的序列（config 为 options 中的测试配置文本）。
+        返回 [{"vendor", "gpu", "gpu_count", "config", "projects", "samples", "mean", "min", "max"}]，
+        按指标方向由优到劣排序（方向未声明时按均值从高到低）。last 为 None 时统计全部项目。
+        """
+        if not os.path.isfile(path):
+            return []
+        prefix, params = HistoryStore._recent_series(model, test_type, field, vendor, gpu, gpu_count, config, last)
+        sql = (
+            prefix + " SELECT s.vendor, s.gpu, s.gpu_count, s.config, COUNT(*), SUM(st.n), SUM(st.total) / SUM(st.n),"
+            "  MIN(st.min_value), MAX(st.max_value)"
+            " FROM series_stats st JOIN s ON st.series_id = s.id"
+            " WHERE st.project_id IN recent GROUP BY s.vendor, s.gpu, s.gpu_count, s.config"
+        )
+        with closing(HistoryStore._connect(path)) as conn:
+            keys = ("vendor", "gpu", "gpu_count", "config", "projects", "samples", "mean", "min", "max")
+            result = [dict(zip(keys, row)) for row in conn.execute(sql, params)]
+        result.sort(key=lambda r: r["mean"], reverse=MetricRanking.direction(field) != LOWER)
+        return result
+
+    @staticmethod
+    def trend(model, test_type, field, vendor=None, gpu=None, gpu_count=None, config=None,
+              last=HISTORY_RECENT_PROJECTS, path=HISTORY_DB_PATH):
+        """最近 last 个项目中每个项目、每个 (厂家, GPU, GPU数量, 测试配置) 的均值，按项目时间从新到旧
+
+        筛选条件同 summary。返回 [{"project", "test_cycle", "recorded_at", "vendor", "gpu", "gpu_count",
+        "config", "samples", "mean", "min", "max"}]。
+        """
+        if not os.path.isfile(path):
+            return []
+        prefix, params = HistoryStore._recent_series(model, test_type, field, vendor, gpu, gpu_count, config, last)
+        sql = (
+            prefix + " SELECT p.name, p.test_cycle, p.recorded_at, s.vendor, s.gpu, s.gpu_count, s.config,"
+            "  st.n, st.total / st.n, st.min_value, st.max_value"
+            " FROM series_stats st JOIN s ON st.series_id = s.id JOIN projects p ON p.id = st.project_id"
+            " WHERE st.project_id IN recent"
+            " ORDER BY p.recorded_at DESC, p.id DESC, s.vendor, s.gpu, s.gpu_count, s.id"
+        )
+        with closing(HistoryStore._connect(path)) as conn:
+            keys = ("project", "test_cycle", "recorded_at", "vendor", "gpu", "gpu_count", "config",
+                    "samples", "mean", "min", "max")
+            return [dict(zip(keys, row)) for row in conn.execute(sql, params)]
+
+    @staticmethod
+    def remove(source, path=HISTORY_DB_PATH):
+        """删除来源为 source 的项目，返回是否存在"""
+        if not os.path.isfile(path):
+            return False
+        with closing(HistoryStore._connect(path)) as conn, conn:
+            return HistoryStore._delete(conn, os.path.abspath(source))
+
+    # ========== 内部实现 ==========
+    @staticmethod
+    def _connect(path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = sqlite3.connect(path, timeout=30)
+        # WAL：保存（写入）期间界面中的历史查询不被阻塞
+        conn.execute("PRAGMA journal_mode = WAL")
+        if conn.execute("PRAGMA user_version").fetchone()[0] < HISTORY_SCHEMA_VERSION:
+            # 建表与升级在一个写事务中完成，多个进程同时打开旧库时只有一个执行升级
+            conn.execute("BEGIN IMMEDIATE")
+            with conn:
+                HistoryStore._migrate(conn)
+        return conn
+
+    @staticmethod
+    def _migrate(conn):
+        """建表；旧版本库的序列不区分 GPU数量与测试配置，删除后由已保存的性能数据重建"""
+        if conn.execute("PRAGMA user_version").fetchone()[0] >= HISTORY_SCHEMA_VERSION:
+            return
+        legacy = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'series'").fetchone()
+        if legacy:
+            conn.execute("DROP TABLE IF EXISTS series_stats")
+            conn.execute("DROP TABLE series")
+        for statement in _SCHEMA:
+            conn.execute(statement)
+        if legacy:
+            columns = ("model", "test_type", "vendor", "gpu", "gpu_count", "input_values", "calc_values")
+            project_ids = [row[0] for row in conn.execute("SELECT id FROM projects ORDER BY id")]
+            for project_id in project_ids:
+                stats = {}
+                for values in conn.execute(
+                    f"SELECT {', '.join(columns)} FROM perf WHERE project_id = ? ORDER BY pos", (project_id,)
+                ):
+                    row = dict(zip(columns, values))
+                    row["input_values"] = json.loads(row["input_values"])
+                    row["calc_values"] = json.loads(row["calc_values"])
+                    HistoryStore._accumulate(stats, row)
+                HistoryStore._insert_stats(conn, project_id, stats)
+        conn.execute(f"PRAGMA user_version = {HISTORY_SCHEMA_VERSION}")
+
+    @staticmethod
+    def _insert_stats(conn, project_id, stats):
+        """写入一个项目在各序列上的预聚合值（序列不存在时先创建）"""
+        conn.executemany(
+            "INSERT OR IGNORE INTO series (model, test_type, field, vendor, gpu, gpu_count, config)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            list(stats),
+        )
+        series_ids = {
+            key: conn.execute(
+                "SELECT id FROM series WHERE model = ? AND test_type = ? AND field = ? AND vendor = ? AND gpu = ?"
+                " AND gpu_count = ? AND config = ?",
+                key,
+            ).fetchone()[0]
+            for key in stats
+        }
+        conn.executemany(
+            "INSERT INTO series_stats VALUES (?, ?, ?, ?, ?, ?)",
+            [(series_ids[key], project_id, *values) for key, values in stats.items()],
+        )
+
+    @staticmethod
+    def _delete(conn, source):
+        """删除来源为 source 的项目及其全部行，返回是否存在（序列本身保留，供其他项目共用）"""
+        row = conn.execute("SELECT id FROM projects WHERE source = ?", (source,)).fetchone()
+        if row is None:
+            return False
+        for table in ("env", "perf", "series_stats"):
+            conn.execute(f"DELETE FROM {table} WHERE project_id = ?", row)
+        conn.execute("DELETE FROM projects WHERE id = ?", row)
+        return True
+
+    @staticmethod
+    def _recent_series(model, test_type, field, vendor, gpu, gpu_count, config, last):
+        """查询的公共部分：s 为匹配的序列，recent 为其中最近 last 个有数据的项目"""
+        where = ["model = ?", "test_type = ?", "field = ?"]
+        params = [model, test_type, field]
+        for column, value in (("vendor", vendor), ("gpu", gpu), ("gpu_count", gpu_count), ("config", config)):
+            if value:
+                where.append(f"{column} = ?")
+                params.append(value)
+        prefix = (
+            f"WITH s AS (SELECT id, vendor, gpu, gpu_count, config FROM series WHERE {' AND '.join(where)}),"
+            " recent AS (SELECT p.id FROM projects p WHERE p.id IN"
+            "  (SELECT st.project_id FROM series_stats st JOIN s ON st.series_id = s.id)"
+            "  ORDER BY p.recorded_at DESC, p.id DESC LIMIT ?)"
+        )
+        return prefix, params + [-1 if last is None else last]
+
+    @staticmethod
+    def _accumulate(stats, row):
+        """把行中可解析为数值的单元格计入对应序列"""
+        base = (row["model"], row["test_type"])
+        env = (row["vendor"], row.get("gpu", ""), row.get("gpu_count", ""), HistoryStore._config(row))
+        for section in _SECTIONS:
+            for field in row[section]:
+                value = NumericCache.value(row, section, field)
+                if value is None:
+                    continue
+                key = base + (field,) + env
+                entry = stats.get(key)
+                if entry is None:
+                    stats[key] = [1, value, value, value]
+                else:
+                    entry[0] += 1
+                    entry[1] += value
+                    if value < entry[2]:
+                        entry[2] = value
+                    elif value > entry[3]:
+                        entry[3] = value
+        return stats
+
+    @staticmethod
+    def _config(row):
+        """行的测试配置文本（输入/输出长度与并发）；均为空时返回空串"""
+        concurrency = None
+        for field in HISTORY_CONCURRENCY_FIELDS:
+            concurrency = metric_value(row, field)
+            if concurrency is not None:
+                break
+        config = tuple(metric_value(row, field) for field in HISTORY_CONFIG_FIELDS) + (concurrency,)
+        if all(value is None for value in config):
+            return ""
+        return format_config(config, _CONFIG_LABELS)
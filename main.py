@@ -1,4 +1,5 @@
-# main.py - 程序入口（仅需运行此文件）
+# main.py - 程序入口（仅需运行此文件；加 --debug 输出调试日志，如各步骤界面创建耗时）
+import logging
 import tkinter as tk
 from tkinter import messagebox
 import sys
@@ -13,21 +14,15 @@ def check_dependencies():
     except ImportError:
         missing.append("tkinter")
     
-    # 检查yaml
-    try:
-        __import__("yaml")
-    except ImportError:
-        missing.append("pyyaml")
-    
-    # 检查openpyxl（可能会卡注册表，跳过）
-    # openpyxl会在首次导入时读取Windows注册表，这里仅检查是否存在
-    try:
-        import importlib.util
-        spec = importlib.util.find_spec("openpyxl")
-        if spec is None:
-            missing.append("openpyxl")
-    except Exception:
-        missing.append("openpyxl")
+    # 检查yaml与openpyxl：仅检查是否存在，不在启动时导入
+    # （openpyxl会在首次导入时读取Windows注册表；两者都在首帧绘制后由后台线程预热）
+    import importlib.util
+    for module, package in (("yaml", "pyyaml"), ("openpyxl", "openpyxl")):
+        try:
+            if importlib.util.find_spec(module) is None:
+                missing.append(package)
+        except Exception:
+            missing.append(package)
     
     if missing:
         msg = f"缺失依赖库：{', '.join(missing)}\n\n请执行：\npip install {' '.join(missing)}"
@@ -41,6 +36,9 @@ def check_dependencies():
 
 def main():
     """主程序入口"""
+    if "--debug" in sys.argv[1:]:
+        logging.basicConfig(level=logging.DEBUG, format="%(asctime)s %(name)s %(message)s")
+
     if not check_dependencies():
         sys.exit(1)
     
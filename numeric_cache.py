@@ -0,0 +1,71 @@
+# numeric_cache.py - 性能数据单元格的数值缓存（避免报告生成时反复 float() 解析）
+
+# 数值影子在行字典中的键（不属于表格字段，导出/计算均不读取）
+CACHE_KEY = "numeric"
+
+
+class NumericCache:
+    """性能数据行 input_values / calc_values 的数值影子
+
+    每行在 row[CACHE_KEY] 中保存 {(区, 字段): (原始文本, 数值)}。读取时若单元格
+    当前文本与缓存时相同即命中；单元格被编辑（文本变化）后下一次读取才重新解析，
+    因此无论经由表格、计算还是导入写入都不需要额外通知缓存。深拷贝快照时影子
+    一并复制，后台生成总结同样命中。
+
+    hits / misses 为全局命中/未命中计数，供基准测试验证缓存效果。
+    """
+
+    hits = 0
+    misses = 0
+
+    @staticmethod
+    def value(row, section, field):
+        """单元格的数值；字段不存在、空值或无法解析时返回 None"""
+        raw = row.get(section, {}).get(field)
+        if raw is None:
+            return None
+        shadow = row.get(CACHE_KEY)
+        if shadow is None:
+            shadow = row[CACHE_KEY] = {}
+        key = (section, field)
+        entry = shadow.get(key)
+        if entry is not None and entry[0] == raw:
+            NumericCache.hits += 1
+            return entry[1]
+
+        NumericCache.misses += 1
+        try:
+            value = float(raw)
+        except (TypeError, ValueError):
+            value = None
+        shadow[key] = (raw, value)
+        return value
+
+    @staticmethod
+    def invalidate(row, section=None, field=None):
+        """丢弃行的数值影子；可只丢弃某区或某个单元格"""
+        shadow = row.get(CACHE_KEY)
+        if not shadow:
+            return
+        if section is None:
+            shadow.clear()
+        elif field is not None:
+            shadow.pop((section, field), None)
+        else:
+            for key in [k for k in shadow if k[0] == section]:
+                del shadow[key]
+
+    @staticmethod
+    def stats():
+        """命中/未命中计数快照"""
+        total = NumericCache.hits + NumericCache.misses
+        return {
+            "hits": NumericCache.hits,
+            "misses": NumericCache.misses,
+            "hit_rate": NumericCache.hits / total if total else 0.0,
+        }
+
+    @staticmethod
+    def reset_stats():
+        NumericCache.hits = 0
+        NumericCache.misses = 0
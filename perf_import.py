@@ -0,0 +1,347 @@
+# perf_import.py - 从压测工具结果文件（CSV / JSON / JSONL）批量导入性能数据行
+import csv
+import json
+import os
+import re
+import time
+import uuid
+from collections import Counter
+
+from config import PERF_FIELDS_MAP, PERF_IMPORT_COLUMNS, PERF_IMPORT_KEY_COLUMNS, PERF_IMPORT_RECORD_KEYS
+
+# 环境匹配键（顺序同 batch_cli._env_key）
+IMPORT_KEYS = ("model", "test_type", "vendor", "gpu")
+KEY_LABELS = {"model": "模型", "test_type": "测试类型", "vendor": "厂家", "gpu": "GPU"}
+
+# 每读取多少条记录汇报一次进度
+IMPORT_PROGRESS_ROWS = 5000
+# 结果中保留的出错记录示例数
+IMPORT_ERRORS_KEPT = 20
+# JSON 流式解析每次读取的字符数
+_JSON_CHUNK = 1 << 16
+
+_NORMALIZE_RE = re.compile(r"[\s_\-()（）\[\]/]+")
+
+
+def _no_progress(done, total, message=""):
+    pass
+
+
+def _normalize(name):
+    """列名比较用的规范形式：小写，去掉空白、下划线、连字符与括号"""
+    return _NORMALIZE_RE.sub("", str(name)).casefold()
+
+
+def _text(value):
+    """单元格值统一为字符串（None → 空串），与界面录入的数据类型一致"""
+    return "" if value is None else str(value).strip()
+
+
+class ImportResult:
+    """一次导入的结果
+
+    - rows：新建的性能数据行（尚未加入 perf_data）
+    - read：读取的记录数；skipped：按原因计数的跳过记录
+    - errors：前 IMPORT_ERRORS_KEPT 条跳过记录 (记录序号, 原因)
+    - columns：源列 → 目标（性能字段或匹配键）
+    """
+
+    __slots__ = ("path", "rows", "read", "skipped", "errors", "columns", "elapsed")
+
+    def __init__(self, path):
+        self.path = path
+        self.rows = []
+        self.read = 0
+        self.skipped = Counter()
+        self.errors = []
+        self.columns = {}
+        self.elapsed = 0.0
+
+    @property
+    def rows_per_second(self):
+        return self.read / self.elapsed if self.elapsed else 0.0
+
+    def skip(self, index, reason):
+        self.skipped[reason] += 1
+        if len(self.errors) < IMPORT_ERRORS_KEPT:
+            self.errors.append((index, reason))
+
+    def summary_lines(self):
+        """供提示框 / 命令行输出的结果摘要"""
+        lines = [
+            f"读取 {self.read} 条记录，导入 {len(self.rows)} 行，耗时 {self.elapsed:.2f} 秒"
+            f"（{self.rows_per_second:,.0f} 行/秒）"
+        ]
+        for reason, count in self.skipped.most_common():
+            lines.append(f"跳过 {count} 条：{reason}")
+        for index, reason in self.errors:
+            lines.append(f"  第 {index} 条：{reason}")
+        return lines
+
+
+class PerfImporter:
+    """流式读取结果文件，把列映射到各测试类型的 PERF_FIELDS_MAP 输入字段，
+    按 (模型, 测试类型, 厂家, GPU) 匹配测试环境行后生成性能数据行
+
+    文件逐条读取（CSV 按行、JSON 增量解码），内存只随导入的行数增长，与文件大小无关。
+    列名按 PERF_IMPORT_COLUMNS / PERF_IMPORT_KEY_COLUMNS 的别名识别；文件中没有的
+    匹配键可由 defaults 给出，或在环境行中唯一匹配。
+    """
+
+    @staticmethod
+    def ask_path():
+        """弹出打开对话框，返回用户选择的路径（取消时返回空串）"""
+        from tkinter import filedialog
+
+        return filedialog.askopenfilename(
+            filetypes=[("压测结果", "*.csv *.tsv *.json *.jsonl *.ndjson"), ("所有文件", "*.*")]
+        )
+
+    @staticmethod
+    def peek_columns(path, columns=None):
+        """读取第一条记录，返回其列映射 {源列: 目标}（文件为空时返回空字典）"""
+        for record in PerfImporter.iter_records(path):
+            return PerfImporter._column_map(record, PerfImporter._alias_lookup(columns))
+        return {}
+
+    @staticmethod
+    def import_file(path, env_rows, defaults=None, columns=None, progress=None):
+        """导入 path 中的全部记录，返回 ImportResult（不修改 env_rows，也不修改任何 perf_data）
+
+        Args:
+            env_rows: 测试环境行（匹配目标）
+            defaults: 可选 {"model"/"test_type"/"vendor"/"gpu": 值}，文件中缺少该列时使用
+            columns: 可选 {性能字段或匹配键: 源列名}，优先于别名识别
+            progress: 可选进度回调 progress(done, total, message)，按已读取字节汇报
+        """
+        if progress is None:
+            progress = _no_progress
+        started = time.perf_counter()
+        result = ImportResult(path)
+        defaults = {k: _text(v) for k, v in (defaults or {}).items() if k in IMPORT_KEYS and _text(v)}
+        lookup = PerfImporter._alias_lookup(columns)
+        resolve = PerfImporter._env_resolver(env_rows)
+        base_key = [defaults.get(k) for k in IMPORT_KEYS]
+        plans = {}  # 记录的列元组 → (匹配键列, 性能字段列)（同一文件通常只有一种）
+        total = os.path.getsize(path) or 1
+
+        with open(path, encoding="utf-8-sig", newline="") as fp:
+            for index, record in enumerate(PerfImporter._iter_file(fp, path), 1):
+                result.read = index
+                if index % IMPORT_PROGRESS_ROWS == 0:
+                    progress(min(fp.buffer.tell(), total), total, f"已读取 {index} 条记录")
+
+                signature = tuple(record)
+                plan = plans.get(signature)
+                if plan is None:
+                    column_map = PerfImporter._column_map(record, lookup)
+                    result.columns.update(column_map)
+                    plan = plans[signature] = (
+                        [(src, IMPORT_KEYS.index(dst)) for src, dst in column_map.items() if dst in IMPORT_KEYS],
+                        [(src, dst) for src, dst in column_map.items() if dst not in IMPORT_KEYS],
+                    )
+                key_columns, value_columns = plan
+
+                values = {}
+                for source, field in value_columns:
+                    value = record[source]
+                    value = value.strip() if value.__class__ is str else _text(value)
+                    if value:
+                        values[field] = value
+                if not values:
+                    result.skip(index, "没有可识别的性能字段")
+                    continue
+
+                key = base_key[:]
+                for source, i in key_columns:
+                    value = record[source]
+                    value = value.strip() if value.__class__ is str else _text(value)
+                    if value:
+                        key[i] = value
+                new_row, reason = resolve(tuple(key))
+                if new_row is None:
+                    result.skip(index, reason)
+                    continue
+                row = new_row(values)
+                if row is None:
+                    result.skip(index, f"性能字段不属于匹配的测试环境：{'、'.join(values)}")
+                    continue
+                result.rows.append(row)
+
+        result.elapsed = time.perf_counter() - started
+        progress(total, total, "完成")
+        return result
+
+    # ========== 记录读取 ==========
+    @staticmethod
+    def iter_records(path):
+        """逐条产出文件中的记录（dict）"""
+        with open(path, encoding="utf-8-sig", newline="") as fp:
+            yield from PerfImporter._iter_file(fp, path)
+
+    @staticmethod
+    def _iter_file(fp, path):
+        ext = os.path.splitext(path)[1].lower()
+        if ext in (".csv", ".tsv", ".txt"):
+            return PerfImporter._iter_csv(fp, "\t" if ext == ".tsv" else None)
+        return PerfImporter._iter_json(fp)
+
+    @staticmethod
+    def _iter_csv(fp, delimiter=None):
+        """CSV：首行为表头；分隔符缺省按表头中出现最多的 , / 制表符 / ; 判断"""
+        header = fp.readline()
+        if not header:
+            return
+        if delimiter is None:
+            delimiter = max(",\t;", key=header.count)
+        names = next(csv.reader([header], delimiter=delimiter))
+        for values in csv.reader(fp, delimiter=delimiter):
+            if values:
+                yield dict(zip(names, values))
+
+    @staticmethod
+    def _iter_json(fp):
+        """JSON / JSONL：顶层数组、逐行对象或多个拼接的对象都按记录逐条产出
+
+        顶层对象若在 PERF_IMPORT_RECORD_KEYS 中的键下存放记录列表，则产出列表中的记录，
+        对象的其余标量字段作为这些记录的缺省值。
+        """
+        for value in PerfImporter._iter_json_values(fp):
+            if not isinstance(value, dict):
+                continue
+            nested = next(
+                (value[k] for k in PERF_IMPORT_RECORD_KEYS if isinstance(value.get(k), list)), None
+            )
+            if nested is None:
+                yield value
+                continue
+            context = {k: v for k, v in value.items() if not isinstance(v, (dict, list))}
+            for item in nested:
+                if isinstance(item, dict):
+                    yield {**context, **item}
+
+    @staticmethod
+    def _iter_json_values(fp):
+        """增量解码：逐个产出顶层（或顶层数组内）的 JSON 值
+
+        缓冲区中的值不完整时追加读取；连续不完整时读取量随缓冲区翻倍，
+        单个很大的值也只需线性时间。
+        """
+        decoder = json.JSONDecoder()
+        buf = ""
+        pos = 0
+        eof = False
+        in_array = False
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n,":
+                pos += 1
+            if pos < len(buf) and not in_array and buf[pos] == "[":
+                in_array = True
+                pos += 1
+                continue
+            if pos < len(buf) and in_array and buf[pos] == "]":
+                in_array = False
+                pos += 1
+                continue
+            if pos < len(buf):
+                try:
+                    value, pos = decoder.raw_decode(buf, pos)
+                    yield value
+                    continue
+                except json.JSONDecodeError:
+                    if eof:
+                        raise ValueError(f"JSON 格式错误（第 {buf.count(chr(10), 0, pos) + 1} 行附近）")
+            elif eof:
+                return
+            chunk = fp.read(max(_JSON_CHUNK, len(buf) - pos))
+            buf = buf[pos:] + chunk
+            pos = 0
+            eof = not chunk
+
+    # ========== 列映射与环境匹配 ==========
+    @staticmethod
+    def _alias_lookup(columns=None):
+        """规范化列名 → 目标；显式 columns 优先，其次别名与字段名本身"""
+        lookup = {}
+        for key, aliases in PERF_IMPORT_KEY_COLUMNS.items():
+            for alias in [key] + list(aliases):
+                lookup.setdefault(_normalize(alias), key)
+        for field, aliases in PERF_IMPORT_COLUMNS.items():
+            for alias in [field] + list(aliases):
+                lookup.setdefault(_normalize(alias), field)
+        for input_fields, _calc_fields in PERF_FIELDS_MAP.values():
+            for field in input_fields:
+                lookup.setdefault(_normalize(field), field)
+        for target, source in (columns or {}).items():
+            lookup[_normalize(source)] = target
+        return lookup
+
+    @staticmethod
+    def _column_map(record, lookup):
+        """记录的 {源列: 目标}；多个源列指向同一目标时取第一个"""
+        column_map = {}
+        taken = set()
+        for source in record:
+            target = lookup.get(_normalize(source))
+            if target is not None and target not in taken:
+                column_map[source] = target
+                taken.add(target)
+        return column_map
+
+    @staticmethod
+    def _env_resolver(env_rows):
+        """返回 resolve(键元组) → (该环境的建行函数, None) 或 (None, 原因)；键中为 None 的位置不参与匹配
+
+        不区分大小写、忽略首尾空白；同一键元组的结果缓存，逐条匹配为 O(1)。
+        """
+        envs = [(tuple(_text(env.get(k)).casefold() for k in IMPORT_KEYS), env) for env in env_rows]
+        cache = {}
+
+        def resolve(key):
+            hit = cache.get(key)
+            if hit is not None:
+                return hit
+            wanted = [(i, v.casefold()) for i, v in enumerate(key) if v]
+            matches = [env for values, env in envs if all(values[i] == v for i, v in wanted)]
+            if len(matches) == 1:
+                hit = (PerfImporter._row_factory(matches[0]), None)
+            else:
+                shown = "、".join(f"{KEY_LABELS[k]}={v}" for k, v in zip(IMPORT_KEYS, key) if v) or "（无匹配列）"
+                problem = "未找到匹配的测试环境" if not matches else f"匹配到 {len(matches)} 个测试环境"
+                hit = (None, f"{problem}：{shown}")
+            cache[key] = hit
+            return hit
+
+        return resolve
+
+    @staticmethod
+    def _row_factory(env):
+        """返回 new_row(values)：按环境行创建性能数据行
+
+        行结构与 DataManager.init_perf_data 一致；字段列表由同一环境的各行共享。
+        values 中只取该测试类型的输入字段，一个都没有时（字段属于其他测试类型）返回 None。
+        """
+        input_fields, calc_fields = PERF_FIELDS_MAP.get(env["test_type"], ([], []))
+        template = {
+            "model": env["model"],
+            "test_type": env["test_type"],
+            "vendor": env["vendor"],
+            "gpu": env.get("gpu", ""),
+            "dataset": env["dataset"],
+            "gpu_count": env["gpu_count"],
+            "input_fields": input_fields,
+            "calc_fields": calc_fields,
+        }
+        empty_calc = dict.fromkeys(calc_fields, "")
+
+        def new_row(values):
+            input_values = {field: values.get(field, "") for field in input_fields}
+            if not any(input_values.values()):
+                return None
+            row = {"id": str(uuid.uuid4())}
+            row.update(template)
+            row["input_values"] = input_values
+            row["calc_values"] = empty_calc.copy()
+            return row
+
+        return new_row
@@ -0,0 +1,260 @@
+# project_model.py - 项目数据模型（不依赖tkinter，可在批处理/子进程中使用）
+import copy
+from collections.abc import MutableSequence
+from dataclasses import dataclass
+
+# 步骤1 项目基础信息字段（顺序即Excel/总结中的展示顺序）
+PROJECT_INFO_FIELDS = (
+    "project_name",
+    "test_cycle",
+    "vendor_str",
+    "customer_name",
+    "customer_industry",
+    "bid_status",
+    "bid_share",
+    "bid_fail_reason",
+    "test_owner",
+)
+
+
+class RowStore(MutableSequence):
+    """按 id 索引的有序行集合（行是带 "id" 键的字典）
+
+    行为与 list 相同（下标访问、迭代、insert/append/remove 等），另外维护
+    id → 行 的字典，使按 id 查找/编辑为 O(1)；id → 位置 的映射在结构变化后
+    惰性重建，连续的按 id 定位（index/position）摊销为 O(1)。
+
+    可通过 watch 登记一个观察者 observer(event, row, position)，行变化时调用：
+    "put"（插入新行，或 touch 登记的原地编辑）、"delete"（删除行）、"extend"
+    （extend 批量追加，row 为追加的行列表，position 为第一行的位置）、"reset"
+    （切片赋值/clear 等整表变化，row 与 position 为 None）。观察者不随拷贝/序列化复制。
+    """
+
+    __slots__ = ("_rows", "_by_id", "_positions", "_observer")
+
+    def __init__(self, rows=()):
+        self._rows = list(rows)
+        self._by_id = {row["id"]: row for row in self._rows}
+        self._positions = None
+        self._observer = None
+
+    def __reduce__(self):
+        return RowStore, (self._rows,)
+
+    # ========== MutableSequence 接口 ==========
+    def __len__(self):
+        return len(self._rows)
+
+    def __iter__(self):
+        return iter(self._rows)
+
+    def __getitem__(self, index):
+        return self._rows[index]
+
+    def __setitem__(self, index, row):
+        if isinstance(index, slice):
+            for old in self._rows[index]:
+                self._by_id.pop(old["id"], None)
+            self._rows[index] = list(row)
+            for new in self._rows[index]:
+                self._by_id[new["id"]] = new
+            self._positions = None
+            self._notify("reset", None, None)
+        else:
+            old = self._rows[index]
+            self._by_id.pop(old["id"], None)
+            self._rows[index] = row
+            self._by_id[row["id"]] = row
+            if old["id"] != row["id"]:
+                # 同 id 替换时位置映射仍然有效
+                self._positions = None
+                self._notify("delete", old, None)
+            if self._observer is not None:
+                self._notify("put", row, self.position(row["id"]))
+
+    def __delitem__(self, index):
+        removed = self._rows[index] if isinstance(index, slice) else [self._rows[index]]
+        del self._rows[index]
+        for row in removed:
+            self._by_id.pop(row["id"], None)
+        self._positions = None
+        if self._observer is not None:
+            for row in removed:
+                self._notify("delete", row, None)
+
+    def insert(self, index, row):
+        self._rows.insert(index, row)
+        self._by_id[row["id"]] = row
+        self._positions = None
+        if self._observer is not None:
+            last = len(self._rows) - 1
+            self._notify("put", row, min(index, last) if index >= 0 else max(index + last, 0))
+
+    def append(self, row):
+        self._rows.append(row)
+        self._by_id[row["id"]] = row
+        if self._positions is not None:
+            self._positions[row["id"]] = len(self._rows) - 1
+        if self._observer is not None:
+            self._notify("put", row, len(self._rows) - 1)
+
+    def extend(self, rows):
+        """批量追加（只通知观察者一次）"""
+        rows = list(rows)
+        start = len(self._rows)
+        self._rows.extend(rows)
+        for row in rows:
+            self._by_id[row["id"]] = row
+        if self._positions is not None:
+            for i, row in enumerate(rows, start):
+                self._positions[row["id"]] = i
+        if rows:
+            self._notify("extend", rows, start)
+
+    def clear(self):
+        self._rows.clear()
+        self._by_id.clear()
+        self._positions = None
+        self._notify("reset", None, None)
+
+    def __contains__(self, row):
+        return isinstance(row, dict) and self._by_id.get(row.get("id")) is row
+
+    def index(self, row, *args):
+        """返回 row 的位置（按 id 定位）"""
+        position = self.position(row["id"])
+        if position is None or self._rows[position] is not row:
+            raise ValueError("row is not in RowStore")
+        return position
+
+    def remove(self, row):
+        del self[self.index(row)]
+
+    def __repr__(self):
+        return f"RowStore({self._rows!r})"
+
+    # ========== 按 id 访问 ==========
+    def get(self, row_id):
+        """按 id 取行，不存在时返回 None"""
+        return self._by_id.get(row_id)
+
+    def position(self, row_id):
+        """按 id 取当前位置，不存在时返回 None"""
+        if row_id not in self._by_id:
+            return None
+        if self._positions is None:
+            self._positions = {row["id"]: i for i, row in enumerate(self._rows)}
+        return self._positions[row_id]
+
+    def delete(self, row_id):
+        """按 id 删除行，返回被删除的行（不存在时返回 None）"""
+        position = self.position(row_id)
+        if position is None:
+            return None
+        row = self._rows[position]
+        del self[position]
+        return row
+
+    def insert_after(self, row_id, row):
+        """把 row 插入到 row_id 所在行之后（row_id 不存在时追加到末尾）"""
+        position = self.position(row_id)
+        if position is None:
+            self.append(row)
+        else:
+            self.insert(position + 1, row)
+
+    # ========== 变化通知 ==========
+    def watch(self, observer):
+        """登记观察者（None 表示取消），同一时间只有一个"""
+        self._observer = observer
+
+    def touch(self, row_id):
+        """登记对 row_id 所在行的原地编辑（通知观察者）"""
+        if self._observer is not None and row_id in self._by_id:
+            self._notify("put", self._by_id[row_id], self.position(row_id))
+
+    def _notify(self, event, row, position):
+        if self._observer is not None:
+            self._observer(event, row, position)
+
+
+@dataclass
+class ProjectInfo:
+    """步骤1：项目基础信息"""
+
+    __slots__ = PROJECT_INFO_FIELDS
+
+    project_name: str
+    test_cycle: str
+    vendor_str: str
+    customer_name: str
+    customer_industry: str
+    bid_status: str
+    bid_share: str
+    bid_fail_reason: str
+    test_owner: str
+
+    @classmethod
+    def empty(cls):
+        """创建全部字段为空串的项目信息"""
+        return cls(*([""] * len(PROJECT_INFO_FIELDS)))
+
+    @classmethod
+    def from_dict(cls, data):
+        """从字典创建（缺失字段为空串，None 视为空串）"""
+        values = []
+        for name in PROJECT_INFO_FIELDS:
+            value = data.get(name, "")
+            values.append("" if value is None else str(value))
+        return cls(*values)
+
+
+@dataclass
+class ProjectModel:
+    """一个项目的全部数据：基础信息 + 各步骤表格行
+
+    表格行沿用字典结构（与 DataManager / UIRenderer 中的行格式一致），
+    各表格存放在 RowStore 中，界面与数据层都通过行 id 直接定位行；
+    GUI 只负责把控件绑定到这里的字段上。
+    """
+
+    __slots__ = (
+        "info",
+        "selected_models",
+        "model_test_type_map",
+        "env_data",
+        "pk_data",
+        "perf_data",
+        "problem_data",
+        "project_summary",
+    )
+
+    info: ProjectInfo
+    selected_models: list
+    model_test_type_map: dict
+    env_data: RowStore
+    pk_data: RowStore
+    perf_data: RowStore
+    problem_data: RowStore
+    project_summary: str
+
+    @classmethod
+    def empty(cls):
+        """创建空项目"""
+        return cls(ProjectInfo.empty(), [], {}, RowStore(), RowStore(), RowStore(), RowStore(), "")
+
+    def snapshot(self):
+        """返回深拷贝，供后台任务/子进程在不影响界面数据的情况下使用"""
+        return copy.deepcopy(self)
+
+    def clear(self):
+        """清空全部数据（保持列表对象不变，已绑定的引用仍然有效）"""
+        for name in PROJECT_INFO_FIELDS:
+            setattr(self.info, name, "")
+        self.selected_models.clear()
+        self.model_test_type_map.clear()
+        self.env_data.clear()
+        self.pk_data.clear()
+        self.perf_data.clear()
+        self.problem_data.clear()
+        self.project_summary = ""
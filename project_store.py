@@ -0,0 +1,300 @@
+# project_store.py - 项目文件（单个 SQLite 文件）的保存与按表按需加载
+import json
+import os
+import sqlite3
+from contextlib import closing
+
+from numeric_cache import CACHE_KEY
+from project_model import PROJECT_INFO_FIELDS, ProjectInfo, ProjectModel, RowStore
+from scenarios import SCENARIO_CACHE_KEY
+
+PROJECT_FILE_EXT = ".gpuproj"
+PROJECT_FORMAT_VERSION = 1
+
+# 项目文件中的表格（ProjectModel 字段名 → 进度提示中的名称）
+PROJECT_TABLES = {
+    "env_data": "测试环境",
+    "pk_data": "PK指标",
+    "perf_data": "性能数据",
+    "problem_data": "项目问题",
+}
+
+# 各步骤界面用到的表格；打开项目后只在进入该步骤时读取
+STEP_TABLES = {
+    3: ("env_data",),
+    4: ("pk_data", "perf_data"),
+    5: ("problem_data",),
+}
+
+# 每批写入的行数（每批汇报一次进度，可在批之间取消）
+SAVE_BATCH_ROWS = 2000
+
+# 行字典中的缓存键，只在内存中有意义，不写入文件
+TRANSIENT_ROW_KEYS = (CACHE_KEY, SCENARIO_CACHE_KEY)
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)",
+    # 各表格中出现过的行结构（见 _RowCodec）
+    "CREATE TABLE IF NOT EXISTS shapes ("
+    " tbl TEXT NOT NULL, idx INTEGER NOT NULL, spec TEXT NOT NULL, PRIMARY KEY (tbl, idx)"
+    ") WITHOUT ROWID",
+    # 每行一个 JSON 数组；(表, 位置) 为主键，同一表的行在文件中连续存放，按表读取只扫描该区间
+    "CREATE TABLE IF NOT EXISTS rows ("
+    " tbl TEXT NOT NULL, pos INTEGER NOT NULL, data TEXT NOT NULL, PRIMARY KEY (tbl, pos)"
+    ") WITHOUT ROWID",
+)
+
+
+def _no_progress(done, total, message=""):
+    pass
+
+
+def _encode(value):
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+class _RowCodec:
+    """表格行的紧凑编码
+
+    同一表格的行结构高度重复（性能数据行的 input_fields / calc_fields 列表及
+    input_values / calc_values 的键对每个测试类型都相同），因此把行结构单独存为
+    "shape"：[[键, "v"], [键, "d", [子键...]], [键, "l", [元素...]]]，行本身只存
+    [shape 下标, 值...]——"v" 原样存值，"d" 按子键顺序存字典的值，"l"（字符串列表）
+    整个列表属于结构、不占行数据。
+    """
+
+    def __init__(self, specs=()):
+        self.specs = []
+        self._index = {}
+        self._plans = []  # 每个 shape 的解码计划 [(键, 类型, 子键/元素, 值下标)]
+        for spec in specs:
+            self._add(tuple((key, kind, *map(tuple, payload)) for key, kind, *payload in spec))
+
+    def _add(self, spec):
+        index = self._index[spec] = len(self.specs)
+        self.specs.append(spec)
+        plan = []
+        slot = 1
+        for key, kind, *payload in spec:
+            plan.append((key, kind, payload[0] if payload else None, slot))
+            if kind != "l":
+                slot += 1
+        self._plans.append(plan)
+        return index
+
+    def encode(self, row):
+        """返回 (行数据 JSON, 新出现的 shape 下标或 None)"""
+        spec = []
+        values = []
+        for key, value in row.items():
+            if key in TRANSIENT_ROW_KEYS:
+                continue
+            if isinstance(value, dict) and all(isinstance(k, str) for k in value):
+                spec.append((key, "d", tuple(value)))
+                values.append(list(value.values()))
+            elif isinstance(value, list) and all(isinstance(v, str) for v in value):
+                spec.append((key, "l", tuple(value)))
+            else:
+                spec.append((key, "v"))
+                values.append(value)
+        spec = tuple(spec)
+        index = self._index.get(spec)
+        added = None
+        if index is None:
+            index = added = self._add(spec)
+        return _encode([index] + values), added
+
+    def decode(self, data):
+        values = json.loads(data)
+        return {
+            key: list(payload) if kind == "l" else dict(zip(payload, values[slot])) if kind == "d" else values[slot]
+            for key, kind, payload, slot in self._plans[values[0]]
+        }
+
+
+def table_selection(project):
+    """表格行所依据的选择（模型、各模型的测试类型、厂家），JSON 往返后保持相等"""
+    models = list(project.selected_models)
+    return [models, [[m, list(project.model_test_type_map.get(m, ()))] for m in models], project.info.vendor_str]
+
+
+class ProjectFile:
+    """已打开/已保存的项目文件
+
+    - path：文件路径
+    - pending：尚未从文件读入内存的表格名（首次需要时由 load 读取）
+    - current_step：保存时所在的步骤
+    - table_selection：文件中表格行生成时的选择（table_selection()），尚未生成表格时为 None；
+      界面据此判断文件中的表格是否仍可沿用
+    """
+
+    def __init__(self, path, pending=(), current_step=1, table_selection=None):
+        self.path = path
+        self.pending = set(pending)
+        self.current_step = current_step
+        self.table_selection = table_selection
+
+    def load(self, project, names):
+        """把 names 中尚未读入的表格从文件读入 project，返回实际读取的表格名"""
+        loaded = [name for name in names if name in self.pending]
+        for name in loaded:
+            setattr(project, name, ProjectStore.load_table(self.path, name))
+            self.pending.discard(name)
+        return loaded
+
+
+class ProjectStore:
+    """项目文件读写
+
+    文件为单个 SQLite 数据库：meta 表保存基础信息、模型选择、总结和当前步骤（JSON 文本），
+    shapes / rows 表按 _RowCodec 保存表格行结构与各行的值。打开项目时只读取 meta，表格行在界面
+    进入对应步骤时才逐表解析（ProjectFile.load）。
+    """
+
+    @staticmethod
+    def ask_open_path():
+        """弹出打开对话框，返回用户选择的路径（取消时返回空串）"""
+        from tkinter import filedialog
+
+        return filedialog.askopenfilename(
+            filetypes=[("项目文件", f"*{PROJECT_FILE_EXT}"), ("导出的Excel报告", "*.xlsx")]
+        )
+
+    @staticmethod
+    def ask_save_path(project_name=""):
+        """弹出保存对话框，返回用户选择的路径（取消时返回空串）"""
+        from tkinter import filedialog
+
+        return filedialog.asksaveasfilename(
+            defaultextension=PROJECT_FILE_EXT,
+            filetypes=[("项目文件", f"*{PROJECT_FILE_EXT}")],
+            initialfile=f"{project_name or '未命名项目'}{PROJECT_FILE_EXT}",
+        )
+
+    @staticmethod
+    def save(path, project, current_step=1, selection=None, keep=(), progress=None):
+        """把 project 写入 path（不依赖GUI，可供后台任务调用）
+
+        selection 为表格行生成时的选择（见 table_selection），随文件保存。
+        keep 中的表格保留 path 现有文件中的行（用于保存尚未读入内存的表格），此时
+        在原文件上以单个事务改写其余表格；否则先写入临时文件再替换，写入中途失败或
+        取消都不会破坏原文件。progress(done, total, message) 每写入一批行调用一次。
+        """
+        if progress is None:
+            progress = _no_progress
+        tables = [name for name in PROJECT_TABLES if name not in keep]
+        if keep and not os.path.isfile(path):
+            raise ValueError(f"项目文件不存在：{path}")
+        target = path if keep else path + ".tmp"
+        if not keep and os.path.exists(target):
+            os.remove(target)
+
+        conn = sqlite3.connect(target)
+        try:
+            with conn:
+                for statement in _SCHEMA:
+                    conn.execute(statement)
+                if keep:
+                    ProjectStore._check_version(conn)
+                ProjectStore._write_meta(conn, project, current_step, selection)
+                ProjectStore._write_tables(conn, project, tables, progress)
+        except BaseException:
+            conn.close()
+            if not keep:
+                os.remove(target)
+            raise
+        conn.close()
+        if not keep:
+            os.replace(target, path)
+        progress(1, 1, "完成")
+        return path
+
+    @staticmethod
+    def open(path):
+        """读取项目基础信息，返回 (ProjectModel, ProjectFile)
+
+        返回的 ProjectModel 中各表格为空，对应表格名都在 ProjectFile.pending 中。
+        文件不是项目文件或版本不支持时抛出 ValueError。
+        """
+        with ProjectStore._connect(path) as conn:
+            meta = ProjectStore._check_version(conn)
+        project = ProjectModel.empty()
+        project.info = ProjectInfo.from_dict(meta.get("info", {}))
+        project.selected_models = list(meta.get("selected_models", []))
+        project.model_test_type_map = {m: list(tts) for m, tts in meta.get("model_test_type_map", {}).items()}
+        project.project_summary = meta.get("project_summary", "")
+        project_file = ProjectFile(
+            path, PROJECT_TABLES, int(meta.get("current_step", 1)), meta.get("table_selection")
+        )
+        return project, project_file
+
+    @staticmethod
+    def load_table(path, name):
+        """按保存顺序读取一个表格的全部行"""
+        with ProjectStore._connect(path) as conn:
+            specs = conn.execute("SELECT spec FROM shapes WHERE tbl = ? ORDER BY idx", (name,))
+            codec = _RowCodec(json.loads(spec) for (spec,) in specs)
+            cursor = conn.execute("SELECT data FROM rows WHERE tbl = ? ORDER BY pos", (name,))
+            return RowStore(codec.decode(data) for (data,) in cursor)
+
+    # ========== 内部实现 ==========
+    @staticmethod
+    def _connect(path):
+        """只读打开项目文件（返回的连接在 with 块结束时关闭）"""
+        if not os.path.isfile(path):
+            raise ValueError(f"项目文件不存在：{path}")
+        return closing(sqlite3.connect(f"file:{path}?mode=ro", uri=True))
+
+    @staticmethod
+    def _check_version(conn):
+        """读取 meta 并校验文件版本"""
+        try:
+            meta = {key: json.loads(value) for key, value in conn.execute("SELECT key, value FROM meta")}
+        except sqlite3.DatabaseError:
+            raise ValueError("不是有效的项目文件")
+        version = meta.get("format_version")
+        if version != PROJECT_FORMAT_VERSION:
+            raise ValueError(f"不支持的项目文件版本：{version}")
+        return meta
+
+    @staticmethod
+    def _write_meta(conn, project, current_step, selection):
+        meta = {
+            "format_version": PROJECT_FORMAT_VERSION,
+            "info": {name: getattr(project.info, name) for name in PROJECT_INFO_FIELDS},
+            "selected_models": project.selected_models,
+            "model_test_type_map": project.model_test_type_map,
+            "project_summary": project.project_summary,
+            "current_step": current_step,
+            "table_selection": selection,
+        }
+        conn.executemany(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+            [(key, _encode(value)) for key, value in meta.items()],
+        )
+
+    @staticmethod
+    def _write_tables(conn, project, tables, progress):
+        total = sum(len(getattr(project, name)) for name in tables) or 1
+        done = 0
+        for name in tables:
+            rows = getattr(project, name)
+            message = f"写入{PROJECT_TABLES[name]}"
+            progress(done, total, message)
+            conn.execute("DELETE FROM rows WHERE tbl = ?", (name,))
+            conn.execute("DELETE FROM shapes WHERE tbl = ?", (name,))
+            codec = _RowCodec()
+            for start in range(0, len(rows), SAVE_BATCH_ROWS):
+                batch = []
+                for pos, row in enumerate(rows[start:start + SAVE_BATCH_ROWS], start):
+                    data, added = codec.encode(row)
+                    if added is not None:
+                        conn.execute(
+                            "INSERT INTO shapes (tbl, idx, spec) VALUES (?, ?, ?)",
+                            (name, added, _encode(codec.specs[added])),
+                        )
+                    batch.append((name, pos, data))
+                conn.executemany("INSERT INTO rows (tbl, pos, data) VALUES (?, ?, ?)", batch)
+                done += len(batch)
+                progress(done, total, message)
+
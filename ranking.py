@@ -0,0 +1,90 @@
+# ranking.py - 按指标方向（越高/越低越好）判定胜负与厂商排名
+import copy
+
+from config import METRIC_META, METRIC_TIE_TOLERANCE
+
+HIGHER = "higher"
+LOWER = "lower"
+DIRECTION_LABELS = {HIGHER: "越高越好", LOWER: "越低越好"}
+
+# 胜负判定结果
+WIN, LOSS, TIE = "胜", "负", "平"
+
+# config 中的缺省指标元数据（每次 register 在此基础上合并）
+_DEFAULT_META = copy.deepcopy(METRIC_META)
+
+
+class MetricRanking:
+    """基于 METRIC_META 的指标方向，比较两组数值、对多个厂家排序"""
+
+    @staticmethod
+    def register(declarations):
+        """在 config 缺省元数据的基础上合并 yaml 中声明的指标元数据 {字段: {"direction", "unit", "per_card"}}
+
+        每次注册都从缺省元数据开始，上一个配置（如批处理中的上一个定义文件）声明的元数据不会沿用；
+        direction 只能是 higher / lower（或省略）；有误时不修改已有配置并抛出 ValueError。
+        """
+        parsed = {}
+        for field, spec in (declarations or {}).items():
+            spec = spec or {}
+            if not isinstance(spec, dict):
+                raise ValueError(f"指标 {field} 的元数据应为映射：{spec!r}")
+            direction = spec.get("direction")
+            if direction is not None and direction not in DIRECTION_LABELS:
+                raise ValueError(f"指标 {field} 的 direction 必须是 {'/'.join(DIRECTION_LABELS)} 之一：{direction}")
+            meta = {"unit": str(spec.get("unit", ""))}
+            if direction is not None:
+                meta["direction"] = direction
+            if spec.get("per_card"):
+                meta["per_card"] = str(spec["per_card"])
+            parsed[str(field)] = meta
+        METRIC_META.clear()
+        METRIC_META.update(copy.deepcopy(_DEFAULT_META))
+        METRIC_META.update(parsed)
+
+    @staticmethod
+    def direction(field):
+        """higher / lower；未声明时为 None"""
+        return METRIC_META.get(field, {}).get("direction")
+
+    @staticmethod
+    def unit(field):
+        return METRIC_META.get(field, {}).get("unit", "")
+
+    @staticmethod
+    def normalized_field(field, available):
+        """跨厂家排名使用的字段：声明了 per_card 且该字段在 available 中时用单卡值"""
+        per_card = METRIC_META.get(field, {}).get("per_card")
+        return per_card if per_card and per_card in available else field
+
+    @staticmethod
+    def advantage(field, value, baseline):
+        """value 相对 baseline 的优势比例（> 0 表示更优）；方向未定义或无法比较时为 None
+
+        越高越好：value / baseline - 1；越低越好：baseline / value - 1。
+        """
+        direction = MetricRanking.direction(field)
+        if direction is None or value is None or baseline is None:
+            return None
+        if direction == HIGHER:
+            return value / baseline - 1 if baseline else None
+        return baseline / value - 1 if value else None
+
+    @staticmethod
+    def verdict(advantage):
+        """优势比例 → 胜 / 负 / 平（None 表示不判定）"""
+        if advantage is None:
+            return None
+        if abs(advantage) <= METRIC_TIE_TOLERANCE:
+            return TIE
+        return WIN if advantage > 0 else LOSS
+
+    @staticmethod
+    def rank(field, values):
+        """按方向从优到劣排序 [(键, 数值)]，跳过 None；方向未定义时返回 None"""
+        direction = MetricRanking.direction(field)
+        if direction is None:
+            return None
+        scored = [(key, value) for key, value in values if value is not None]
+        scored.sort(key=lambda item: item[1], reverse=direction == HIGHER)
+        return scored
@@ -0,0 +1,148 @@
+# scenarios.py - 文本类测试的场景划分（场景定义可在 model_config.yaml 中配置）
+import copy
+import math
+
+from config import CURVE_CONCURRENCY_FIELDS, SCENARIO_DEFINITIONS
+from numeric_cache import NumericCache
+
+# 场景归属缓存在行字典中的键
+SCENARIO_CACHE_KEY = "scenarios"
+
+# 可用于区间条件的行特征（顺序即特征元组中的下标）
+SCENARIO_FEATURES = ("input", "output", "total", "concurrency")
+
+_RELATIONS = {
+    "input < output": lambda inp, out: inp < out,
+    "input > output": lambda inp, out: inp > out,
+    "input = output": lambda inp, out: inp == out,
+}
+_LENGTH_FIELDS = ("输入长度（tokens）", "输出长度（tokens）")
+# config 中的缺省场景定义（register(None) 时恢复）
+_DEFAULT_DEFINITIONS = copy.deepcopy(SCENARIO_DEFINITIONS)
+
+
+class ScenarioBucketer:
+    """按 SCENARIO_DEFINITIONS 把性能数据行划入场景
+
+    场景定义只在注册时编译一次（条件转为 (特征下标, 下限, 上限) 区间检查与长度关系函数）。
+    assign(row) 的结果缓存在 row[SCENARIO_CACHE_KEY] 中，并记下输入/输出长度与并发的
+    原始文本及定义版本；这些单元格被编辑或场景定义重新注册后下一次调用才重新划分。
+    """
+
+    _compiled = None  # [(场景名, 关系函数或 None, [(特征下标, 下限, 上限)])]
+    _uses_concurrency = False
+    _version = 0
+
+    @staticmethod
+    def register(definitions):
+        """用 yaml 中的 scenarios 列表替换场景定义；有误时不修改已有定义并抛出 ValueError
+
+        definitions 为 None（配置中没有 scenarios）时恢复 config 中的缺省定义，避免沿用上一个
+        配置（如批处理中的上一个定义文件）注册的场景。定义未变化时不重新划分已缓存的行。
+        """
+        if definitions is None:
+            definitions = _DEFAULT_DEFINITIONS
+        compiled = ScenarioBucketer._compile(definitions)
+        if definitions == SCENARIO_DEFINITIONS and ScenarioBucketer._compiled is not None:
+            return
+        SCENARIO_DEFINITIONS[:] = copy.deepcopy(definitions)
+        ScenarioBucketer._install(compiled)
+
+    @staticmethod
+    def names():
+        """全部场景名，按定义顺序"""
+        return tuple(name for name, _relation, _ranges in ScenarioBucketer._checks())
+
+    @staticmethod
+    def assign(row):
+        """行所属的场景名元组（按定义顺序）"""
+        checks = ScenarioBucketer._checks()
+        iv = row.get("input_values", {})
+        signature = (ScenarioBucketer._version,) + tuple(iv.get(f) for f in _LENGTH_FIELDS)
+        if ScenarioBucketer._uses_concurrency:
+            signature += tuple(iv.get(f) for f in CURVE_CONCURRENCY_FIELDS)
+        cached = row.get(SCENARIO_CACHE_KEY)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+
+        features = ScenarioBucketer._features(row)
+        scenarios = tuple(
+            name
+            for name, relation, ranges in checks
+            if (relation is None or relation(features[0], features[1]))
+            and all(features[i] is not None and lo <= features[i] < hi for i, lo, hi in ranges)
+        )
+        row[SCENARIO_CACHE_KEY] = (signature, scenarios)
+        return scenarios
+
+    @staticmethod
+    def _checks():
+        if ScenarioBucketer._compiled is None:
+            ScenarioBucketer._install(ScenarioBucketer._compile(SCENARIO_DEFINITIONS))
+        return ScenarioBucketer._compiled
+
+    @staticmethod
+    def _install(compiled):
+        ScenarioBucketer._compiled = compiled
+        concurrency = SCENARIO_FEATURES.index("concurrency")
+        ScenarioBucketer._uses_concurrency = any(
+            i == concurrency for _name, _relation, ranges in compiled for i, _lo, _hi in ranges
+        )
+        ScenarioBucketer._version += 1
+
+    @staticmethod
+    def _compile(definitions):
+        """校验并编译场景定义"""
+        if not isinstance(definitions, list):
+            raise ValueError("scenarios 应为场景列表")
+        compiled = []
+        seen = set()
+        for spec in definitions:
+            if not isinstance(spec, dict) or not spec.get("name"):
+                raise ValueError(f"场景定义缺少 name：{spec!r}")
+            name = str(spec["name"])
+            if name in seen:
+                raise ValueError(f"场景名重复：{name}")
+            seen.add(name)
+
+            unknown = set(spec) - {"name", "relation"} - set(SCENARIO_FEATURES)
+            if unknown:
+                raise ValueError(f"场景 {name} 含未知条件：{'、'.join(map(str, unknown))}")
+            relation = spec.get("relation")
+            if relation is not None and relation not in _RELATIONS:
+                raise ValueError(f"场景 {name} 的 relation 必须是 {' / '.join(_RELATIONS)} 之一：{relation}")
+
+            ranges = []
+            for i, feature in enumerate(SCENARIO_FEATURES):
+                if feature not in spec:
+                    continue
+                bounds = spec[feature]
+                if not isinstance(bounds, (list, tuple)) or len(bounds) != 2:
+                    raise ValueError(f"场景 {name} 的 {feature} 应为 [下限, 上限]：{bounds!r}")
+                try:
+                    lo = -math.inf if bounds[0] is None else float(bounds[0])
+                    hi = math.inf if bounds[1] is None else float(bounds[1])
+                except (TypeError, ValueError):
+                    raise ValueError(f"场景 {name} 的 {feature} 区间必须是数字或 null：{bounds!r}")
+                ranges.append((i, lo, hi))
+            if relation is None and not ranges:
+                raise ValueError(f"场景 {name} 未设置任何条件")
+            compiled.append((name, _RELATIONS.get(relation), ranges))
+        return compiled
+
+    @staticmethod
+    def _features(row):
+        """(输入长度, 输出长度, 总长度, 并发)；长度为空按 0，任一长度无法解析时两者都按 0，并发无效时为 None"""
+        iv = row.get("input_values", {})
+        lengths = [
+            NumericCache.value(row, "input_values", field) if iv.get(field) else 0.0 for field in _LENGTH_FIELDS
+        ]
+        inp, out = lengths if None not in lengths else (0.0, 0.0)
+        concurrency = None
+        if ScenarioBucketer._uses_concurrency:
+            for field in CURVE_CONCURRENCY_FIELDS:
+                if iv.get(field):
+                    concurrency = NumericCache.value(row, "input_values", field)
+                    if concurrency is not None:
+                        break
+        return inp, out, inp + out, concurrency
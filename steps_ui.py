@@ -1,12 +1,19 @@
 # steps_ui.py - 各步骤的UI渲染模块
+import logging
+import time
 import tkinter as tk
 from tkinter import ttk, messagebox
 import uuid
 from utils import ScrollableFrame
 
+logger = logging.getLogger(__name__)
+
 
 class StepsUIRenderer:
-    """负责5个步骤的UI初始化和渲染"""
+    """负责5个步骤的UI初始化和渲染
+
+    启动时只创建步骤1与底部按钮；步骤2~5在首次进入时才创建（ensure_step），之后复用。
+    """
 
     def __init__(self, main_frame, app_ref):
         """
@@ -16,10 +23,17 @@ class StepsUIRenderer:
         """
         self.main_frame = main_frame
         self.app = app_ref
-        self.frames = {}  # 存储各步骤frame引用
+        self.frames = {}  # 存储各步骤frame引用（只含已创建的步骤）
+        self._builders = {
+            1: self._create_step1,
+            2: self._create_step2,
+            3: self._create_step3,
+            4: self._create_step4,
+            5: self._create_step5,
+        }
 
     def create_all_steps(self):
-        """创建所有5个步骤的UI"""
+        """创建步骤1与底部按钮（其余步骤按需创建，见 ensure_step）"""
         # Ensure the main frame grid expands: allow 4 columns and multiple rows to stretch
         for c in range(4):
             try:
@@ -32,13 +46,17 @@ class StepsUIRenderer:
             except Exception:
                 pass
 
-        self._create_step1()
-        self._create_step2()
-        self._create_step3()
-        self._create_step4()
-        self._create_step5()
+        self.ensure_step(1)
         self._create_buttons()
 
+    def ensure_step(self, step):
+        """步骤 step 的框架尚未创建时创建（创建后隐藏，由 refresh_step_display 显示）"""
+        if f"step{step}" in self.frames or step not in self._builders:
+            return
+        start = time.perf_counter()
+        self._builders[step]()
+        logger.debug("创建步骤%d界面：%.1f ms", step, (time.perf_counter() - start) * 1000)
+
     def _create_step1(self):
         """步骤1：基础信息填写"""
         frm = ttk.LabelFrame(self.main_frame, text="步骤1：基础信息填写（必填）", padding=15)
@@ -187,6 +205,7 @@ class StepsUIRenderer:
             summary_scroll.scrollable_frame, wrap=tk.WORD, font=("", 10)
         )
         self.app.summary_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.app.summary_text.insert(tk.END, self.app.project_summary)  # 创建前打开/恢复的项目总结
         self.app.summary_text.config(state=tk.DISABLED)
 
         self.frames["step5"] = frm_container
@@ -216,6 +235,15 @@ class StepsUIRenderer:
         self.app.reset_btn = ttk.Button(btn_frm, text="重置所有", command=self.app.reset_all)
         self.app.reset_btn.pack(side=tk.LEFT, padx=5)
 
+        self.app.open_btn = ttk.Button(btn_frm, text="打开项目", command=self.app.open_project)
+        self.app.open_btn.pack(side=tk.LEFT, padx=5)
+
+        self.app.save_btn = ttk.Button(btn_frm, text="保存项目", command=self.app.save_project)
+        self.app.save_btn.pack(side=tk.LEFT, padx=5)
+
+        self.app.history_btn = ttk.Button(btn_frm, text="历史数据", command=self.app.show_history)
+        self.app.history_btn.pack(side=tk.LEFT, padx=5)
+
     def refresh_step_display(self, current_step):
         """刷新步骤显示"""
         # 隐藏所有步骤
@@ -223,6 +251,7 @@ class StepsUIRenderer:
             frame.grid_remove()
 
         # 只显示当前步骤
+        self.ensure_step(current_step)
         step_key = f"step{current_step}"
         if step_key in self.frames:
             self.frames[step_key].grid()
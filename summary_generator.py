@@ -1,77 +1,116 @@
 # summary_generator.py - 项目总结生成模块
 from datetime import datetime
 
+from aggregation import ALL_SCENARIOS, PerfAggregationIndex, ratio_confidence_interval
+from config import DEFAULT_PERF_FIELDS, METRIC_TIE_TOLERANCE, PERF_FIELDS_MAP
+from curve_analysis import CurveAnalysis
+from ranking import DIRECTION_LABELS, LOSS, TIE, WIN, MetricRanking
+from scenarios import ScenarioBucketer
+
+# 按输入/输出长度拆分场景对比的测试类型（同时做并发扫描曲线分析）
+TEXT_TEST_TYPES = ("文本推理", "图文推理")
+
+# 每条 Pareto 前沿最多列出的点数
+FRONTIER_POINTS_SHOWN = 8
+
 
 class SummaryGenerator:
     """基于性能数据生成项目总结"""
 
     @staticmethod
-    def generate(app_ref):
-        """生成完整的项目总结"""
-        summary_parts = []
+    def generate(project, progress=None):
+        """生成完整的项目总结（Markdown 字符串）
+
+        Args:
+            progress: 可选进度回调 progress(done, total, message)，每完成一个章节汇报一次。
+        """
+        return "\n".join(SummaryGenerator.iter_lines(project, progress))
+
+    @staticmethod
+    def iter_lines(project, progress=None):
+        """逐行产出项目总结（不含换行符），供界面逐步追加、Excel/文件写入流式消费
+
+        各行以 "\n" 连接即为 generate 的结果。
+        """
+        if progress is None:
+            progress = lambda done, total, message="": None
+        progress(0, 4, "项目概述")
 
         # 标题和基本信息
-        summary_parts.append(f"# {app_ref.project_name.get()} 项目总结与性能对比报告")
-        summary_parts.append(f"**测试周期**：{app_ref.test_cycle.get()}")
-        summary_parts.append(f"**参与厂家**：{app_ref.vendor_str.get()}")
-        summary_parts.append(
-            f"**测试模型**：{'、'.join(app_ref.selected_models) if app_ref.selected_models else '无'}"
+        yield f"# {project.info.project_name} 项目总结与性能对比报告"
+        yield f"**测试周期**：{project.info.test_cycle}"
+        yield f"**参与厂家**：{project.info.vendor_str}"
+        yield (
+            f"**测试模型**：{'、'.join(project.selected_models) if project.selected_models else '无'}"
         )
-        summary_parts.append("")
-        
+        yield ""
+
         # 新增：客户和中标信息
-        summary_parts.append("## 零、客户及中标信息")
-        if app_ref.customer_name.get():
-            summary_parts.append(f"- **客户名称**：{app_ref.customer_name.get()}")
-        if app_ref.customer_industry.get():
-            summary_parts.append(f"- **客户行业**：{app_ref.customer_industry.get()}")
-        if app_ref.bid_status.get():
-            summary_parts.append(f"- **中标情况**：{app_ref.bid_status.get()}")
-            if app_ref.bid_status.get() == "已中标" and app_ref.bid_share.get():
-                summary_parts.append(f"- **中标份额**：{app_ref.bid_share.get()}")
-            elif app_ref.bid_status.get() == "未中标" and app_ref.bid_fail_reason.get():
-                summary_parts.append(f"- **未中标原因**：{app_ref.bid_fail_reason.get()}")
-        if app_ref.test_owner.get():
-            summary_parts.append(f"- **测试负责人**：{app_ref.test_owner.get()}")
-        summary_parts.append("")
+        yield "## 零、客户及中标信息"
+        if project.info.customer_name:
+            yield f"- **客户名称**：{project.info.customer_name}"
+        if project.info.customer_industry:
+            yield f"- **客户行业**：{project.info.customer_industry}"
+        if project.info.bid_status:
+            yield f"- **中标情况**：{project.info.bid_status}"
+            if project.info.bid_status == "已中标" and project.info.bid_share:
+                yield f"- **中标份额**：{project.info.bid_share}"
+            elif project.info.bid_status == "未中标" and project.info.bid_fail_reason:
+                yield f"- **未中标原因**：{project.info.bid_fail_reason}"
+        if project.info.test_owner:
+            yield f"- **测试负责人**：{project.info.test_owner}"
+        yield ""
 
         # 1. 项目概述
-        summary_parts.append("## 一、项目概述")
+        yield "## 一、项目概述"
         vendor_count = len(
-            SummaryGenerator._parse_vendor_str(app_ref.vendor_str.get())
+            SummaryGenerator._parse_vendor_str(project.info.vendor_str)
         )
-        summary_parts.append(
-            f"- 本次测试覆盖 {len(app_ref.selected_models)} 个模型，针对 {vendor_count} 家厂商的GPU性能进行验证。"
+        yield (
+            f"- 本次测试覆盖 {len(project.selected_models)} 个模型，针对 {vendor_count} 家厂商的GPU性能进行验证。"
         )
 
-        if app_ref.env_data:
-            test_types = set([item["test_type"] for item in app_ref.env_data])
-            summary_parts.append(
+        if project.env_data:
+            test_types = set([item["test_type"] for item in project.env_data])
+            yield (
                 f"- 测试类型包括 {', '.join(test_types)}，核心关注吞吐、延迟等关键指标。"
             )
-        summary_parts.append("")
+        yield ""
 
         # 2. 性能数据深度对比（以 H3C 厂商 GPU 为基准）
-        summary_parts.append("## 二、性能数据横向对比（以 H3C GPU 为基准）")
-        SummaryGenerator._add_performance_analysis_h3c(summary_parts, app_ref)
-        summary_parts.append("")
+        progress(1, 4, "性能数据对比")
+        yield "## 二、性能数据横向对比（以 H3C GPU 为基准）"
+        yield from SummaryGenerator._iter_performance_analysis_h3c(project, progress)
+        yield ""
 
         # 3. 项目问题与风险
-        summary_parts.append("## 三、项目问题与风险")
-        SummaryGenerator._add_problems_analysis(summary_parts, app_ref)
-        summary_parts.append("")
+        progress(2, 4, "项目问题与风险")
+        yield "## 三、项目问题与风险"
+        yield from SummaryGenerator._iter_problems_analysis(project)
+        yield ""
 
         # 4. 结论与建议
-        summary_parts.append("## 四、结论与建议")
-        SummaryGenerator._add_conclusions(summary_parts, app_ref)
-        summary_parts.append("")
+        progress(3, 4, "结论与建议")
+        yield "## 四、结论与建议"
+        yield from SummaryGenerator._iter_conclusions(project)
+        yield ""
 
         # 生成时间
-        summary_parts.append(
+        yield (
             f"**报告生成时间**：{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
         )
 
-        return "\n".join(summary_parts)
+        progress(4, 4, "完成")
+
+    @staticmethod
+    def tee_to_file(lines, fp):
+        """边产出边把各行写入文本文件 fp（行间以换行分隔，与 generate 的结果一致）
+
+        返回的迭代器可继续交给 Excel 导出等消费者，不需要先拼出完整字符串。
+        """
+        for i, line in enumerate(lines):
+            fp.write(line if i == 0 else "\n" + line)
+            yield line
 
     @staticmethod
     def _parse_vendor_str(vendor_str):
@@ -95,335 +134,331 @@ class SummaryGenerator:
         return "h3c" in vendor_name.lower()
 
     @staticmethod
-    def _add_performance_analysis_h3c(summary_parts, app_ref):
-        """按照要求对性能进行 H3C 基准的逐模型逐 GPU 对比"""
-        perf_data = getattr(app_ref, "perf_data", []) or []
-        pk_data = getattr(app_ref, "pk_data", []) or []
+    def _selected_metric_keys(pk_data):
+        """PK 表中各 (model, test_type) 选择的对比指标（允许逗号分隔多个）"""
+        metric_keys = {}
+        for p in pk_data:
+            raw = p.get("selected_pk")
+            keys = set([k.strip() for k in str(raw).split(",") if k.strip()]) if raw else set()
+            if keys:
+                metric_keys[(p.get("model"), p.get("test_type"))] = keys
+        return metric_keys
 
-        if not perf_data:
-            summary_parts.append("- 暂无性能数据可用于对比分析。")
-            return
+    @staticmethod
+    def _iter_performance_analysis_h3c(project, progress=None):
+        """按照要求对性能进行 H3C 基准的逐模型逐 GPU 对比
 
-        # 按 (model, test_type) 分组
-        groups = {}
-        for row in perf_data:
-            key = (row.get("model", ""), row.get("test_type", ""))
-            groups.setdefault(key, []).append(row)
+        先一次遍历性能数据建立预聚合索引（按模型/测试类型/厂家/GPU/场景累计各 PK 指标），
+        再按索引逐段输出，不再为每个 H3C GPU、每个场景重复扫描原始行。
+        """
+        perf_data = project.perf_data
 
-        for (model, test_type), rows in groups.items():
-            summary_parts.append(f"### 模型：{model} / 测试类型：{test_type}")
+        if not perf_data:
+            yield "- 暂无性能数据可用于对比分析。"
+            return
 
-            # 找到 H3C 条目
-            h3c_rows = [r for r in rows if SummaryGenerator._is_h3c_vendor(r.get("vendor", ""))]
-            if not h3c_rows:
-                summary_parts.append("- 无 H3C 厂商 GPU 卡的数据；跳过本模型的 H3C 对比。")
-                summary_parts.append("")
+        # 使用 PK 表中为该 (model, test_type) 选择的指标作为对比指标；
+        # 声明了单卡归一字段的指标，排名时改用单卡值，一并累计
+        metric_keys = SummaryGenerator._selected_metric_keys(project.pk_data)
+        index_keys = {}
+        for (model, test_type), keys in metric_keys.items():
+            fields = SummaryGenerator._perf_fields(test_type)
+            index_keys[(model, test_type)] = keys | {MetricRanking.normalized_field(k, fields) for k in keys}
+        index = PerfAggregationIndex(
+            perf_data,
+            index_keys,
+            scenarios_for=lambda row: ScenarioBucketer.assign(row) if row.get("test_type") in TEXT_TEST_TYPES else (),
+        )
+        curves = CurveAnalysis(perf_data, TEXT_TEST_TYPES)
+
+        for model, test_type in index.groups():
+            if progress:
+                progress(1, 4, f"性能数据对比：{model} / {test_type}")
+            yield f"### 模型：{model} / 测试类型：{test_type}"
+            keys = sorted(metric_keys.get((model, test_type), ()))
+            yield from SummaryGenerator._iter_ranking_lines(index, model, test_type, keys)
+            if test_type in TEXT_TEST_TYPES:
+                for config in curves.configs(model, test_type):
+                    yield from SummaryGenerator._iter_curve_lines(curves, model, test_type, config)
+                    yield from SummaryGenerator._iter_aligned_lines(curves, model, test_type, config)
+
+            # H3C 可能有多款 GPU，需要分别对每款 GPU 进行对比（同一 GPU 的 H3C 条目合并）
+            h3c_gpu_types = {}
+            others = []
+            for vendor, gpu in index.partitions(model, test_type):
+                if SummaryGenerator._is_h3c_vendor(vendor):
+                    h3c_gpu_types.setdefault(gpu, []).append((vendor, gpu))
+                else:
+                    others.append((vendor, gpu))
+            if not h3c_gpu_types:
+                yield "- 无 H3C 厂商 GPU 卡的数据；跳过本模型的 H3C 对比。"
+                yield ""
                 continue
 
-            # 将其他厂商按 (vendor, gpu) 分组
-            others = [r for r in rows if not SummaryGenerator._is_h3c_vendor(r.get("vendor", ""))]
-            other_groups = {}
-            for r in others:
-                other_groups.setdefault((r.get("vendor", ""), r.get("gpu", "")), []).append(r)
+            # 如果未选择任何 PK 指标，则跳过本模型/测试类型的对比（按用户要求只体现 PK 指标）
+            if not keys:
+                yield "- 未在 PK 表中选择对比指标，跳过本模型/测试类型的 PK 对比。"
+                yield ""
+                continue
 
-            # H3C 可能有多款 GPU，需要分别对每款 GPU 进行对比
-            h3c_gpu_types = {}
-            for r in h3c_rows:
-                h3c_gpu_types.setdefault(r.get("gpu", ""), []).append(r)
-
-                # 使用 PK 表中为该 (model, test_type) 选择的指标作为对比指标
-                # 如果未选择任何 PK 指标，则跳过本模型/测试类型的对比（按用户要求只体现 PK 指标）
-                pk_map = {(p.get("model"), p.get("test_type")): p.get("selected_pk") for p in pk_data}
-                selected_pk_raw = pk_map.get((model, test_type))
-                if not selected_pk_raw:
-                    summary_parts.append("- 未在 PK 表中选择对比指标，跳过本模型/测试类型的 PK 对比。")
-                    summary_parts.append("")
-                    continue
+            for h3c_gpu, h3c_parts in h3c_gpu_types.items():
+                yield (
+                    f"- 基准：H3C GPU 型号 {h3c_gpu}（样本数 {index.count(model, test_type, h3c_parts)}）"
+                )
+                verdicts = []  # 本 H3C GPU 各项对比的胜负
 
-                # 允许用户在 PK 表中用逗号分隔选择多个指标
-                metric_keys = set([k.strip() for k in str(selected_pk_raw).split(",") if k.strip()])
-
-            def _mean_numeric(values):
-                nums = []
-                for v in values:
-                    try:
-                        nums.append(float(v))
-                    except Exception:
-                        continue
-                return sum(nums) / len(nums) if nums else None
-
-            # 文本类场景拆分需要额外处理
-            is_text = test_type in ("文本推理", "图文推理")
-
-            for h3c_gpu, h3c_list in h3c_gpu_types.items():
-                summary_parts.append(f"- 基准：H3C GPU 型号 {h3c_gpu}（样本数 {len(h3c_list)}）")
-
-                # 准备 H3C 指标均值（仅针对 PK 指标）
-                h3c_metrics = {}
-                for k in metric_keys:
-                    vals = []
-                    for r in h3c_list:
-                        v = r.get("calc_values", {}).get(k)
-                        if v is None:
-                            v = r.get("input_values", {}).get(k)
-                        if v is not None and str(v).strip() != "":
-                            vals.append(v)
-                    h3c_metrics[k] = _mean_numeric(vals)
-
-                # 针对文本类模型按场景拆分
-                if is_text:
-                    # 三个固定场景：短输入长输出、长输入短输出、总上下文长度分级
-                    scenarios = {
-                        "短输入长输出": [],
-                        "长输入短输出": [],
-                        "总上下文短( <4096 )": [],
-                        "总上下文中(4096-8191)": [],
-                        "总上下文长( >=8192 )": [],
-                    }
-                    for r in rows:
-                        iv = r.get("input_values", {})
-                        try:
-                            inp = float(iv.get("输入长度（tokens）", 0) or 0)
-                            out = float(iv.get("输出长度（tokens）", 0) or 0)
-                        except Exception:
-                            inp = out = 0
-                        total = inp + out
-                        if inp < out:
-                            scenarios["短输入长输出"].append(r)
-                        elif inp > out:
-                            scenarios["长输入短输出"].append(r)
-
-                        if total < 4096:
-                            scenarios["总上下文短( <4096 )"].append(r)
-                        elif 4096 <= total <= 8191:
-                            scenarios["总上下文中(4096-8191)"].append(r)
-                        else:
-                            scenarios["总上下文长( >=8192 )"].append(r)
-
-                    for scen_name, scen_rows in scenarios.items():
-                        if not scen_rows:
+                # 文本类模型按场景拆分
+                if test_type in TEXT_TEST_TYPES:
+                    for scen_name in ScenarioBucketer.names():
+                        scen_count = index.count(model, test_type, scenario=scen_name)
+                        if not scen_count:
                             continue
-                        summary_parts.append(f"  - 场景：{scen_name}（样本数 {len(scen_rows)}）")
-                        # 计算场景内 H3C 均值
-                        scen_h3c = [r for r in scen_rows if SummaryGenerator._is_h3c_vendor(r.get("vendor", "")) and r.get("gpu", "") == h3c_gpu]
-                        if not scen_h3c:
-                            summary_parts.append("    - 本场景下无 H3C 数据，跳过。")
+                        yield f"  - 场景：{scen_name}（样本数 {scen_count}）"
+                        if not index.count(model, test_type, h3c_parts, scen_name):
+                            yield "    - 本场景下无 H3C 数据，跳过。"
                             continue
-                        scen_h3c_metrics = {}
-                        for k in metric_keys:
-                            vals = []
-                            for r in scen_h3c:
-                                v = r.get("calc_values", {}).get(k) or r.get("input_values", {}).get(k)
-                                if v is not None and str(v).strip() != "":
-                                    vals.append(v)
-                            scen_h3c_metrics[k] = _mean_numeric(vals)
-
-                        # 对比场景内其他厂商
-                        other_by_gpu = {}
-                        for r in scen_rows:
-                            if SummaryGenerator._is_h3c_vendor(r.get("vendor", "")):
+
+                        for ovendor, ogpu in index.partitions(model, test_type, scen_name):
+                            if SummaryGenerator._is_h3c_vendor(ovendor):
                                 continue
-                            other_by_gpu.setdefault((r.get("vendor", ""), r.get("gpu", "")), []).append(r)
-
-                        for (ovendor, ogpu), orows in other_by_gpu.items():
-                            summary_parts.append(f"    - 对比对象：{ovendor} / GPU {ogpu}（样本数 {len(orows)}）")
-                            for k in sorted(metric_keys):
-                                hval = scen_h3c_metrics.get(k)
-                                ovals = [row.get("calc_values", {}).get(k) or row.get("input_values", {}).get(k) for row in orows]
-                                oval = _mean_numeric(ovals)
-                                if hval is None or oval is None:
-                                    continue
-                                try:
-                                    diff = hval - oval
-                                    ratio = hval / oval if oval != 0 else float('inf')
-                                except Exception:
-                                    continue
-                                summary_parts.append(f"      - 指标 {k}：H3C {hval:.2f} vs {ovendor} {oval:.2f}（差值 {diff:+.2f}，倍数 {ratio:.2f}x）")
-
-                # 非文本或总体对比
+                            o_part = [(ovendor, ogpu)]
+                            yield (
+                                f"    - 对比对象：{ovendor} / GPU {ogpu}"
+                                f"（样本数 {index.count(model, test_type, o_part, scen_name)}）"
+                            )
+                            verdicts += yield from SummaryGenerator._iter_metric_lines(
+                                "      ", index, model, test_type, keys, h3c_parts, o_part, ovendor, scen_name
+                            )
+
+                # 非文本或总体对比：对比所有其他厂商的每个 GPU
                 else:
-                    # 对比所有其他厂商的每个 GPU
-                    for (ovendor, ogpu), orows in other_groups.items():
-                        summary_parts.append(f"  - 对比对象：{ovendor} / GPU {ogpu}（样本数 {len(orows)}）")
-                        # 计算 other 的均值
-                        other_metrics = {}
-                        for k in metric_keys:
-                            vals = []
-                            for r in orows:
-                                v = r.get("calc_values", {}).get(k) or r.get("input_values", {}).get(k)
-                                if v is not None and str(v).strip() != "":
-                                    vals.append(v)
-                            other_metrics[k] = _mean_numeric(vals)
-
-                        # 输出每个指标对比（以 H3C 均值为准）
-                        for k in sorted(metric_keys):
-                            hval = h3c_metrics.get(k)
-                            oval = other_metrics.get(k)
-                            if hval is None or oval is None:
-                                continue
-                            try:
-                                diff = hval - oval
-                                ratio = hval / oval if oval != 0 else float('inf')
-                            except Exception:
-                                continue
-                            summary_parts.append(f"    - 指标 {k}：H3C {hval:.2f} vs {ovendor} {oval:.2f}（差值 {diff:+.2f}，倍数 {ratio:.2f}x）")
-
-                summary_parts.append("")
+                    for ovendor, ogpu in others:
+                        o_part = [(ovendor, ogpu)]
+                        yield (
+                            f"  - 对比对象：{ovendor} / GPU {ogpu}（样本数 {index.count(model, test_type, o_part)}）"
+                        )
+                        verdicts += yield from SummaryGenerator._iter_metric_lines(
+                            "    ", index, model, test_type, keys, h3c_parts, o_part, ovendor
+                        )
+
+                if verdicts:
+                    yield (
+                        f"  - 计分：H3C {h3c_gpu} 胜 {verdicts.count(WIN)} / 负 {verdicts.count(LOSS)}"
+                        f" / 平 {verdicts.count(TIE)}（按指标方向判定，相差 {METRIC_TIE_TOLERANCE:.0%} 以内记为持平）"
+                    )
+                yield ""
 
     @staticmethod
-    def _add_performance_analysis(summary_parts, app_ref):
-        """添加性能分析部分"""
-        if not app_ref.perf_data:
-            summary_parts.append(
-                "- 暂无有效性能测试数据，无法进行对比分析。"
+    def _iter_ranking_lines(index, model, test_type, keys):
+        """全部场景下各 (厂家, GPU) 按 PK 指标方向从优到劣的排名；声明了单卡归一字段的指标按单卡值排名"""
+        fields = SummaryGenerator._perf_fields(test_type)
+        partitions = index.partitions(model, test_type)
+        lines = []
+        for k in keys:
+            rank_key = MetricRanking.normalized_field(k, fields)
+            ranked = MetricRanking.rank(
+                rank_key, [(part, index.mean(model, test_type, [part], rank_key)) for part in partitions]
+            )
+            if not ranked:
+                continue
+            direction = DIRECTION_LABELS[MetricRanking.direction(rank_key)]
+            label = f"{k}（{direction}）" if rank_key == k else f"{rank_key}（由 {k} 按单卡归一，{direction}）"
+            entries = "；".join(
+                f"{i}. {vendor} / {gpu} {value:.2f}" for i, ((vendor, gpu), value) in enumerate(ranked, 1)
             )
+            lines.append(f"  - {label}：{entries}")
+        if lines:
+            yield "- 厂商排名（全部场景均值）："
+            yield from lines
+
+    @staticmethod
+    def _iter_curve_lines(curves, model, test_type, config):
+        """同一扫描配置（输入/输出长度）下各 (厂家, GPU) 的并发扫描曲线：SLO 内最大吞吐（并排名）
+        与各延迟字段的 Pareto 前沿；不同配置的扫描分别报告，不相互比较"""
+        partitions = curves.partitions(model, test_type, config)
+        if not partitions:
             return
+        slo_text = "，".join(f"{field} ≤ {limit:g}" for field, limit in curves.slo.items())
+        yield f"- 延迟-吞吐曲线（{curves.format_config(config)}；{curves.throughput_field}；SLO：{slo_text}）："
+
+        best = {}
+        for vendor, gpu in partitions:
+            points = curves.points(model, test_type, config, vendor, gpu)
+            point = curves.best_under_slo(model, test_type, config, vendor, gpu)
+            best[(vendor, gpu)] = point.throughput if point else None
+            if point is None:
+                yield f"  - {vendor} / {gpu}（{len(points)} 个测试点）：无满足 SLO 的测试点"
+            else:
+                latency = "，".join(f"{field} {value:.1f}" for field, value in point.latency.items())
+                yield (
+                    f"  - {vendor} / {gpu}（{len(points)} 个测试点）：SLO 内最大吞吐 {point.throughput:.2f}"
+                    f"（并发 {SummaryGenerator._format_concurrency(point.concurrency)}，{latency}）"
+                )
+            for field in curves.latency_fields:
+                frontier = curves.frontier(model, test_type, config, vendor, gpu, field)
+                if not frontier:
+                    continue
+                shown = "、".join(
+                    f"{p.latency[field]:.1f}→{p.throughput:.2f}（并发 {SummaryGenerator._format_concurrency(p.concurrency)}）"
+                    for p in frontier[:FRONTIER_POINTS_SHOWN]
+                )
+                more = f"……共 {len(frontier)} 点" if len(frontier) > FRONTIER_POINTS_SHOWN else ""
+                yield f"    - {field} 前沿：{shown}{more}"
 
-        # 按测试类型分组
-        test_type_groups = {}
-        for perf_row in app_ref.perf_data:
-            tt = perf_row["test_type"]
-            if tt not in test_type_groups:
-                test_type_groups[tt] = []
-            test_type_groups[tt].append(perf_row)
+        ranked = MetricRanking.rank(curves.throughput_field, list(best.items()))
+        if ranked and len(partitions) > 1:
+            entries = "；".join(
+                f"{i}. {vendor} / {gpu} {value:.2f}" for i, ((vendor, gpu), value) in enumerate(ranked, 1)
+            )
+            yield f"  - SLO 内最大吞吐排名：{entries}"
 
-        # 分析各测试类型
-        for test_type, rows in test_type_groups.items():
-            summary_parts.append(f"### 📊 {test_type} 性能对比")
+    @staticmethod
+    def _iter_aligned_lines(curves, model, test_type, config):
+        """同一扫描配置下各 (厂家, GPU) 曲线插值到共同并发点后的对比表（吞吐 + 各延迟字段），“≈”表示插值
 
-            if test_type in ["文本推理", "图文推理"]:
-                SummaryGenerator._analyze_inference(summary_parts, rows)
-            elif test_type == "图像识别":
-                SummaryGenerator._analyze_image_recognition(summary_parts, rows)
+        可插值的曲线不足或并发区间不重叠时说明原因（各字段都不能对齐时合并为一行），
+        仍以上文全部测试点的均值对比为准。
+        """
+        if len(curves.partitions(model, test_type, config)) < 2:
+            return
+        label = curves.format_config(config)
+        fields = (curves.throughput_field,) + curves.latency_fields
+        tables = {field: curves.aligned(model, test_type, config, field) for field in fields}
+        if all(table is None for table in tables.values()):
+            yield f"- 对齐并发对比（{label}）：可插值的曲线不足或并发区间不重叠，沿用全部测试点的均值对比。"
+            return
+        for field, table in tables.items():
+            if table is None:
+                yield f"- 对齐并发对比（{label}）：{field} 可插值的曲线不足或并发区间不重叠，沿用全部测试点的均值对比。"
+                continue
 
-            summary_parts.append("")
+            parts = list(table["columns"])
+            yield f"- 对齐并发对比（{label}）：{field}（按并发对数刻度插值到共同并发点，≈ 为插值）"
+            if table["sparse"]:
+                names = "、".join(f"{vendor} / {gpu}" for vendor, gpu in table["sparse"])
+                yield f"  - {names} 测试点不足，只列出与对齐点并发相同的实测值。"
+            yield ""
+            yield "| 并发 | " + " | ".join(f"{vendor} / {gpu}" for vendor, gpu in parts) + " | 最优 |"
+            yield "|" + " --- |" * (len(parts) + 2)
+            for i, x in enumerate(table["grid"]):
+                cells = []
+                for part in parts:
+                    value, measured = table["columns"][part][i]
+                    cells.append("—" if value is None else f"{'' if measured else '≈'}{value:.2f}")
+                ranked = MetricRanking.rank(field, [(part, table["columns"][part][i][0]) for part in parts])
+                best = f"{ranked[0][0][0]} / {ranked[0][0][1]}" if ranked else "—"
+                yield f"| {x:g} | " + " | ".join(cells) + f" | {best} |"
+            yield ""
 
     @staticmethod
-    def _analyze_inference(summary_parts, rows):
-        """分析推理性能"""
-        metrics = []
-        for row in rows:
-            try:
-                vendor = row["vendor"]
-                model = row["model"]
-                total_throughput = float(
-                    row["input_values"].get("总吞吐（tokens/s）", 0)
-                )
-                single_throughput = float(
-                    row["calc_values"].get("单卡输出吞吐（tokens/s）", 0)
-                )
-                ttft = float(row["input_values"].get("TTFT（ms）", 0))
-                tpot = float(row["input_values"].get("TPOT（ms）", 0))
-
-                metrics.append({
-                    "vendor": vendor,
-                    "model": model,
-                    "total_throughput": total_throughput,
-                    "single_throughput": single_throughput,
-                    "ttft": ttft,
-                    "tpot": tpot,
-                })
-            except (ValueError, KeyError):
-                continue
+    def _format_concurrency(value):
+        return "—" if value is None else f"{value:g}"
 
-        if metrics:
-            # 按单卡吞吐排序
-            metrics.sort(key=lambda x: x["single_throughput"], reverse=True)
-            top_vendor = metrics[0]["vendor"]
-            top_single = metrics[0]["single_throughput"]
-            top_total = metrics[0]["total_throughput"]
+    @staticmethod
+    def _perf_fields(test_type):
+        """测试类型的全部字段（输入 + 计算）"""
+        input_fields, calc_fields = PERF_FIELDS_MAP.get(test_type, DEFAULT_PERF_FIELDS)
+        return set(input_fields) | set(calc_fields)
 
-            summary_parts.append(
-                f"- **性能最优厂商**：{top_vendor}（单卡输出吞吐：{top_single:.2f} tokens/s，总吞吐：{top_total:.2f} tokens/s）"
+    @staticmethod
+    def _iter_metric_lines(indent, index, model, test_type, keys, h3c_parts, o_parts, ovendor, scenario=ALL_SCENARIOS):
+        """逐行产出每个 PK 指标的 H3C 与对比对象均值对比（以 H3C 均值为准），返回各指标的胜负列表
+
+        声明了方向的指标标注 H3C 领先/落后/持平；每个指标后附一行分布：双方中位数 / P90 /
+        标准差、中位数倍数及均值倍数的 95% 置信区间，避免个别离群值左右结论。
+        """
+        verdicts = []
+        for k in keys:
+            hstat = index.stat(model, test_type, h3c_parts, k, scenario)
+            ostat = index.stat(model, test_type, o_parts, k, scenario)
+            hval, oval = hstat.mean, ostat.mean
+            if hval is None or oval is None:
+                continue
+            diff = hval - oval
+            ratio = hval / oval if oval != 0 else float('inf')
+            advantage = MetricRanking.advantage(k, hval, oval)
+            verdict = MetricRanking.verdict(advantage)
+            if verdict is not None:
+                verdicts.append(verdict)
+            yield (
+                f"{indent}- 指标 {k}：H3C {hval:.2f} vs {ovendor} {oval:.2f}（差值 {diff:+.2f}，倍数 {ratio:.2f}x"
+                f"{SummaryGenerator._format_verdict(verdict, advantage)}）"
             )
-            summary_parts.append("- 详细对比：")
-            for m in metrics:
-                summary_parts.append(
-                    f"  - {m['vendor']}（{m['model']}）：单卡吞吐 {m['single_throughput']:.2f} tokens/s，TTFT {m['ttft']:.0f} ms，TPOT {m['tpot']:.0f} ms"
-                )
 
-            # 延迟分析
-            latency_metrics = [m for m in metrics if m["ttft"] > 0]
-            if latency_metrics:
-                latency_metrics.sort(key=lambda x: x["ttft"])
-                best_latency_vendor = latency_metrics[0]["vendor"]
-                best_latency = latency_metrics[0]["ttft"]
-                summary_parts.append(
-                    f"- **延迟最优厂商**：{best_latency_vendor}（TTFT：{best_latency:.0f} ms）"
-                )
+            hmed, omed = hstat.median, ostat.median
+            median_ratio = f"{hmed / omed:.2f}x" if omed else "—"
+            interval = ratio_confidence_interval(hstat, ostat)
+            interval = f"[{interval[0]:.2f}, {interval[1]:.2f}]" if interval else "样本不足或均值非正"
+            yield (
+                f"{indent}  - 分布：H3C {SummaryGenerator._format_distribution(hstat)}；"
+                f"{ovendor} {SummaryGenerator._format_distribution(ostat)}；"
+                f"中位数倍数 {median_ratio}，倍数95%置信区间 {interval}"
+            )
+        return verdicts
 
     @staticmethod
-    def _analyze_image_recognition(summary_parts, rows):
-        """分析图像识别性能"""
-        fps_metrics = []
-        for row in rows:
-            try:
-                vendor = row["vendor"]
-                fps = float(row["input_values"].get("FPS", 0))
-                fps_metrics.append({"vendor": vendor, "fps": fps})
-            except (ValueError, KeyError):
-                continue
+    def _format_verdict(verdict, advantage):
+        """胜负标注（接在倍数之后）；未声明方向时为空"""
+        if verdict is None:
+            return ""
+        if verdict == TIE:
+            return "，持平"
+        return f"，H3C {'领先' if verdict == WIN else '落后'} {abs(advantage):.1%}"
 
-        if fps_metrics:
-            fps_metrics.sort(key=lambda x: x["fps"], reverse=True)
-            top_vendor = fps_metrics[0]["vendor"]
-            top_fps = fps_metrics[0]["fps"]
-
-            summary_parts.append(
-                f"- **性能最优厂商**：{top_vendor}（FPS：{top_fps:.2f}）"
-            )
-            summary_parts.append("- 详细对比：")
-            for m in fps_metrics:
-                summary_parts.append(f"  - {m['vendor']}：FPS {m['fps']:.2f}")
+    @staticmethod
+    def _format_distribution(stat):
+        """中位数 / P90 / 标准差（样本不足 2 个时标准差记为 —）"""
+        stddev = f"{stat.stddev:.2f}" if stat.stddev is not None else "—"
+        return f"中位数 {stat.median:.2f} / P90 {stat.p90:.2f} / 标准差 {stddev}"
 
     @staticmethod
-    def _add_problems_analysis(summary_parts, app_ref):
-        """添加问题分析部分"""
-        if app_ref.problem_data:
+    def _iter_problems_analysis(project):
+        """逐行产出问题分析部分"""
+        if project.problem_data:
             tech_problems = [
-                p for p in app_ref.problem_data if p["category"] == "技术问题"
+                p for p in project.problem_data if p["category"] == "技术问题"
             ]
             proj_problems = [
-                p for p in app_ref.problem_data if p["category"] == "项目问题"
+                p for p in project.problem_data if p["category"] == "项目问题"
             ]
 
             if tech_problems:
-                summary_parts.append(f"- **技术问题**：共 {len(tech_problems)} 个，主要包括：")
+                yield f"- **技术问题**：共 {len(tech_problems)} 个，主要包括："
                 for p in tech_problems:
                     solution = p["solution"] if p["solution"] else "待确认"
-                    summary_parts.append(
+                    yield (
                         f"  - {p['description']}（责任人：{p['person']}，解决方案：{solution}）"
                     )
 
             if proj_problems:
-                summary_parts.append(f"- **项目问题**：共 {len(proj_problems)} 个，主要包括：")
+                yield f"- **项目问题**：共 {len(proj_problems)} 个，主要包括："
                 for p in proj_problems:
                     solution = p["solution"] if p["solution"] else "待确认"
-                    summary_parts.append(
+                    yield (
                         f"  - {p['description']}（责任人：{p['person']}，解决方案：{solution}）"
                     )
         else:
-            summary_parts.append(
+            yield (
                 "- 项目实施过程中未记录明显问题，整体进展顺利。"
             )
 
     @staticmethod
-    def _add_conclusions(summary_parts, app_ref):
-        """添加结论和建议"""
-        if app_ref.perf_data and app_ref.pk_data:
-            summary_parts.append("- **性能结论**：")
-            summary_parts.append(
+    def _iter_conclusions(project):
+        """逐行产出结论和建议"""
+        if project.perf_data and project.pk_data:
+            yield "- **性能结论**："
+            yield (
                 "  综合对比各厂商数据，建议根据性能指标优先选择性能最优的厂商进行后续部署。"
             )
-            summary_parts.append("- **优化建议**：")
-            summary_parts.append(
+            yield "- **优化建议**："
+            yield (
                 "  建议进一步排查模型推理框架或硬件配置以提升整体性能。"
             )
-            if app_ref.problem_data:
-                summary_parts.append(
+            if project.problem_data:
+                yield (
                     "  针对已发现的问题，建议尽快推动解决方案落地，避免影响后续测试进度。"
                 )
         else:
-            summary_parts.append(
+            yield (
                 "- 测试数据尚未完善，建议补充完整性能测试数据后再进行综合评估。"
             )
@@ -1,10 +1,12 @@
 # utils.py - 通用工具函数与UI组件
+import time
 import tkinter as tk
 from tkinter import ttk
 import uuid
-from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
 from data_manager import DataManager
-from openpyxl.utils import get_column_letter
+from config import PERF_FIELDS_MAP, PERF_VISIBLE_ROWS
+from project_model import RowStore
+from numeric_cache import NumericCache
 
 
 # ============ ScrollableFrame 组件（来自components.py） ============
@@ -48,197 +50,588 @@ class ScrollableFrame(ttk.Frame):
         self.scrollbar_x.pack(side="bottom", fill="x")
 
 
-# ============ 渲染函数 ============
-class UIRenderer:
-    """负责各步骤的数据表渲染"""
+# ============ 后台任务进度对话框 ============
+class ProgressDialog(tk.Toplevel):
+    """显示后台任务进度，并提供取消按钮"""
 
-    @staticmethod
-    def render_env_frame(step3_frame, env_data, selected_models, model_test_type_map, vendor_str, main_scroll):
-        """渲染步骤3的测试环境框架 - 改进的布局"""
-        for w in step3_frame.winfo_children():
-            w.destroy()
+    def __init__(self, parent, title, on_cancel):
+        super().__init__(parent)
+        self.title(title)
+        self.resizable(False, False)
+        self.transient(parent)
+        self.protocol("WM_DELETE_WINDOW", on_cancel)
 
-        # 创建可滚动的内部框架
-        scroll_frm = ScrollableFrame(step3_frame)
-        scroll_frm.pack(fill=tk.BOTH, expand=True)
-        content_frm = scroll_frm.scrollable_frame
+        self.message_lbl = ttk.Label(self, text="准备中...", width=50)
+        self.message_lbl.pack(padx=15, pady=(15, 5), anchor="w")
 
-        # 如果没有 env_data，则用一个占位的动态条目渲染一次，方便用户手动填写
-        render_list = env_data if env_data else [
-            {
-                "model": "",
-                "test_type": "",
-                "vendor": "",
-                "gpu": "",
-                "gpu_count": "",
-                "dataset": "",
-                "tool": "",
-                "is_dynamic": True,
-                "id": str(uuid.uuid4()),
-            }
-        ]
+        self.progress_bar = ttk.Progressbar(self, length=360, mode="determinate", maximum=100)
+        self.progress_bar.pack(padx=15, pady=5)
 
-        # 如果 env_data 为空，先创建一条默认条目并加入（确保 validate 能看到数据）
-        if not env_data:
-            env_data.append({
-                "model": "",
-                "test_type": "",
-                "vendor": "",
-                "gpu": "",
-                "gpu_count": "",
-                "dataset": "",
-                "tool": "",
-                "is_dynamic": True,
-                "id": str(uuid.uuid4()),
-            })
+        self.cancel_btn = ttk.Button(self, text="取消", command=on_cancel)
+        self.cancel_btn.pack(pady=(5, 15))
 
-        # helper: 安全写入 env_data
-        def _write_env_value(idx, key, value):
-            while idx >= len(env_data):
-                env_data.append({
-                    "model": "",
-                    "test_type": "",
-                    "vendor": "",
-                    "gpu": "",
-                    "gpu_count": "",
-                    "dataset": "",
-                    "tool": "",
-                    "is_dynamic": True,
-                    "id": str(uuid.uuid4()),
-                })
-            env_data[idx][key] = value
+    def update_progress(self, done, total, message=""):
+        """更新进度条和提示文字"""
+        percent = (done / total * 100) if total else 0
+        self.progress_bar["value"] = percent
+        self.message_lbl.config(text=f"{message}（{percent:.0f}%）" if message else f"{percent:.0f}%")
 
-        # 为每一行环境配置创建一个分组框
-        for row_idx, data in enumerate(env_data):
-            # 为每个环境创建一个卡片式框架
-            card_frm = ttk.LabelFrame(
-                content_frm,
-                text=f"配置 #{row_idx + 1}: {data.get('model', '')} - {data.get('test_type', '')}",
-                padding=10
-            )
-            card_frm.pack(fill=tk.BOTH, expand=True, padx=5, pady=8)
-
-            # 使用 grid 布局：使单行控件横向扩展，避免堆叠
-            card_frm.columnconfigure(1, weight=1)
-            card_frm.columnconfigure(3, weight=1)
-            card_frm.columnconfigure(5, weight=1)
-
-            # 第一行：模型、测试类型
-            if data.get("is_dynamic"):
-                ttk.Label(card_frm, text="模型：").grid(row=0, column=0, sticky="w", padx=5, pady=2)
-                model_combo = ttk.Combobox(card_frm, values=selected_models, state="readonly")
-                model_combo.grid(row=0, column=1, sticky="ew", padx=5, pady=2)
-                model_combo.set(data["model"])
-
-                ttk.Label(card_frm, text="测试类型：").grid(row=0, column=2, sticky="w", padx=5, pady=2)
-                tt_combo = ttk.Combobox(card_frm, state="readonly")
-                tt_combo.grid(row=0, column=3, sticky="ew", padx=5, pady=2)
-                tt_combo.set(data["test_type"])
-
-                def on_model_change(e, combo=tt_combo, combo_model=model_combo, idx=row_idx):
-                    combo.config(values=model_test_type_map.get(combo_model.get(), []))
-                    _write_env_value(idx, "model", combo_model.get())
-                    _write_env_value(idx, "test_type", combo.get())
-
-                model_combo.bind("<<ComboboxSelected>>", on_model_change)
-            else:
-                ttk.Label(card_frm, text="模型：").grid(row=0, column=0, sticky="w", padx=5, pady=2)
-                ttk.Label(card_frm, text=data["model"]).grid(row=0, column=1, sticky="w", padx=5, pady=2)
+    def set_cancelling(self):
+        """已请求取消，等待工作线程结束"""
+        self.cancel_btn.config(state=tk.DISABLED)
+        self.message_lbl.config(text="正在取消...")
 
-                ttk.Label(card_frm, text="测试类型：").grid(row=0, column=2, sticky="w", padx=5, pady=2)
-                ttk.Label(card_frm, text=data["test_type"]).grid(row=0, column=3, sticky="w", padx=5, pady=2)
 
-            # 第二行：厂家、GPU型号
-            vendor_list = UIRenderer._parse_vendor_str(vendor_str)
-            vendor_names = [v[0] for v in vendor_list]
-            vendor_gpus = {v[0]: v[1] for v in vendor_list}
+# ============ 单选对话框 ============
+class ChoiceDialog(tk.Toplevel):
+    """模态单选对话框：ChoiceDialog.ask(parent, title, prompt, choices) 返回所选下标，取消时返回 None"""
 
-            if data.get("is_dynamic"):
-                ttk.Label(card_frm, text="厂家：").grid(row=1, column=0, sticky="w", padx=5, pady=2)
-                vendor_combo = ttk.Combobox(card_frm, values=vendor_names, state="readonly")
-                vendor_combo.grid(row=1, column=1, sticky="ew", padx=5, pady=2)
-                vendor_combo.set(data.get("vendor", ""))
+    def __init__(self, parent, title, prompt, choices):
+        super().__init__(parent)
+        self.title(title)
+        self.resizable(False, False)
+        self.transient(parent)
+        self.protocol("WM_DELETE_WINDOW", self.destroy)
+        self.result = None
 
-                ttk.Label(card_frm, text="GPU型号：").grid(row=1, column=2, sticky="w", padx=5, pady=2)
-                gpu_lbl = ttk.Label(card_frm, text=data.get("gpu", ""))
-                gpu_lbl.grid(row=1, column=3, sticky="w", padx=5, pady=2)
+        ttk.Label(self, text=prompt, justify=tk.LEFT).pack(padx=15, pady=(15, 5), anchor="w")
+        self._combo = ttk.Combobox(self, values=list(choices), state="readonly", width=50)
+        self._combo.current(0)
+        self._combo.pack(padx=15, pady=5)
 
-                def on_vendor_change(e, lbl=gpu_lbl, vendor_combo_ref=vendor_combo, idx=row_idx):
-                    lbl.config(text=vendor_gpus.get(vendor_combo_ref.get(), ""))
-                    _write_env_value(idx, "vendor", vendor_combo_ref.get())
-                    _write_env_value(idx, "gpu", vendor_gpus.get(vendor_combo_ref.get(), ""))
+        btn_frame = ttk.Frame(self)
+        btn_frame.pack(pady=(5, 15))
+        ttk.Button(btn_frame, text="确定", command=self._confirm).pack(side=tk.LEFT, padx=5)
+        ttk.Button(btn_frame, text="取消", command=self.destroy).pack(side=tk.LEFT, padx=5)
 
-                vendor_combo.bind("<<ComboboxSelected>>", on_vendor_change)
-            else:
-                ttk.Label(card_frm, text="厂家：").grid(row=1, column=0, sticky="w", padx=5, pady=2)
-                ttk.Label(card_frm, text=data.get("vendor", "")).grid(row=1, column=1, sticky="w", padx=5, pady=2)
+    def _confirm(self):
+        self.result = self._combo.current()
+        self.destroy()
 
-                ttk.Label(card_frm, text="GPU型号：").grid(row=1, column=2, sticky="w", padx=5, pady=2)
-                ttk.Label(card_frm, text=data.get("gpu", "")).grid(row=1, column=3, sticky="w", padx=5, pady=2)
+    @staticmethod
+    def ask(parent, title, prompt, choices):
+        dialog = ChoiceDialog(parent, title, prompt, choices)
+        dialog.grab_set()
+        parent.wait_window(dialog)
+        return dialog.result
+
+
+# ============ 历史数据面板 ============
+class HistoryDialog(tk.Toplevel):
+    """跨项目历史表现查询面板
+
+    options 为 HistoryStore.options() 的结果；query(model, test_type, field, vendor, gpu_count, config, last)
+    返回 (汇总行列表, 逐项目行列表)，由控制器接到历史结果库上。筛选项选"全部"时传 None。
+    """
+
+    SUMMARY_COLUMNS = (("vendor", "厂家", 90), ("gpu", "GPU", 90), ("gpu_count", "GPU数量", 60),
+                       ("config", "测试配置", 240), ("projects", "项目数", 60), ("samples", "样本数", 70),
+                       ("mean", "平均", 90), ("min", "最小", 90), ("max", "最大", 90))
+    TREND_COLUMNS = (("project", "项目", 160), ("test_cycle", "测试周期", 110), ("vendor", "厂家", 90),
+                     ("gpu", "GPU", 90), ("gpu_count", "GPU数量", 60), ("config", "测试配置", 240),
+                     ("samples", "样本数", 70), ("mean", "平均", 90))
+    _TEXT_COLUMNS = ("project", "test_cycle", "vendor", "gpu", "gpu_count", "config")
+
+    def __init__(self, parent, options, query, last):
+        super().__init__(parent)
+        self.title("历史数据")
+        self.transient(parent)
+        self._options = options
+        self._query = query
+
+        filters = ttk.Frame(self)
+        filters.pack(fill=tk.X, padx=10, pady=(10, 5))
+        self._model = self._combo(filters, "模型：", list(options), 18)
+        self._test_type = self._combo(filters, "测试类型：", [], 12)
+        self._field = self._combo(filters, "指标：", [], 20)
+        self._vendor = self._combo(filters, "厂家：", [], 10)
+        self._gpu_count = self._combo(filters, "GPU数量：", [], 6)
+        self._config = self._combo(filters, "测试配置：", [], 30)
+        ttk.Label(filters, text="最近项目数：").pack(side=tk.LEFT)
+        self._last = tk.Spinbox(filters, from_=1, to=1000, width=5)
+        self._last.delete(0, tk.END)
+        self._last.insert(0, str(last))
+        self._last.pack(side=tk.LEFT, padx=(0, 8))
+        ttk.Button(filters, text="查询", command=self._run_query).pack(side=tk.LEFT)
+
+        self._model.bind("<<ComboboxSelected>>", lambda e: self._on_model())
+        self._test_type.bind("<<ComboboxSelected>>", lambda e: self._on_test_type())
+
+        self._summary = self._table("按厂家/GPU汇总", self.SUMMARY_COLUMNS, 6)
+        self._trend = self._table("各项目明细（从新到旧）", self.TREND_COLUMNS, 10)
+        self._status = ttk.Label(self, text="历史结果库为空，保存项目后即写入" if not options else "")
+        self._status.pack(fill=tk.X, padx=10, pady=(0, 10))
+
+        if options:
+            self._model.current(0)
+            self._on_model()
+
+    def _combo(self, parent, label, values, width):
+        ttk.Label(parent, text=label).pack(side=tk.LEFT)
+        combo = ttk.Combobox(parent, values=values, state="readonly", width=width)
+        combo.pack(side=tk.LEFT, padx=(0, 8))
+        return combo
+
+    def _table(self, title, columns, height):
+        frame = ttk.LabelFrame(self, text=title)
+        frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        tree = ttk.Treeview(frame, columns=[key for key, _label, _width in columns], show="headings", height=height)
+        for key, label, width in columns:
+            tree.heading(key, text=label)
+            tree.column(key, width=width, anchor="w" if key in HistoryDialog._TEXT_COLUMNS else "e")
+        tree.pack(fill=tk.BOTH, expand=True)
+        tree.columns = columns
+        return tree
+
+    def _on_model(self):
+        test_types = list(self._options.get(self._model.get(), {}))
+        self._test_type.config(values=test_types)
+        if test_types:
+            self._test_type.current(0)
+        self._on_test_type()
+
+    def _on_test_type(self):
+        entry = self._options.get(self._model.get(), {}).get(self._test_type.get(), {})
+        fields = entry.get("fields", [])
+        self._field.config(values=fields)
+        if fields and self._field.get() not in fields:
+            self._field.current(0)
+        for combo, name in ((self._vendor, "vendors"), (self._gpu_count, "gpu_counts"), (self._config, "configs")):
+            combo.config(values=["全部"] + [value for value in entry.get(name, []) if value])
+            combo.current(0)
+
+    def _run_query(self):
+        if not self._field.get():
+            return
+        try:
+            last = max(1, int(self._last.get()))
+        except ValueError:
+            last = None
+        vendor, gpu_count, config = (
+            None if combo.get() == "全部" else combo.get() for combo in (self._vendor, self._gpu_count, self._config)
+        )
+        started = time.perf_counter()
+        summary, trend = self._query(
+            self._model.get(), self._test_type.get(), self._field.get(), vendor, gpu_count, config, last
+        )
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        for tree, rows in ((self._summary, summary), (self._trend, trend)):
+            tree.delete(*tree.get_children())
+            for row in rows:
+                tree.insert("", tk.END, values=[HistoryDialog._format(row[key]) for key, _label, _w in tree.columns])
+        projects = len({row["recorded_at"] for row in trend})
+        self._status.config(text=f"共 {projects} 个项目，查询耗时 {elapsed_ms:.1f} ms")
 
-            # 第三行：GPU数量、数据集、测试工具
-            ttk.Label(card_frm, text="GPU数量：").grid(row=2, column=0, sticky="w", padx=5, pady=2)
-            gpu_var = tk.StringVar(value=str(data.get("gpu_count", "1")))
-            gpu_cnt = tk.Spinbox(card_frm, from_=1, to=100, textvariable=gpu_var, width=6)
-            gpu_cnt.grid(row=2, column=1, sticky="w", padx=5, pady=2)
+    @staticmethod
+    def _format(value):
+        return f"{value:,.2f}" if isinstance(value, float) else value
+
+
+# ============ 表格行控件管理 ============
+class RowWidgets:
+    """按行管理表格控件：单行插入/删除时只创建或销毁该行控件，并重排其后的行
+
+    - container：行控件所在的父容器
+    - first_grid_row：第 0 行数据所在的 grid 行号（表头占用之前的行）；
+      为 None 时表示行以 pack 布局，不做 grid 重排
+    - label_text(position, row_id)：序号控件的文字，默认显示从 0 开始的序号
+
+    行id → 位置的映射在重排其后各行时一并更新，按 id 查位置为 O(1)。
+    """
+
+    def __init__(self, container, first_grid_row=1, label_text=None):
+        self.container = container
+        self.first_grid_row = first_grid_row
+        self.label_text = label_text or (lambda position, row_id: str(position))
+        self.order = []  # 行id（显示顺序）
+        self._positions = {}  # 行id → 显示位置
+        self._widgets = {}  # 行id → 该行控件列表
+        self._index_widgets = {}  # 行id → 显示序号的控件
+
+    def __len__(self):
+        return len(self.order)
+
+    def grid_row(self, position):
+        """position 处数据行对应的 grid 行号"""
+        return self.first_grid_row + position
+
+    def position(self, row_id):
+        """行id当前的显示位置"""
+        return self._positions[row_id]
+
+    def insert(self, position, row_id, widgets, index_widget=None):
+        """登记新行（控件已按 grid_row(position) 布局），并下移其后的行"""
+        self.order.insert(position, row_id)
+        self._positions[row_id] = position
+        self._widgets[row_id] = widgets
+        if index_widget is not None:
+            self._index_widgets[row_id] = index_widget
+        self._reindex(position + 1)
+
+    def remove(self, row_id):
+        """销毁该行控件，并上移其后的行"""
+        if row_id not in self._widgets:
+            return
+        position = self._positions.pop(row_id)
+        del self.order[position]
+        for w in self._widgets.pop(row_id):
+            w.destroy()
+        self._index_widgets.pop(row_id, None)
+        self._reindex(position)
+
+    def _reindex(self, start):
+        """从 start 开始重新设置位置映射、grid 行号和序号"""
+        for position in range(start, len(self.order)):
+            row_id = self.order[position]
+            self._positions[row_id] = position
+            if self.first_grid_row is not None:
+                grid_row = self.grid_row(position)
+                for w in self._widgets[row_id]:
+                    w.grid_configure(row=grid_row)
+            index_widget = self._index_widgets.get(row_id)
+            if index_widget is not None:
+                index_widget.config(text=self.label_text(position, row_id))
+
+
+# ============ 虚拟化表格 ============
+class VirtualGrid(ttk.Frame):
+    """虚拟化（窗口化）表格：只为可见窗口内的行创建控件，滚动时复用这些控件
+
+    控件数量只与 visible_rows 有关，与数据行数无关。
+
+    - columns：列定义列表，每项为 dict：
+        header  表头文字
+        get     get(row) → 单元格显示值
+        set     可选，set(row, value)；提供时该列渲染为可编辑的 Entry，否则为 Label
+        width / relief  可选，传给单元格控件
+      第一列固定为序号列，最后一列为操作按钮列（actions 非空时）。
+    - rows：数据行 RowStore（直接引用，增删需通过 insert_after / remove 以便刷新视图）
+    - actions：[(按钮文字, callback(row)), ...]
+    - batcher：可选 ChangeBatcher；提供时单元格编辑经其合并后再写回，
+      重新绑定可见行之前会先 flush，保证显示的是最新值
+    """
+
+    def __init__(self, parent, columns, rows, actions=(), visible_rows=PERF_VISIBLE_ROWS, batcher=None):
+        super().__init__(parent)
+        self.columns = columns
+        self.rows = rows
+        self.actions = actions
+        self.batcher = batcher
+        self.visible_rows = visible_rows
+        self.top = 0  # 可见窗口第一行对应的数据行下标
+        self._slots = []  # 复用的行控件
+
+        headers = ["序号"] + [c["header"] for c in columns] + (["操作"] if actions else [])
+        for col_idx, h in enumerate(headers):
+            lbl = ttk.Label(self, text=h, font=("", 9, "bold"))
+            lbl.grid(row=0, column=col_idx, padx=3, pady=5, sticky="nsew")
+
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self._on_scrollbar)
+        self.scrollbar.grid(row=1, column=len(headers), rowspan=visible_rows, sticky="ns")
+
+        self.refresh()
+
+    # ========== 数据操作 ==========
+    def insert_after(self, row, new_row):
+        """在 row 之后插入 new_row 并刷新可见窗口"""
+        self.rows.insert_after(row["id"], new_row)
+        self.refresh()
+
+    def remove(self, row):
+        """移除 row 并刷新可见窗口"""
+        self.rows.delete(row["id"])
+        self.refresh()
+
+    # ========== 视图 ==========
+    def refresh(self):
+        """把可见窗口内的数据行绑定到复用控件上"""
+        if self.batcher is not None:
+            self.batcher.flush()
+        total = len(self.rows)
+        self.top = max(0, min(self.top, total - self.visible_rows))
+        shown = min(self.visible_rows, total)
+
+        while len(self._slots) < shown:
+            self._slots.append(self._create_slot(len(self._slots)))
+
+        for slot_idx, slot in enumerate(self._slots):
+            if slot_idx < shown:
+                self._bind_slot(slot, self.top + slot_idx)
+            else:
+                slot["row"] = None
+                for w in slot["widgets"]:
+                    w.grid_remove()
+
+        if total > self.visible_rows:
+            self.scrollbar.grid()
+            self.scrollbar.set(self.top / total, (self.top + shown) / total)
+        else:
+            self.scrollbar.grid_remove()
+
+    def scroll_to(self, index):
+        """滚动使第 index 行位于可见窗口顶部（会自动限制在有效范围内）"""
+        self.top = index
+        self.refresh()
+
+    def widget_count(self):
+        """当前用于数据行的控件数量（不含表头），用于验证虚拟化效果"""
+        return sum(len(slot["widgets"]) for slot in self._slots)
+
+    def _create_slot(self, slot_idx):
+        """创建一行可复用控件"""
+        grid_row = slot_idx + 1
+        slot = {"row": None, "cells": []}
+
+        index_lbl = ttk.Label(self)
+        index_lbl.grid(row=grid_row, column=0, padx=3, pady=3)
+        slot["index"] = index_lbl
+        widgets = [index_lbl]
+
+        for col_idx, column in enumerate(self.columns, 1):
+            options = {k: column[k] for k in ("width", "relief") if k in column}
+            if column.get("set"):
+                cell = ttk.Entry(self, **options)
+
+                def on_change(e, slot=slot, column=column, cell=cell):
+                    row = slot["row"]
+                    if row is None:
+                        return
+                    if self.batcher is None:
+                        column["set"](row, cell.get())
+                    else:
+                        self.batcher.submit(
+                            row["id"], column["header"], cell.get(),
+                            lambda value, row=row, setter=column["set"]: setter(row, value),
+                        )
+
+                cell.bind("<KeyRelease>", on_change)
+            else:
+                cell = ttk.Label(self, **options)
+            cell.grid(row=grid_row, column=col_idx, padx=3, pady=3)
+            slot["cells"].append(cell)
+            widgets.append(cell)
+
+        if self.actions:
+            btn_frame = ttk.Frame(self)
+            btn_frame.grid(row=grid_row, column=len(self.columns) + 1, padx=2, pady=3, sticky="w")
+            for text, callback in self.actions:
+                ttk.Button(
+                    btn_frame,
+                    text=text,
+                    command=lambda slot=slot, callback=callback: slot["row"] is not None and callback(slot["row"]),
+                ).pack(side=tk.LEFT, padx=2)
+            widgets.append(btn_frame)
+
+        for w in widgets:
+            w.bind("<MouseWheel>", self._on_mousewheel)
+            w.bind("<Button-4>", lambda e: self._scroll_units(-3))
+            w.bind("<Button-5>", lambda e: self._scroll_units(3))
+
+        slot["widgets"] = widgets
+        return slot
+
+    def _bind_slot(self, slot, row_idx):
+        """把第 row_idx 行数据显示到 slot 上"""
+        row = self.rows[row_idx]
+        slot["row"] = row
+        slot["index"].config(text=str(row_idx))
+        for column, cell in zip(self.columns, slot["cells"]):
+            value = column["get"](row)
+            if column.get("set"):
+                cell.delete(0, tk.END)
+                cell.insert(0, value)
+            else:
+                cell.config(text=value)
+        for w in slot["widgets"]:
+            w.grid()
 
-            # 使用变量追踪，确保通过键入或上下箭头都能更新 env_data
-            def _on_gpu_var_change(*args, idx=row_idx, var=gpu_var):
-                _write_env_value(idx, "gpu_count", var.get())
+    # ========== 滚动 ==========
+    def _scroll_units(self, units):
+        self.top += units
+        self.refresh()
 
-            try:
-                gpu_var.trace_add("write", _on_gpu_var_change)
-            except AttributeError:
-                # Python <3.6 fallback
-                gpu_var.trace("w", _on_gpu_var_change)
+    def _on_scrollbar(self, action, value, unit=None):
+        if action == "moveto":
+            self.top = int(float(value) * len(self.rows))
+            self.refresh()
+        elif action == "scroll":
+            step = self.visible_rows if unit == "pages" else 1
+            self._scroll_units(int(value) * step)
 
-            ttk.Label(card_frm, text="数据集：").grid(row=2, column=2, sticky="w", padx=5, pady=2)
-            dataset_var = tk.StringVar(value=data.get("dataset", ""))
-            dataset = ttk.Entry(card_frm, textvariable=dataset_var)
-            dataset.grid(row=2, column=3, sticky="ew", padx=5, pady=2)
+    def _on_mousewheel(self, event):
+        self._scroll_units(-3 if event.delta > 0 else 3)
+        return "break"
 
-            def _on_dataset_var(*a, idx=row_idx, var=dataset_var):
-                _write_env_value(idx, "dataset", var.get())
 
-            try:
-                dataset_var.trace_add("write", _on_dataset_var)
-            except AttributeError:
-                dataset_var.trace("w", _on_dataset_var)
+# ============ 渲染函数 ============
+class UIRenderer:
+    """负责各步骤的数据表渲染"""
 
-            ttk.Label(card_frm, text="测试工具：").grid(row=2, column=4, sticky="w", padx=5, pady=2)
-            tool_var = tk.StringVar(value=data.get("tool", ""))
-            tool = ttk.Entry(card_frm, textvariable=tool_var)
-            tool.grid(row=2, column=5, sticky="ew", padx=5, pady=2)
+    @staticmethod
+    def render_env_frame(step3_frame, env_data, selected_models, model_test_type_map, vendor_str, main_scroll):
+        """渲染步骤3的测试环境框架 - 改进的布局"""
+        for w in step3_frame.winfo_children():
+            w.destroy()
 
-            def _on_tool_var(*a, idx=row_idx, var=tool_var):
-                _write_env_value(idx, "tool", var.get())
+        # 创建可滚动的内部框架
+        scroll_frm = ScrollableFrame(step3_frame)
+        scroll_frm.pack(fill=tk.BOTH, expand=True)
+        content_frm = scroll_frm.scrollable_frame
 
-            try:
-                tool_var.trace_add("write", _on_tool_var)
-            except AttributeError:
-                tool_var.trace("w", _on_tool_var)
-
-            # 删除按钮放在第四行，靠左；仅当是真实 env_data 时显示
-            if env_data:
-                del_btn = ttk.Button(
-                    card_frm,
-                    text="🗑️ 删除此配置",
-                    command=lambda idx=row_idx: UIRenderer._del_env_row(idx, env_data, step3_frame, selected_models, model_test_type_map, vendor_str, main_scroll)
-                )
-                del_btn.grid(row=3, column=0, sticky="w", padx=5, pady=6)
+        # 如果 env_data 为空，先创建一条默认条目并加入（确保 validate 能看到数据）
+        if not env_data:
+            env_data.append(UIRenderer._new_env_row())
 
-        # 新增按钮
+        # 新增按钮（卡片始终插在它之前）
         add_btn_frm = ttk.Frame(content_frm)
-        add_btn_frm.pack(fill=tk.X, padx=5, pady=10)
         ttk.Button(
             add_btn_frm,
             text="➕ 新增环境配置",
             command=lambda: UIRenderer._add_env_row(env_data, selected_models, model_test_type_map, vendor_str, step3_frame, main_scroll),
         ).pack(side=tk.LEFT, padx=5)
 
+        def _card_title(position, row_id):
+            data = env_data.get(row_id) or {}
+            return f"配置 #{position + 1}: {data.get('model', '')} - {data.get('test_type', '')}"
+
+        step3_frame.row_widgets = RowWidgets(content_frm, first_grid_row=None, label_text=_card_title)
+        step3_frame.row_widgets.footer = add_btn_frm
+
+        # 为每一行环境配置创建一个分组框
+        for row_idx, data in enumerate(env_data):
+            UIRenderer._build_env_card(step3_frame, row_idx, data, env_data, selected_models, model_test_type_map, vendor_str, main_scroll)
+
+        add_btn_frm.pack(fill=tk.X, padx=5, pady=10)
+
         # 刷新滚动
-        main_scroll.canvas.update_idletasks()
-        main_scroll.canvas.configure(scrollregion=main_scroll.canvas.bbox("all"))
+        UIRenderer._refresh_scroll(main_scroll)
+
+    @staticmethod
+    def _build_env_card(step3_frame, position, data, env_data, selected_models, model_test_type_map, vendor_str, main_scroll):
+        """创建一张环境配置卡片并登记到 step3_frame.row_widgets 的 position 处"""
+        view = step3_frame.row_widgets
+        row_id = data["id"]
+
+        # helper: 按行id安全写入 env_data（行已被删除时忽略）
+        def _write_env_value(key, value):
+            row = env_data.get(row_id)
+            if row is not None:
+                row[key] = value
+                env_data.touch(row_id)
+
+        # 为每个环境创建一个卡片式框架
+        card_frm = ttk.LabelFrame(view.container, text=view.label_text(position, row_id), padding=10)
+        card_frm.pack(fill=tk.BOTH, expand=True, padx=5, pady=8, before=view.footer)
+
+        # 使用 grid 布局：使单行控件横向扩展，避免堆叠
+        card_frm.columnconfigure(1, weight=1)
+        card_frm.columnconfigure(3, weight=1)
+        card_frm.columnconfigure(5, weight=1)
+
+        # 第一行：模型、测试类型
+        if data.get("is_dynamic"):
+            ttk.Label(card_frm, text="模型：").grid(row=0, column=0, sticky="w", padx=5, pady=2)
+            model_combo = ttk.Combobox(card_frm, values=selected_models, state="readonly")
+            model_combo.grid(row=0, column=1, sticky="ew", padx=5, pady=2)
+            model_combo.set(data["model"])
+
+            ttk.Label(card_frm, text="测试类型：").grid(row=0, column=2, sticky="w", padx=5, pady=2)
+            tt_combo = ttk.Combobox(card_frm, state="readonly")
+            tt_combo.grid(row=0, column=3, sticky="ew", padx=5, pady=2)
+            tt_combo.set(data["test_type"])
+
+            def on_model_change(e, combo=tt_combo, combo_model=model_combo):
+                combo.config(values=model_test_type_map.get(combo_model.get(), []))
+                _write_env_value("model", combo_model.get())
+                _write_env_value("test_type", combo.get())
+
+            model_combo.bind("<<ComboboxSelected>>", on_model_change)
+        else:
+            ttk.Label(card_frm, text="模型：").grid(row=0, column=0, sticky="w", padx=5, pady=2)
+            ttk.Label(card_frm, text=data["model"]).grid(row=0, column=1, sticky="w", padx=5, pady=2)
+
+            ttk.Label(card_frm, text="测试类型：").grid(row=0, column=2, sticky="w", padx=5, pady=2)
+            ttk.Label(card_frm, text=data["test_type"]).grid(row=0, column=3, sticky="w", padx=5, pady=2)
+
+        # 第二行：厂家、GPU型号
+        vendor_list = UIRenderer._parse_vendor_str(vendor_str)
+        vendor_names = [v[0] for v in vendor_list]
+        vendor_gpus = {v[0]: v[1] for v in vendor_list}
+
+        if data.get("is_dynamic"):
+            ttk.Label(card_frm, text="厂家：").grid(row=1, column=0, sticky="w", padx=5, pady=2)
+            vendor_combo = ttk.Combobox(card_frm, values=vendor_names, state="readonly")
+            vendor_combo.grid(row=1, column=1, sticky="ew", padx=5, pady=2)
+            vendor_combo.set(data.get("vendor", ""))
+
+            ttk.Label(card_frm, text="GPU型号：").grid(row=1, column=2, sticky="w", padx=5, pady=2)
+            gpu_lbl = ttk.Label(card_frm, text=data.get("gpu", ""))
+            gpu_lbl.grid(row=1, column=3, sticky="w", padx=5, pady=2)
+
+            def on_vendor_change(e, lbl=gpu_lbl, vendor_combo_ref=vendor_combo):
+                lbl.config(text=vendor_gpus.get(vendor_combo_ref.get(), ""))
+                _write_env_value("vendor", vendor_combo_ref.get())
+                _write_env_value("gpu", vendor_gpus.get(vendor_combo_ref.get(), ""))
+
+            vendor_combo.bind("<<ComboboxSelected>>", on_vendor_change)
+        else:
+            ttk.Label(card_frm, text="厂家：").grid(row=1, column=0, sticky="w", padx=5, pady=2)
+            ttk.Label(card_frm, text=data.get("vendor", "")).grid(row=1, column=1, sticky="w", padx=5, pady=2)
+
+            ttk.Label(card_frm, text="GPU型号：").grid(row=1, column=2, sticky="w", padx=5, pady=2)
+            ttk.Label(card_frm, text=data.get("gpu", "")).grid(row=1, column=3, sticky="w", padx=5, pady=2)
+
+        # 第三行：GPU数量、数据集、测试工具
+        ttk.Label(card_frm, text="GPU数量：").grid(row=2, column=0, sticky="w", padx=5, pady=2)
+        gpu_var = tk.StringVar(value=str(data.get("gpu_count", "1")))
+        gpu_cnt = tk.Spinbox(card_frm, from_=1, to=100, textvariable=gpu_var, width=6)
+        gpu_cnt.grid(row=2, column=1, sticky="w", padx=5, pady=2)
+
+        # 使用变量追踪，确保通过键入或上下箭头都能更新 env_data
+        def _on_gpu_var_change(*args, var=gpu_var):
+            _write_env_value("gpu_count", var.get())
+
+        try:
+            gpu_var.trace_add("write", _on_gpu_var_change)
+        except AttributeError:
+            # Python <3.6 fallback
+            gpu_var.trace("w", _on_gpu_var_change)
+
+        ttk.Label(card_frm, text="数据集：").grid(row=2, column=2, sticky="w", padx=5, pady=2)
+        dataset_var = tk.StringVar(value=data.get("dataset", ""))
+        dataset = ttk.Entry(card_frm, textvariable=dataset_var)
+        dataset.grid(row=2, column=3, sticky="ew", padx=5, pady=2)
+
+        def _on_dataset_var(*a, var=dataset_var):
+            _write_env_value("dataset", var.get())
+
+        try:
+            dataset_var.trace_add("write", _on_dataset_var)
+        except AttributeError:
+            dataset_var.trace("w", _on_dataset_var)
+
+        ttk.Label(card_frm, text="测试工具：").grid(row=2, column=4, sticky="w", padx=5, pady=2)
+        tool_var = tk.StringVar(value=data.get("tool", ""))
+        tool = ttk.Entry(card_frm, textvariable=tool_var)
+        tool.grid(row=2, column=5, sticky="ew", padx=5, pady=2)
+
+        def _on_tool_var(*a, var=tool_var):
+            _write_env_value("tool", var.get())
+
+        try:
+            tool_var.trace_add("write", _on_tool_var)
+        except AttributeError:
+            tool_var.trace("w", _on_tool_var)
+
+        # 删除按钮放在第四行，靠左
+        del_btn = ttk.Button(
+            card_frm,
+            text="🗑️ 删除此配置",
+            command=lambda: UIRenderer._del_env_row(row_id, env_data, step3_frame, selected_models, model_test_type_map, vendor_str, main_scroll)
+        )
+        del_btn.grid(row=3, column=0, sticky="w", padx=5, pady=6)
+
+        view.insert(position, row_id, [card_frm], card_frm)
 
     @staticmethod
     def render_models_and_test_types(
@@ -358,57 +751,60 @@ class UIRenderer:
                 row=0, column=i, padx=4, pady=5
             )
 
-        for row_idx, pk_row in enumerate(pk_data, 1):
-            ttk.Label(pk_frame, text=str(row_idx - 1)).grid(
-                row=row_idx, column=0, padx=4, pady=3
-            )
-            ttk.Label(pk_frame, text=pk_row["model"]).grid(
-                row=row_idx, column=1, padx=4, pady=3
-            )
-            ttk.Label(pk_frame, text=pk_row["test_type"]).grid(
-                row=row_idx, column=2, padx=4, pady=3
-            )
-
-            pk_combo = ttk.Combobox(pk_frame, width=60, state="normal")
-            pk_combo.config(values=pk_row["pk_options"])
-            pk_combo.grid(row=row_idx, column=3, padx=4, pady=3, sticky="ew")
-            pk_combo.set(pk_row["selected_pk"])
-
-            def on_pk_change(e, row_id=pk_row["id"], combo=pk_combo):
-                for r in pk_data:
-                    if r["id"] == row_id:
-                        r["selected_pk"] = combo.get()
-                        break
+        pk_frame.row_widgets = RowWidgets(pk_frame)
+        for position, pk_row in enumerate(pk_data):
+            UIRenderer._build_pk_row(pk_frame, position, pk_row, pk_data, app_ref)
 
-            pk_combo.bind("<<ComboboxSelected>>", on_pk_change)
+        UIRenderer._refresh_scroll(app_ref.main_scroll)
 
-            btn_frame = ttk.Frame(pk_frame)
-            btn_frame.grid(row=row_idx, column=4, padx=4, pady=3)
+    @staticmethod
+    def _build_pk_row(pk_frame, position, pk_row, pk_data, app_ref):
+        """创建一行PK指标控件并登记到 pk_frame.row_widgets 的 position 处"""
+        view = pk_frame.row_widgets
+        grid_row = view.grid_row(position)
+
+        index_lbl = ttk.Label(pk_frame, text=str(position))
+        index_lbl.grid(row=grid_row, column=0, padx=4, pady=3)
+        model_lbl = ttk.Label(pk_frame, text=pk_row["model"])
+        model_lbl.grid(row=grid_row, column=1, padx=4, pady=3)
+        tt_lbl = ttk.Label(pk_frame, text=pk_row["test_type"])
+        tt_lbl.grid(row=grid_row, column=2, padx=4, pady=3)
+
+        pk_combo = ttk.Combobox(pk_frame, width=60, state="normal")
+        pk_combo.config(values=pk_row["pk_options"])
+        pk_combo.grid(row=grid_row, column=3, padx=4, pady=3, sticky="ew")
+        pk_combo.set(pk_row["selected_pk"])
+
+        def on_pk_change(e, row_id=pk_row["id"], combo=pk_combo):
+            row = pk_data.get(row_id)
+            if row is not None:
+                row["selected_pk"] = combo.get()
+                pk_data.touch(row_id)
+
+        pk_combo.bind("<<ComboboxSelected>>", on_pk_change)
+
+        btn_frame = ttk.Frame(pk_frame)
+        btn_frame.grid(row=grid_row, column=4, padx=4, pady=3)
 
-            ttk.Button(
-                btn_frame,
-                text="➕ 新增行",
-                command=lambda row_data=pk_row: UIRenderer._add_pk_row(row_data, pk_data, pk_frame, app_ref),
-                width=8,
-            ).pack(side=tk.LEFT, padx=2)
+        ttk.Button(
+            btn_frame,
+            text="➕ 新增行",
+            command=lambda row_data=pk_row: UIRenderer._add_pk_row(row_data, pk_data, pk_frame, app_ref),
+            width=8,
+        ).pack(side=tk.LEFT, padx=2)
 
-            ttk.Button(
-                btn_frame,
-                text="删除",
-                command=lambda row_id=pk_row["id"]: UIRenderer._del_pk_row(row_id, pk_data, pk_frame, app_ref),
-                width=6,
-            ).pack(side=tk.LEFT, padx=2)
+        ttk.Button(
+            btn_frame,
+            text="删除",
+            command=lambda row_id=pk_row["id"]: UIRenderer._del_pk_row(row_id, pk_data, pk_frame, app_ref),
+            width=6,
+        ).pack(side=tk.LEFT, padx=2)
 
-        app_ref.main_scroll.canvas.update_idletasks()
-        app_ref.main_scroll.canvas.configure(
-            scrollregion=app_ref.main_scroll.canvas.bbox("all")
-        )
+        view.insert(position, pk_row["id"], [index_lbl, model_lbl, tt_lbl, pk_combo, btn_frame], index_lbl)
 
     @staticmethod
     def render_perf_frame(perf_frame, perf_data, app_ref):
-        """渲染性能数据框架"""
-        from config import PERF_FIELDS_MAP
-
+        """渲染性能数据框架（每个测试类型一个虚拟化表格）"""
         for w in perf_frame.winfo_children():
             w.destroy()
 
@@ -416,92 +812,77 @@ class UIRenderer:
         for perf_row in perf_data:
             tt = perf_row["test_type"]
             if tt not in test_type_groups:
-                test_type_groups[tt] = []
+                test_type_groups[tt] = RowStore()
             test_type_groups[tt].append(perf_row)
 
+        # 每个测试类型一个表格块：test_type → VirtualGrid
+        perf_frame.grids = {}
+
         block_row = 0
         for test_type, rows in test_type_groups.items():
-            tt_frm = ttk.LabelFrame(perf_frame, text=f"📊 {test_type}")
+            tt_frm = ttk.LabelFrame(perf_frame, text=f"📊 {test_type}（{len(rows)} 行）")
             tt_frm.grid(row=block_row, column=0, sticky="nsew", padx=5, pady=8, columnspan=4)
             block_row += 1
 
             input_fields, calc_fields = PERF_FIELDS_MAP.get(test_type, ([], []))
+            grid = VirtualGrid(
+                tt_frm,
+                UIRenderer._perf_columns(input_fields, calc_fields),
+                rows,
+                actions=[
+                    ("➕ 新增行", lambda row: UIRenderer._add_perf_row(row, perf_data, perf_frame, app_ref)),
+                    ("删除", lambda row: UIRenderer._del_perf_row(row["id"], perf_data, perf_frame, app_ref)),
+                ],
+                batcher=app_ref.change_batcher,
+            )
+            grid.pack(fill=tk.BOTH, expand=True)
+            perf_frame.grids[test_type] = grid
 
-            headers = ["序号", "模型", "厂家", "数据集"] + input_fields + calc_fields + ["操作"]
-            for col_idx, h in enumerate(headers):
-                lbl = ttk.Label(tt_frm, text=h, font=("", 9, "bold"))
-                lbl.grid(row=0, column=col_idx, padx=3, pady=5, sticky="nsew")
-
-            for row_idx, perf_row in enumerate(rows, 1):
-                col_idx = 0
-
-                ttk.Label(tt_frm, text=str(row_idx - 1)).grid(
-                    row=row_idx, column=col_idx, padx=3, pady=3
-                )
-                col_idx += 1
-
-                ttk.Label(tt_frm, text=perf_row["model"]).grid(
-                    row=row_idx, column=col_idx, padx=3, pady=3
-                )
-                col_idx += 1
-
-                ttk.Label(tt_frm, text=perf_row["vendor"]).grid(
-                    row=row_idx, column=col_idx, padx=3, pady=3
-                )
-                col_idx += 1
-
-                ttk.Label(tt_frm, text=perf_row["dataset"], relief="sunken", width=18).grid(
-                    row=row_idx, column=col_idx, padx=3, pady=3
-                )
-                col_idx += 1
-
-                for field in input_fields:
-                    entry = ttk.Entry(tt_frm, width=18)
-                    entry.grid(row=row_idx, column=col_idx, padx=3, pady=3)
-                    entry.insert(0, perf_row["input_values"][field])
-
-                    def on_input_change(e, row_id=perf_row["id"], field=field, entry=entry):
-                        for r in perf_data:
-                            if r["id"] == row_id:
-                                r["input_values"][field] = entry.get()
-                                break
-
-                    entry.bind("<KeyRelease>", on_input_change)
-                    col_idx += 1
-
-                for field in calc_fields:
-                    lbl = ttk.Label(
-                        tt_frm, text=perf_row["calc_values"][field], relief="sunken", width=18
-                    )
-                    lbl.grid(row=row_idx, column=col_idx, padx=3, pady=3)
-                    col_idx += 1
-
-                btn_frame = ttk.Frame(tt_frm)
-                btn_frame.grid(row=row_idx, column=col_idx, padx=2, pady=3, sticky="w")
-
-                ttk.Button(
-                    btn_frame,
-                    text="➕ 新增行",
-                    command=lambda row_data=perf_row: UIRenderer._add_perf_row(row_data, perf_data, perf_frame, app_ref),
-                ).pack(side=tk.LEFT, padx=2)
-
-                ttk.Button(
-                    btn_frame,
-                    text="删除",
-                    command=lambda row_id=perf_row["id"]: UIRenderer._del_perf_row(row_id, perf_data, perf_frame, app_ref),
-                ).pack(side=tk.LEFT, padx=2)
-
-        calc_btn = ttk.Button(
-            perf_frame,
-            text="📊 计算文本/图文推理吞吐数据",
+        btn_frame = ttk.Frame(perf_frame)
+        btn_frame.grid(row=block_row, column=0, padx=5, pady=10, sticky="w", columnspan=4)
+        ttk.Button(
+            btn_frame,
+            text="📊 计算派生指标（吞吐等）",
             command=app_ref._calculate_throughput,
-        )
-        calc_btn.grid(row=block_row, column=0, padx=5, pady=10, sticky="w", columnspan=4)
+        ).pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(
+            btn_frame,
+            text="📥 导入性能数据（CSV/JSON）",
+            command=app_ref.import_perf_data,
+        ).pack(side=tk.LEFT)
 
-        app_ref.main_scroll.canvas.update_idletasks()
-        app_ref.main_scroll.canvas.configure(
-            scrollregion=app_ref.main_scroll.canvas.bbox("all")
-        )
+        UIRenderer._refresh_scroll(app_ref.main_scroll)
+
+    @staticmethod
+    def _perf_columns(input_fields, calc_fields):
+        """性能数据表格的列定义：模型/厂家/数据集 + 输入字段（可编辑）+ 计算字段
+
+        字段取自当前的 PERF_FIELDS_MAP；项目文件或自动保存日志中的旧行可能缺少后来新增的字段，显示为空。
+        """
+        columns = [
+            {"header": "模型", "get": lambda row: row["model"]},
+            {"header": "厂家", "get": lambda row: row["vendor"]},
+            {"header": "数据集", "get": lambda row: row["dataset"], "relief": "sunken", "width": 18},
+        ]
+        for field in input_fields:
+            def _set_input(row, value, field=field):
+                row["input_values"][field] = value
+                NumericCache.invalidate(row, "input_values", field)
+
+            columns.append({
+                "header": field,
+                "get": lambda row, field=field: row["input_values"].get(field, ""),
+                "set": _set_input,
+                "width": 18,
+            })
+        for field in calc_fields:
+            columns.append({
+                "header": field,
+                "get": lambda row, field=field: row["calc_values"].get(field, ""),
+                "relief": "sunken",
+                "width": 18,
+            })
+        return columns
 
     @staticmethod
     def render_problem_frame(problem_frame, problem_data, app_ref):
@@ -514,95 +895,81 @@ class UIRenderer:
             lbl = ttk.Label(problem_frame, text=h, font=("", 9, "bold"))
             lbl.grid(row=0, column=col_idx, padx=8, pady=5, sticky="nsew")
 
-        for row_idx, problem_row in enumerate(problem_data, 1):
-            col_idx = 0
-
-            ttk.Label(problem_frame, text=str(row_idx - 1)).grid(
-                row=row_idx, column=col_idx, padx=8, pady=3
-            )
-            col_idx += 1
-
-            category_combo = ttk.Combobox(
-                problem_frame,
-                values=["项目问题", "技术问题"],
-                state="readonly",
-                width=12,
-            )
-            category_combo.grid(row=row_idx, column=col_idx, padx=8, pady=3)
-            category_combo.set(problem_row["category"])
-
-            def on_category_change(e, row_id=problem_row["id"], combo=category_combo):
-                for r in problem_data:
-                    if r["id"] == row_id:
-                        r["category"] = combo.get()
-                        break
-
-            category_combo.bind("<<ComboboxSelected>>", on_category_change)
-            col_idx += 1
+        problem_frame.row_widgets = RowWidgets(problem_frame)
+        for position, problem_row in enumerate(problem_data):
+            UIRenderer._build_problem_row(problem_frame, position, problem_row, problem_data, app_ref)
 
-            desc_entry = ttk.Entry(problem_frame, width=40)
-            desc_entry.grid(row=row_idx, column=col_idx, padx=8, pady=3)
-            desc_entry.insert(0, problem_row["description"])
-
-            def on_desc_change(e, row_id=problem_row["id"], entry=desc_entry):
-                for r in problem_data:
-                    if r["id"] == row_id:
-                        r["description"] = entry.get()
-                        break
+        problem_frame.columnconfigure(2, weight=2)
+        problem_frame.columnconfigure(4, weight=2)
 
-            desc_entry.bind("<KeyRelease>", on_desc_change)
-            col_idx += 1
+        UIRenderer._refresh_scroll(app_ref.main_scroll)
 
-            person_entry = ttk.Entry(problem_frame, width=15)
-            person_entry.grid(row=row_idx, column=col_idx, padx=8, pady=3)
-            person_entry.insert(0, problem_row["person"])
+    @staticmethod
+    def _build_problem_row(problem_frame, position, problem_row, problem_data, app_ref):
+        """创建一行项目问题控件并登记到 problem_frame.row_widgets 的 position 处"""
+        view = problem_frame.row_widgets
+        grid_row = view.grid_row(position)
+        row_id = problem_row["id"]
+
+        index_lbl = ttk.Label(problem_frame, text=str(position))
+        index_lbl.grid(row=grid_row, column=0, padx=8, pady=3)
+
+        category_combo = ttk.Combobox(
+            problem_frame,
+            values=["项目问题", "技术问题"],
+            state="readonly",
+            width=12,
+        )
+        category_combo.grid(row=grid_row, column=1, padx=8, pady=3)
+        category_combo.set(problem_row["category"])
 
-            def on_person_change(e, row_id=problem_row["id"], entry=person_entry):
-                for r in problem_data:
-                    if r["id"] == row_id:
-                        r["person"] = entry.get()
-                        break
+        def _write_problem_value(key, value):
+            row = problem_data.get(row_id)
+            if row is not None:
+                row[key] = value
 
-            person_entry.bind("<KeyRelease>", on_person_change)
-            col_idx += 1
+        def on_category_change(e, combo=category_combo):
+            app_ref.change_batcher.submit(
+                row_id, "category", combo.get(), lambda value: _write_problem_value("category", value)
+            )
 
-            solution_entry = ttk.Entry(problem_frame, width=40)
-            solution_entry.grid(row=row_idx, column=col_idx, padx=8, pady=3)
-            solution_entry.insert(0, problem_row["solution"])
+        category_combo.bind("<<ComboboxSelected>>", on_category_change)
 
-            def on_solution_change(e, row_id=problem_row["id"], entry=solution_entry):
-                for r in problem_data:
-                    if r["id"] == row_id:
-                        r["solution"] = entry.get()
-                        break
+        widgets = [index_lbl, category_combo]
+        for col_idx, (key, width) in enumerate(
+            (("description", 40), ("person", 15), ("solution", 40)), 2
+        ):
+            entry = ttk.Entry(problem_frame, width=width)
+            entry.grid(row=grid_row, column=col_idx, padx=8, pady=3)
+            entry.insert(0, problem_row[key])
 
-            solution_entry.bind("<KeyRelease>", on_solution_change)
-            col_idx += 1
+            def on_text_change(e, key=key, entry=entry):
+                app_ref.change_batcher.submit(
+                    row_id, key, entry.get(), lambda value, key=key: _write_problem_value(key, value)
+                )
 
-            btn_frame = ttk.Frame(problem_frame)
-            btn_frame.grid(row=row_idx, column=col_idx, padx=8, pady=3)
+            entry.bind("<KeyRelease>", on_text_change)
+            widgets.append(entry)
 
-            ttk.Button(
-                btn_frame,
-                text="➕ 新增行",
-                command=lambda row_data=problem_row: UIRenderer._add_problem_row(row_data, problem_data, problem_frame, app_ref),
-                width=8,
-            ).pack(side=tk.LEFT, padx=2)
+        btn_frame = ttk.Frame(problem_frame)
+        btn_frame.grid(row=grid_row, column=5, padx=8, pady=3)
+        widgets.append(btn_frame)
 
-            ttk.Button(
-                btn_frame,
-                text="删除",
-                command=lambda row_id=problem_row["id"]: UIRenderer._del_problem_row(row_id, problem_data, problem_frame, app_ref),
-                width=6,
-            ).pack(side=tk.LEFT, padx=2)
+        ttk.Button(
+            btn_frame,
+            text="➕ 新增行",
+            command=lambda row_data=problem_row: UIRenderer._add_problem_row(row_data, problem_data, problem_frame, app_ref),
+            width=8,
+        ).pack(side=tk.LEFT, padx=2)
 
-        problem_frame.columnconfigure(2, weight=2)
-        problem_frame.columnconfigure(4, weight=2)
+        ttk.Button(
+            btn_frame,
+            text="删除",
+            command=lambda: UIRenderer._del_problem_row(row_id, problem_data, problem_frame, app_ref),
+            width=6,
+        ).pack(side=tk.LEFT, padx=2)
 
-        app_ref.main_scroll.canvas.update_idletasks()
-        app_ref.main_scroll.canvas.configure(
-            scrollregion=app_ref.main_scroll.canvas.bbox("all")
-        )
+        view.insert(position, row_id, widgets, index_lbl)
 
     # ========== 辅助方法 ==========
     @staticmethod
@@ -621,30 +988,59 @@ class UIRenderer:
         return vendors
 
     @staticmethod
-    def _add_env_row(env_data, selected_models, model_test_type_map, vendor_str, step3_frame, main_scroll):
-        """新增环境行"""
-        from data_manager import DataManager
-        vendor_list = DataManager.parse_vendor_str(vendor_str)
-        env_data.append({
-            "model": selected_models[0] if selected_models else "",
+    def _refresh_scroll(main_scroll):
+        """刷新主滚动区域"""
+        main_scroll.canvas.update_idletasks()
+        main_scroll.canvas.configure(scrollregion=main_scroll.canvas.bbox("all"))
+
+    @staticmethod
+    def _new_env_row(model="", vendor="", gpu=""):
+        """创建一条可编辑（动态）的环境配置行"""
+        return {
+            "model": model,
             "test_type": "",
-            "vendor": vendor_list[0][0] if vendor_list else "",
-            "gpu": vendor_list[0][1] if vendor_list else "",
+            "vendor": vendor,
+            "gpu": gpu,
             "gpu_count": "",
             "dataset": "",
             "tool": "",
             "is_dynamic": True,
             "id": str(uuid.uuid4()),
-        })
-        UIRenderer.render_env_frame(step3_frame, env_data, selected_models, model_test_type_map, vendor_str, main_scroll)
+        }
+
+    @staticmethod
+    def _new_problem_row():
+        """创建一条空的项目问题行"""
+        return {
+            "id": str(uuid.uuid4()),
+            "category": "",
+            "description": "",
+            "person": "",
+            "solution": "",
+        }
+
+    @staticmethod
+    def _add_env_row(env_data, selected_models, model_test_type_map, vendor_str, step3_frame, main_scroll):
+        """新增环境行（仅创建新卡片）"""
+        vendor_list = DataManager.parse_vendor_str(vendor_str)
+        new_row = UIRenderer._new_env_row(
+            model=selected_models[0] if selected_models else "",
+            vendor=vendor_list[0][0] if vendor_list else "",
+            gpu=vendor_list[0][1] if vendor_list else "",
+        )
+        env_data.append(new_row)
+        UIRenderer._build_env_card(
+            step3_frame, len(env_data) - 1, new_row, env_data, selected_models, model_test_type_map, vendor_str, main_scroll
+        )
+        UIRenderer._refresh_scroll(main_scroll)
         main_scroll.canvas.yview_moveto(1.0)
 
     @staticmethod
-    def _del_env_row(idx, env_data, step3_frame, selected_models, model_test_type_map, vendor_str, main_scroll):
-        """删除环境行"""
-        if 0 <= idx < len(env_data):
-            del env_data[idx]
-            UIRenderer.render_env_frame(step3_frame, env_data, selected_models, model_test_type_map, vendor_str, main_scroll)
+    def _del_env_row(row_id, env_data, step3_frame, selected_models, model_test_type_map, vendor_str, main_scroll):
+        """删除环境行（仅销毁该卡片并重排其后的编号）"""
+        env_data.delete(row_id)
+        step3_frame.row_widgets.remove(row_id)
+        UIRenderer._refresh_scroll(main_scroll)
 
     @staticmethod
     def _add_pk_row(row_data, pk_data, pk_frame, app_ref):
@@ -656,18 +1052,17 @@ class UIRenderer:
             "pk_options": row_data["pk_options"],
             "selected_pk": "",
         }
-        current_idx = pk_data.index(row_data)
-        pk_data.insert(current_idx + 1, new_row)
-        UIRenderer.render_pk_frame(pk_frame, pk_data, app_ref)
+        pk_data.insert_after(row_data["id"], new_row)
+        position = pk_frame.row_widgets.position(row_data["id"]) + 1
+        UIRenderer._build_pk_row(pk_frame, position, new_row, pk_data, app_ref)
+        UIRenderer._refresh_scroll(app_ref.main_scroll)
 
     @staticmethod
     def _del_pk_row(row_id, pk_data, pk_frame, app_ref):
         """删除PK指标行"""
-        for i, r in enumerate(pk_data):
-            if r["id"] == row_id:
-                del pk_data[i]
-                break
-        UIRenderer.render_pk_frame(pk_frame, pk_data, app_ref)
+        pk_data.delete(row_id)
+        pk_frame.row_widgets.remove(row_id)
+        UIRenderer._refresh_scroll(app_ref.main_scroll)
 
     @staticmethod
     def _add_perf_row(row_data, perf_data, perf_frame, app_ref):
@@ -677,6 +1072,7 @@ class UIRenderer:
             "model": row_data["model"],
             "test_type": row_data["test_type"],
             "vendor": row_data["vendor"],
+            "gpu": row_data.get("gpu", ""),
             "dataset": row_data["dataset"],
             "gpu_count": row_data["gpu_count"],
             "input_fields": row_data["input_fields"],
@@ -684,49 +1080,47 @@ class UIRenderer:
             "input_values": {f: "" for f in row_data["input_fields"]},
             "calc_values": {f: "" for f in row_data["calc_fields"]},
         }
-        current_idx = perf_data.index(row_data)
-        perf_data.insert(current_idx + 1, new_row)
-        UIRenderer.render_perf_frame(perf_frame, perf_data, app_ref)
+        perf_data.insert_after(row_data["id"], new_row)
+        grid = perf_frame.grids[row_data["test_type"]]
+        grid.insert_after(row_data, new_row)
+        grid.master.config(text=f"📊 {row_data['test_type']}（{len(grid.rows)} 行）")
 
     @staticmethod
     def _del_perf_row(row_id, perf_data, perf_frame, app_ref):
         """删除性能数据行"""
-        for i, r in enumerate(perf_data):
-            if r["id"] == row_id:
-                del perf_data[i]
-                break
-        UIRenderer.render_perf_frame(perf_frame, perf_data, app_ref)
+        row = perf_data.delete(row_id)
+        if row is None:
+            return
+
+        test_type = row["test_type"]
+        grid = perf_frame.grids[test_type]
+        grid.remove(row)
+        grid.master.config(text=f"📊 {test_type}（{len(grid.rows)} 行）")
+        # 该测试类型已无数据：移除整个表格块
+        if not grid.rows:
+            grid.master.destroy()
+            del perf_frame.grids[test_type]
+            UIRenderer._refresh_scroll(app_ref.main_scroll)
 
     @staticmethod
     def _add_problem_row(row_data, problem_data, problem_frame, app_ref):
         """新增问题行"""
-        new_row = {
-            "id": str(uuid.uuid4()),
-            "category": "",
-            "description": "",
-            "person": "",
-            "solution": "",
-        }
-        current_idx = problem_data.index(row_data)
-        problem_data.insert(current_idx + 1, new_row)
-        UIRenderer.render_problem_frame(problem_frame, problem_data, app_ref)
+        new_row = UIRenderer._new_problem_row()
+        problem_data.insert_after(row_data["id"], new_row)
+        position = problem_frame.row_widgets.position(row_data["id"]) + 1
+        UIRenderer._build_problem_row(problem_frame, position, new_row, problem_data, app_ref)
+        UIRenderer._refresh_scroll(app_ref.main_scroll)
 
     @staticmethod
     def _del_problem_row(row_id, problem_data, problem_frame, app_ref):
-        """删除问题行"""
-        for i, r in enumerate(problem_data):
-            if r["id"] == row_id:
-                del problem_data[i]
-                break
+        """删除问题行（至少保留一行空行）"""
+        problem_data.delete(row_id)
+        problem_frame.row_widgets.remove(row_id)
         if not problem_data:
-            problem_data.append({
-                "id": str(uuid.uuid4()),
-                "category": "",
-                "description": "",
-                "person": "",
-                "solution": "",
-            })
-        UIRenderer.render_problem_frame(problem_frame, problem_data, app_ref)
+            new_row = UIRenderer._new_problem_row()
+            problem_data.append(new_row)
+            UIRenderer._build_problem_row(problem_frame, 0, new_row, problem_data, app_ref)
+        UIRenderer._refresh_scroll(app_ref.main_scroll)
 
 
 # ============ 样式工具函数 ============
@@ -767,6 +1161,8 @@ def create_default_yaml(yaml_path):
 
 def get_excel_styles():
     """返回Excel样式配置"""
+    from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
+
     return {
         "header_font": Font(bold=True, size=11),
         "header_fill": PatternFill(start_color="E6E6FA", end_color="E6E6FA", fill_type="solid"),
@@ -824,6 +1220,8 @@ def set_cell_style(cell, styles, header=False):
 
 def auto_adjust_column_width(ws, max_width=50):
     """自动调整列宽"""
+    from openpyxl.utils import get_column_letter
+
     for column in ws.columns:
         max_length = 0
         column_letter = get_column_letter(column[0].column)